@@ -1,9 +1,36 @@
 import tkinter as tk
 from tkinter import messagebox, ttk, colorchooser
 import tkinter.font as tkfont
-from datetime import datetime
+from datetime import datetime, date, timedelta
+from bisect import bisect_left, insort
+from array import array
 import pickle
+import json
 import hashlib
+import os
+import io
+import sys
+import struct
+import mmap
+import argparse
+from functools import lru_cache, wraps
+from collections import deque
+import threading
+import queue
+try:
+    import numpy # Optional. Only used to speed up BookingColumns, which works without it.
+except ImportError:
+    numpy = None
+try:
+    import resource # Not on Windows. Only used for the memory shown in the diagnostics tab, when /proc isn't there either.
+except ImportError:
+    resource = None
+import time
+import atexit
+import cProfile
+import tracemalloc
+import logging
+from logging.handlers import RotatingFileHandler
 
 # Globals:
 customer_file = "Database/customers.pkl"
@@ -11,6 +38,8 @@ pet_file = "Database/pets.pkl"
 # These must exist in this folder, as it assumes they exist. In a real scenario, they would.
 booking_file = "Database/bookings.pkl"
 archived_booking_file = "Database/archived_bookings.pkl"
+version_file = "Database/version.txt"
+database_version = 3 # Goes up whenever the way records are saved changes. See upgrade_database().
 all_rooms = ["R1", "R2", "R3", "R4", "R5", "R6", "R7", "R8", "R9", "R10"] # Global containing all available rooms. In a real scenario, this would be replaced by accurate room names. 
 customers = []
 pets = []
@@ -28,7 +57,33 @@ pet_search_menu = False
 booking_search_menu = False
 
 # Classes for Customer, Pets and Bookings. Important for dictating the format used for the lists. Values each holds are as seen.
-class Customer:
+# They use __slots__ rather than a __dict__ for each record, which takes a lot less memory once there are thousands of them. fields are the values that get saved, in the order __init__ takes them.
+# Fields in categories repeat across lots of records (every booking in R1, every "Dog"), so they're interned: every record shares one copy of the text instead of having its own.
+# Pickle only writes an object once per file however many records share it, so this makes the saved files smaller and quicker to load too.
+class Record:
+    __slots__ = ()
+    fields = ()
+    categories = ()
+
+    # Saved as a tuple of the fields rather than a dict, so the names aren't written out for every record.
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in self.fields)
+
+    # Records saved before __slots__ were pickled as a dict, which is still read so older databases open (see upgrade_database). Both go through __init__, so the text is interned and booking dates parsed either way.
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            state = [state[field] for field in self.fields]
+        self.__init__(*state)
+
+    def set(self, field, value):
+        setattr(self, field, intern_text(value) if field in self.categories else value)
+
+def intern_text(value):
+    return sys.intern(value) if type(value) is str else value
+
+class Customer(Record):
+    __slots__ = fields = ("id", "fname", "sname", "address", "postcode", "email", "phonenum")
+
     def __init__(self, customer_id, fname, sname, address, postcode, email, phonenum):
         self.id = customer_id
         self.fname = fname
@@ -38,29 +93,42 @@ class Customer:
         self.email = email
         self.phonenum = phonenum
 
-class Pet:
+class Pet(Record):
+    __slots__ = fields = ("id", "name", "age", "species", "description", "diet", "add_info")
+    categories = ("age", "species", "diet")
+
     def __init__(self, pet_id, name, age, species, description, diet, add_info):
         self.id = pet_id
         self.name = name
-        self.age = age
-        self.species = species
+        self.age = intern_text(age)
+        self.species = intern_text(species)
         self.description = description
-        self.diet = diet
+        self.diet = intern_text(diet)
         self.add_info = add_info
 
-class Booking:
+class Booking(Record):
+    fields = ("id", "pet_id", "cust_id", "sdate", "edate", "dropoff", "collect", "room")
+    __slots__ = fields + ("start_date", "end_date")
+    categories = ("sdate", "edate", "dropoff", "collect", "room")
+
     def __init__(self, booking_id, pet_id, customer_id, sdate, edate, dropoff, collect, room):
         self.id = booking_id
         self.pet_id = pet_id
         self.cust_id = customer_id
-        self.sdate = sdate
-        self.edate = edate
-        self.dropoff = dropoff
-        self.collect = collect
-        self.room = room
-
-# Styling function, which is called for every window to apply the correct style. Important for enforcing user changes from the settings menu. 
-def apply_style(window):
+        self.sdate = intern_text(sdate)
+        self.edate = intern_text(edate)
+        self.dropoff = intern_text(dropoff)
+        self.collect = intern_text(collect)
+        self.room = intern_text(room)
+        self.parse_dates()
+
+    # Keeps the dates as date objects as well as the DD/MM/YYYY text, so they can be sorted and compared without reading the text each time. The text is only used for showing them. None if a date isn't valid.
+    def parse_dates(self):
+        self.start_date = parse_date(self.sdate)
+        self.end_date = parse_date(self.edate)
+
+# Styling function, which sets up the ttk styles every widget uses. Only called when the program starts and when the user changes something in the settings menu, as the styles are shared by every screen and window. 
+def configure_styles():
     #Uses a base ttk style to fall back on at the start, and edits that.
     style = ttk.Style()
     style.theme_use('clam')
@@ -75,6 +143,14 @@ def apply_style(window):
     style.configure("Edit.TButton", background="#5081e4", font=(system_font, font_size))
     style.configure("Delete.TButton", background="#d15156", font=(system_font, font_size))
     style.configure("TCombobox", fieldbackground=bg_colour, background=prog_colour, foreground=txt_colour, font=(system_font, font_size))
+    style.configure("Screen.TFrame", background=bg_colour) # The frame each screen is built in, so it looks the same as the window behind it.
+    style.configure("TNotebook", background=bg_colour, borderwidth=0)
+    style.configure("TNotebook.Tab", background=prog_colour, foreground=txt_colour, font=(system_font, font_size), padding=(10, 5))
+    style.map("TNotebook.Tab", background=[("selected", bg_colour)])
+    style.configure("Heading.TLabel", font=(system_font, font_size, "bold"))
+
+# Called for every window, to give it the background colour and the right size. The styles themselves are done by configure_styles.
+def apply_style(window):
     window.configure(background = bg_colour)
 
     #Setting the window size to be 75% of the screen, and placing it in the centre. Prevents program from moving around between opening and closing windows.
@@ -94,190 +170,1672 @@ def apply_style(window):
     # Print the applied styles, used when I was having difficulty in applying them. Debugging.
     # print(f"Styles applied: prog_colour={prog_colour}, bg_colour={bg_colour}, txt_colour={txt_colour}")
 
+logo_image = None # Loaded the first time it's needed, then shared by every page that shows it.
+
 # Function which inserts the logo to any page it is called on. Used both in the Password and Main Menu, but can be used elsewhere if needed in future. 
 def insert_image(window):
-    try:
-        img = tk.PhotoImage(file="logo.png")
-    except Exception:
-        print("Image failed to load.")
-        return # Quit so it doesn't try to do the following.
+    global logo_image
+    if logo_image is None:
+        try:
+            logo_image = tk.PhotoImage(file="logo.png")
+        except Exception:
+            print("Image failed to load.")
+            return # Quit so it doesn't try to do the following.
+    img = logo_image
 
     img_label = tk.Label(window, image=img)
     img_label.grid(row=0, column=0, padx=20, pady=20)
     img_label.image = img
 
+# Profiling mode, turned on by starting the program with --profile. Every Tk callback (button commands, after() timers, key bindings) is timed, along with the functions marked @timed (loading, saving, searching and refreshing).
+# Any action taking longer than slow_action_after is written to a log with how many records each list had, and which timed functions it spent its time in, so "it's slow" can be matched up with what was happening.
+# Actions that open a messagebox include the time it was open for.
+profile_mode = False
+slow_action_after = 0.25 # Seconds.
+profile_capture = None # "cprofile", "tracemalloc" or "both", to also save a profile of each slow action.
+profile_folder = "Database/profiles"
+slow_actions = deque(maxlen=100) # The latest slow actions, newest last.
+action_stack = [] # The parts of each action running now, innermost last. Timed functions called inside an action are added to it as parts rather than being actions of their own.
+slow_log = None # Logger, set up by start_profiling.
+
+def start_profiling(capture=None, slow_after=None):
+    global profile_mode, profile_capture, slow_action_after, slow_log
+    profile_mode = True
+    profile_capture = capture
+    if slow_after is not None:
+        slow_action_after = slow_after
+    os.makedirs(profile_folder, exist_ok=True)
+    # The log rotates once it gets to 1MB, keeping the last 3, so leaving profiling on doesn't fill the disk.
+    handler = RotatingFileHandler(os.path.join(profile_folder, "slow_actions.log"), maxBytes=1000000, backupCount=3, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_log = logging.getLogger("pethotel.slow_actions")
+    slow_log.setLevel(logging.INFO)
+    slow_log.addHandler(handler)
+    slow_log.propagate = False
+    if capture in ("tracemalloc", "both"):
+        tracemalloc.start(10)
+    # Tkinter wraps every Python callback it hands to Tk in a CallWrapper, so replacing it times all of them. Only callbacks made after this are affected, so it has to happen before the window is.
+    tk.CallWrapper = TimedCallWrapper
+
+# Marks a function to be timed. Its timings always go in timings, for the diagnostics tab. In profiling mode it's also part of the slow action log.
+def timed(function):
+    name = function.__name__
+    @wraps(function)
+    def run(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            if profile_mode:
+                return run_timed(name, function, args, kwargs)
+            return function(*args, **kwargs)
+        finally:
+            note_timing(name, time.perf_counter() - start)
+    return run
+
+timings = {} # Name -> {"calls", "total", "last", "buckets"} in seconds, for each timed function, and the writer's batches ("write batch"). Only the window thread adds to it.
+timing_buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10) # Upper limits (in seconds) for the histogram in the metrics file. buckets counts the calls up to each, plus one more for anything slower.
+
+def note_timing(name, seconds):
+    timing = timings.get(name)
+    if timing is None:
+        timing = timings[name] = {"calls": 0, "total": 0.0, "last": 0.0, "buckets": [0] * (len(timing_buckets) + 1)}
+    timing["calls"] += 1
+    timing["total"] += seconds
+    timing["last"] = seconds
+    timing["buckets"][bisect_left(timing_buckets, seconds)] += 1
+
+class TimedCallWrapper(tk.CallWrapper):
+    def __call__(self, *args):
+        if not profile_mode:
+            return super().__call__(*args)
+        return run_timed(callback_name(self.func, self.widget), super().__call__, args, {})
+
+# Name for a callback in the log, e.g. "custMenu.searchMenu (Search)". Lambdas only have their function's name, so the button's text is added where there is one.
+def callback_name(function, widget):
+    name = getattr(function, "__qualname__", repr(function)).replace(".<locals>", "")
+    try:
+        text = widget.cget("text")
+    except (tk.TclError, AttributeError): # Not every widget has text, e.g. the window itself for after() timers.
+        text = ""
+    return f"{name} ({text})" if text else name
+
+def run_timed(name, function, args, kwargs):
+    parts = []
+    action_stack.append(parts)
+    profiler = None
+    if len(action_stack) == 1 and profile_capture in ("cprofile", "both"): # Only whole actions are profiled, as the profiler can't be nested.
+        profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            return profiler.runcall(function, *args, **kwargs)
+        return function(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        action_stack.pop()
+        if action_stack:
+            action_stack[-1].append((name, seconds))
+        elif seconds >= slow_action_after:
+            record_slow_action(name, seconds, parts, profiler)
+
+# Logs a slow action. Its parts are added up by name, slowest first, as something like a search can refresh the list more than once.
+def record_slow_action(name, seconds, parts, profiler):
+    totals = {}
+    for part, part_seconds in parts:
+        totals[part] = totals.get(part, 0) + part_seconds
+    entry = {
+        "when": datetime.now().isoformat(timespec="seconds"),
+        "action": name,
+        "seconds": seconds,
+        "counts": {list_name: len(record_list(list_name)) for list_name in record_index},
+        "parts": sorted(totals.items(), key=lambda part: -part[1])[:5],
+        "files": [],
+    }
+    if profiler is not None or tracemalloc.is_tracing():
+        stamp = os.path.join(profile_folder, datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+        if profiler is not None: # Open with python -m pstats, or snakeviz.
+            profiler.dump_stats(stamp + ".prof")
+            entry["files"].append(stamp + ".prof")
+        if tracemalloc.is_tracing(): # Open with tracemalloc.Snapshot.load.
+            tracemalloc.take_snapshot().dump(stamp + ".tracemalloc")
+            entry["files"].append(stamp + ".tracemalloc")
+    slow_actions.append(entry)
+    counts = ", ".join(f"{list_name} {count}" for list_name, count in entry["counts"].items())
+    parts = ", ".join(f"{part} {part_seconds:.3f}s" for part, part_seconds in entry["parts"])
+    slow_log.info(f"{seconds:.3f}s {name} | {counts} | {parts or 'no timed parts'}" + "".join(f" | {file}" for file in entry["files"]))
+
+# Pool of row widgets for the result lists. The rows are made once, and each refresh only changes their text and button commands, rather than destroying and recreating every widget.
+# Rows with nothing to show are hidden with grid_remove, which remembers where they were, so .grid() puts them straight back.
+class RowPool:
+    def __init__(self, frame, label_grid, buttons, size=10):
+        # buttons is a list of (text, style, grid options), one for each button in a row.
+        self.rows = []
+        for i in range(size):
+            label = ttk.Label(frame)
+            label.grid(row=i, **label_grid)
+            row_buttons = []
+            for text, style, button_grid in buttons:
+                button = ttk.Button(frame, text=text, style=style)
+                button.grid(row=i, **button_grid)
+                row_buttons.append(button)
+            self.rows.append((label, row_buttons))
+        frame.columnconfigure(1, weight=1)
+        self.visible = size
+        self.show([]) # Everything starts hidden until there's something to show.
+
+    # Takes a list of (label text, [command for each button]) and puts each one in a row, hiding the rest.
+    def show(self, entries):
+        for i, (label, row_buttons) in enumerate(self.rows):
+            if i < len(entries):
+                text, commands = entries[i]
+                label.config(text=text)
+                for button, command in zip(row_buttons, commands):
+                    button.config(command=command)
+                if i >= self.visible: # Only rows that were hidden need gridding again.
+                    label.grid()
+                    for button in row_buttons:
+                        button.grid()
+            elif i < self.visible:
+                label.grid_remove()
+                for button in row_buttons:
+                    button.grid_remove()
+            else:
+                break # This row and the rest are already hidden.
+        self.visible = min(len(entries), len(self.rows))
+
+# Scrolling list used by every list screen, in place of pages of 10. Only the rows that fit are ever made (using RowPool), and scrolling just changes which records they show, so it stays quick with any number of records.
+# source is a function giving the records to show (a list, search results, or anything else that has len() and slicing), and render turns one record into (label text, [commands]) for its row. Only the visible slice is ever fetched.
+class VirtualList:
+    def __init__(self, frame, label_grid, buttons, source, render, size=10):
+        self.pool = RowPool(frame, label_grid, buttons, size)
+        self.source = source
+        self.render = render
+        self.size = size
+        self.top = 0 # Position in the list of the first row shown.
+        # The scrollbar goes in the column after the last button.
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.scroll)
+        self.scrollbar.grid(row=0, column=max(grid["column"] for _, _, grid in buttons) + 1, rowspan=size, sticky="ns")
+        # Mouse wheel has to be bound to every widget in the frame, otherwise it only works in the gaps. Windows and Mac use MouseWheel, Linux uses buttons 4 and 5.
+        widgets = [frame]
+        for label, row_buttons in self.pool.rows:
+            widgets += [label] + row_buttons
+        for widget in widgets:
+            widget.bind("<MouseWheel>", self.wheel)
+            widget.bind("<Button-4>", self.wheel)
+            widget.bind("<Button-5>", self.wheel)
+
+    # Shows the rows from top onwards again. Used after anything in the list changes, and with to_top after a new search.
+    def refresh(self, to_top=False):
+        records = self.source()
+        if to_top:
+            self.top = 0
+        self.top = max(0, min(self.top, len(records) - self.size)) # Stops it scrolling past the end, e.g. after something is deleted.
+        self.pool.show([self.render(record) for record in records[self.top:self.top + self.size]])
+        if records:
+            self.scrollbar.set(self.top / len(records), min(1, (self.top + self.size) / len(records)))
+        else:
+            self.scrollbar.set(0, 1)
+
+    # Called by the scrollbar with ("moveto", fraction) when dragged, or ("scroll", amount, "units"/"pages") for the arrows and trough.
+    def scroll(self, action, amount, unit="units"):
+        if action == "moveto":
+            top = int(float(amount) * len(self.source()))
+        else:
+            top = self.top + int(amount) * (self.size if unit == "pages" else 1)
+        if top != self.top:
+            self.top = top
+            self.refresh()
+
+    def wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll("scroll", -3)
+        else:
+            self.scroll("scroll", 3)
+        return "break"
+
+# Journal storage. Rather than re-pickling a whole list every time something changes, each change is appended to a .journal file next to its .pkl.
+# The .pkl is only rewritten ("compacted") once the journal gets long, and that happens on a separate thread so the window doesn't freeze.
+journal_compact_after = 500 # Number of journal entries allowed to build up before the .pkl is rewritten.
+journal_lock = threading.Lock() # Stops a compaction and a new journal entry from touching the same file at once.
+journal_seq = {} # Number of the last journal entry written, for each file.
+snapshot_seq = {} # Number of the last journal entry already included in each .pkl, for each file.
+compacting = set() # Files with a compaction currently running, so two don't run at once.
+compact_next = {} # File -> (records, seq, last id) for a compaction asked for while one was running. The running one does it next, so a newer list is never thrown away.
+compactions = [] # Compaction threads started, so flush_writes can wait for them.
+highest_ids = {} # Highest id ever used in each file, including deleted records, so ids are never handed out twice.
+
+# How hard saving tries to make sure changes survive a power cut. A change is safe from the program crashing once it's written, but only safe from a power cut once it has been fsynced (forced out of the operating system's cache onto the disk).
+# "full" fsyncs every batch the writer saves. "batch" fsyncs at most once every fsync_every seconds, so a burst of edits shares one fsync. That is much faster on slow disks, but a power cut can lose the last second of edits. "off" leaves it to the operating system.
+# Snapshots (.pkl) are always fsynced whatever this is set to, as the journal is emptied once they are written.
+durability = "batch"
+fsync_every = 1.0
+unsynced = set() # Journals written to since they were last fsynced.
+last_fsync = 0.0
+
+# Raised when a .pkl can't be read. It used to be treated as an empty list, which meant the next save wrote over whatever was left of it.
+class DatabaseDamaged(Exception):
+    pass
+
+# Writes a file by writing a temporary copy, fsyncing it, then renaming it over the old one. The rename either happens or it doesn't, so a crash leaves the old file or the new one, never half of one.
+def write_atomic(file, write, mode="wb"):
+    temp = file + ".tmp"
+    with open(temp, mode) as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, file)
+    # The rename itself is only safe once the folder has been fsynced too. Windows can't open folders, and doesn't need this.
+    if hasattr(os, "O_DIRECTORY"):
+        folder = os.open(os.path.dirname(file) or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(folder)
+        finally:
+            os.close(folder)
+
+# Fsyncs the journals written to since last time. Unless forced, it waits until fsync_every has passed since the last one.
+def sync_journals(force=False):
+    global last_fsync
+    if not force and time.monotonic() - last_fsync < fsync_every:
+        return
+    with journal_lock:
+        files = list(unsynced)
+        unsynced.clear()
+    for file in files:
+        with open(file, "ab") as f:
+            os.fsync(f.fileno())
+    last_fsync = time.monotonic()
+
+# Reads a .pkl and replays its journal on top of it. Entries with a sequence number at or below the one saved in the .pkl are already part of it, so they are skipped.
+def read_database(file):
+    seq = 0
+    last_id = 0
+    if os.path.exists(file + ".tmp"): # Left by a crash part way through a snapshot. The .pkl itself wasn't touched, so this is just removed.
+        os.remove(file + ".tmp")
+    try:
+        records, seq, last_id = read_snapshot(file)
+    except FileNotFoundError:
+        records = []
+
+    # Ids used to be len(list) + 1, which repeats after a delete, so older files can have repeated ids. The journal would update the wrong record, so they are renumbered, and the file is rewritten below so the new ids stick.
+    positions = {}
+    top = max(max((record.id for record in records), default=0), last_id)
+    repaired = False
+    for i, record in enumerate(records):
+        if record.id in positions:
+            top += 1
+            record.id = top
+            repaired = True
+        positions[record.id] = i
+
+    last = seq
+    try:
+        with open(file + ".journal", "r+b") as f:
+            while True:
+                good_end = f.tell()
+                try:
+                    entry_seq, op, record_id, record = RecordUnpickler(f).load()
+                    if isinstance(record, bytes): # The background writer stores the record already pickled (see queue_save).
+                        record = load_record(record)
+                except (EOFError, pickle.UnpicklingError, AttributeError, TypeError, ValueError) as error:
+                    # A crash can only leave the last entry half-written, so that's cut off, and new entries don't end up after it. Anything after a bad entry means the damage is somewhere else, and cutting there would throw the good entries away.
+                    if journal_entry_after(f, good_end):
+                        raise DatabaseDamaged(f"{file}.journal is damaged part way through and could not be read ({error}). It has been left as it is so nothing writes over it. Please restore it from a backup.")
+                    f.truncate(good_end)
+                    break
+                if entry_seq <= seq:
+                    continue
+                top = max(top, record_id)
+                if op == "put":
+                    if record_id in positions:
+                        records[positions[record_id]] = record
+                    else:
+                        positions[record_id] = len(records)
+                        records.append(record)
+                elif record_id in positions: # "delete". Marked as None and removed at the end, so positions stay correct while replaying.
+                    records[positions.pop(record_id)] = None
+                last = entry_seq
+    except FileNotFoundError:
+        pass
+
+    records = [record for record in records if record is not None]
+    journal_seq[file] = last
+    snapshot_seq[file] = seq
+    highest_ids[file] = top
+    if repaired or last - seq >= journal_compact_after:
+        compact_database(file, records)
+    return records
+
+# Whether a whole journal entry can be read anywhere after start. Only used once an entry has failed to read, to tell a half-written last entry apart from damage in the middle.
+# Every pickle starts with a \x80 byte, so only those places need trying.
+def journal_entry_after(f, start):
+    f.seek(start)
+    data = f.read()
+    at = data.find(b"\x80", 1)
+    while at != -1:
+        try:
+            entry = RecordUnpickler(io.BytesIO(data[at:])).load()
+        except Exception:
+            pass
+        else:
+            if isinstance(entry, tuple) and len(entry) == 4:
+                return True
+        at = data.find(b"\x80", at + 1)
+    return False
+
+# Adds entries to a file's journal. Entries are (op, id, record), and only the changed records are written, so this costs the same no matter how big the list is.
+# The writer passes every change it has waiting for a file at once, so a burst of edits opens the file once.
+def append_journal(file, records, entries):
+    with journal_lock:
+        with open(file + ".journal", "ab") as f:
+            for op, record_id, record in entries:
+                journal_seq[file] = journal_seq.get(file, 0) + 1
+                highest_ids[file] = max(highest_ids.get(file, 0), record_id)
+                pickle.dump((journal_seq[file], op, record_id, record), f)
+            if durability == "full":
+                f.flush()
+                os.fsync(f.fileno())
+            elif durability == "batch":
+                unsynced.add(file + ".journal")
+        pending = journal_seq[file] - snapshot_seq.get(file, 0)
+
+    if pending >= journal_compact_after:
+        compact_database(file, records)
+
+# Starts rewriting a .pkl from the current list on another thread. The list is copied first, so the window can carry on changing it.
+# If that file is already being compacted, the list is left for that thread to write once it's done (only the newest, if this happens more than once).
+def compact_database(file, records):
+    with journal_lock:
+        seq = journal_seq.get(file, 0)
+        last_id = highest_ids.get(file, 0)
+        records = list(records)
+        if file in compacting:
+            compact_next[file] = (records, seq, last_id)
+            return
+        compacting.add(file)
+    # Not a daemon thread, so closing the program waits for the file to finish writing. This has to be said outright, as threads started by the writer would be daemons like it.
+    thread = threading.Thread(target=write_snapshot, args=(file, records, seq, last_id), daemon=False)
+    compactions[:] = [running for running in compactions if running.is_alive()] + [thread]
+    thread.start()
+
+def write_snapshot(file, records, seq, last_id):
+    try:
+        while True:
+            data = encode_snapshot(records, seq, last_id, file_classes[file])
+            write_atomic(file, lambda f: f.write(data))
+
+            with journal_lock:
+                snapshot_seq[file] = seq
+                if journal_seq.get(file, 0) == seq: # Nothing new was written during the compaction, so the journal can be emptied.
+                    open(file + ".journal", "wb").close()
+                if file not in compact_next:
+                    compacting.discard(file) # Under the same lock as the check, so nothing can be left in compact_next with no thread to write it.
+                    return
+                records, seq, last_id = compact_next.pop(file)
+    except BaseException:
+        with journal_lock:
+            compacting.discard(file)
+            compact_next.pop(file, None) # The journal still has everything that was in it, so nothing is lost, and the next compaction starts from the newest list.
+        raise
+
+# Snapshots can be saved in two formats. "pickle" is the original one. "binary" is this program's own format, which is quicker to read, can't run code when it's opened the way a pickle can, and lets a single record be read without reading the rest of the file.
+# Files in either format are read, whatever this is set to. It only decides the format new snapshots are written in, so files change over as they're next compacted, or all at once with --convert (see convert_database).
+snapshot_format = "binary"
+
+# The binary format is laid out as:
+#   header: "PHDB", format version, record type (see binary_classes), number of fields, number of records, journal seq, last id, and where the columns, text offsets and text heap start, with how many pieces of text there are.
+#   schema: the type (1 whole number, 2 text) and name of each field, in the order their columns are stored.
+#   columns: one column per field, each a fixed size per record, so any one value can be found (and read on its own) without reading anything else. Numbers are stored as they are (8 bytes), text as its number in the offset table (4 bytes).
+#   offset table: where each piece of text starts in the heap, plus where the last one ends. Text 0 stands for None.
+#   text heap: all the text, as UTF-8. Text repeated across records (rooms, species, dates) is only stored once.
+binary_magic = b"PHDB"
+binary_version = 1
+binary_header = struct.Struct("<4sHBBIQQQQQI")
+binary_field = struct.Struct("<B31s")
+binary_classes = [Customer, Pet, Booking]
+number_cell = struct.Struct("<q")
+text_cell = struct.Struct("<I")
+number_fields = ("id", "pet_id", "cust_id") # Stored as whole numbers. Every other field is text.
+
+# Turns a list of records into a snapshot, in snapshot_format. If something doesn't fit the binary schema (e.g. an id that isn't a number), binary_snapshot raises ValueError and it's saved as a pickle instead, so nothing is lost.
+def encode_snapshot(records, seq, last_id, record_class):
+    if snapshot_format == "binary":
+        try:
+            return binary_snapshot(records, seq, last_id, record_class)
+        except ValueError:
+            pass
+    return pickle.dumps(records, pickle.HIGHEST_PROTOCOL) + pickle.dumps({"seq": seq, "last_id": last_id})
+
+def binary_snapshot(records, seq, last_id, record_class):
+    fields = record_class.fields
+    numbers = [field in number_fields for field in fields]
+    columns = bytearray()
+    heap = bytearray()
+    offsets = [0, 0] # Text 0 is None, which takes up no room.
+    text_ids = {None: 0}
+    for field, number in zip(fields, numbers):
+        values = array("q" if number else "I")
+        for record in records:
+            value = getattr(record, field)
+            if number:
+                if type(value) is not int:
+                    raise ValueError(f"{field} {value!r} is not a whole number")
+                values.append(value)
+            else:
+                text_id = text_ids.get(value)
+                if text_id is None:
+                    if type(value) is not str:
+                        raise ValueError(f"{field} {value!r} is not text")
+                    heap += value.encode("utf-8")
+                    text_id = text_ids[value] = len(offsets) - 1
+                    offsets.append(len(heap))
+                values.append(text_id)
+        if sys.byteorder == "big":
+            values.byteswap()
+        columns += values.tobytes()
+
+    schema = b"".join(binary_field.pack(1 if number else 2, field.encode()) for field, number in zip(fields, numbers))
+    columns_at = binary_header.size + len(schema)
+    offsets_at = columns_at + len(columns)
+    heap_at = offsets_at + 4 * len(offsets)
+    header = binary_header.pack(binary_magic, binary_version, binary_classes.index(record_class), len(fields), len(records), seq, last_id, columns_at, offsets_at, heap_at, len(offsets) - 1)
+    return header + schema + columns + struct.pack(f"<{len(offsets)}I", *offsets) + heap
+
+# A binary snapshot, opened with mmap so only the parts of the file actually used get read from the disk. Records are only built when they're asked for (by position or a slice), and are kept so the same record always comes back as the same object.
+# Reading the whole thing (looping through it, or list()) works a column at a time instead, which is quicker than going record by record.
+# This reads the columns as they are in memory, so it expects the same 4 and 8 byte little-endian numbers the file has (true of anything this runs on). Other machines go record by record.
+# on_read is called with each record the first time it's built, e.g. to index it.
+class BinaryTable:
+    def __init__(self, file, on_read=None):
+        self.file = open(file, "rb")
+        self.on_read = on_read
+        self.records = {} # Position -> record, for the ones built so far.
+        self.texts = {} # Text number -> the text, so records share it.
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, kind, field_count, self.count, self.seq, self.last_id, self.columns_at, self.offsets_at, self.heap_at, self.text_count = binary_header.unpack_from(self.data)
+            if magic != binary_magic or version > binary_version:
+                raise ValueError(f"not a version {binary_version} snapshot")
+            self.record_class = binary_classes[kind]
+            columns = {} # Field name -> (where its column starts, its struct).
+            column_at = self.columns_at
+            for i in range(field_count):
+                type_code, name = binary_field.unpack_from(self.data, binary_header.size + i * binary_field.size)
+                columns[name.rstrip(b"\0").decode()] = (column_at, number_cell if type_code == 1 else text_cell)
+                column_at += self.count * (number_cell if type_code == 1 else text_cell).size
+            if column_at != self.offsets_at or self.offsets_at + 4 * (self.text_count + 1) > self.heap_at or self.heap_at > len(self.data):
+                raise ValueError("the file is shorter than its header says")
+        except (struct.error, ValueError, IndexError, OSError) as error:
+            self.close()
+            raise DatabaseDamaged(f"{file} is damaged and could not be read ({error}). It has been left as it is so nothing writes over it. Please restore it from a backup.")
+        # Each of the class's fields is found by name, so a file saved with fields in a different order, or with fields missing, can still be read. Missing ones are left blank.
+        self.layout = [columns.get(field) for field in self.record_class.fields]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(self.count))]
+        return self.record(index)
+
+    def record(self, i):
+        record = self.records.get(i)
+        if record is None:
+            if not 0 <= i < self.count:
+                raise IndexError("record number out of range")
+            fields = []
+            for place in self.layout:
+                if place is None:
+                    fields.append("")
+                elif place[1] is number_cell:
+                    fields.append(number_cell.unpack_from(self.data, place[0] + i * 8)[0])
+                else:
+                    fields.append(self.text(text_cell.unpack_from(self.data, place[0] + i * 4)[0]))
+            record = self.records[i] = self.record_class(*fields)
+            if self.on_read is not None:
+                self.on_read(record)
+        return record
+
+    def text(self, text_id):
+        if text_id == 0:
+            return None
+        text = self.texts.get(text_id)
+        if text is None:
+            start, end = struct.unpack_from("<II", self.data, self.offsets_at + 4 * text_id)
+            text = self.texts[text_id] = str(self.data[self.heap_at + start:self.heap_at + end], "utf-8")
+        return text
+
+    # Every record, built a column at a time: all the text is decoded (and interned) once, each column is read straight out of the file, and the fields are filled in a column at a time.
+    def __iter__(self):
+        if self.records or sys.byteorder == "big" or array("I").itemsize != 4 or array("q").itemsize != 8:
+            return (self.record(i) for i in range(self.count)) # Records already built have to come back as the same objects.
+        offsets = memoryview(self.data)[self.offsets_at:self.offsets_at + 4 * (self.text_count + 1)].cast("I")
+        heap = self.data[self.heap_at:self.heap_at + offsets[-1]]
+        texts = [None] + [sys.intern(str(heap[start:end], "utf-8")) for start, end in zip(offsets[1:], offsets[2:])]
+        offsets.release()
+        record_class = self.record_class
+        records = list(map(record_class.__new__, [record_class] * self.count))
+        for field, place in zip(record_class.fields, self.layout):
+            if place is None:
+                column = [""] * self.count
+            else:
+                cells = memoryview(self.data)[place[0]:place[0] + self.count * place[1].size].cast(place[1].format[-1])
+                column = cells.tolist() if place[1] is number_cell else list(map(texts.__getitem__, cells))
+                cells.release()
+            setter = getattr(record_class, field).__set__
+            for record, value in zip(records, column):
+                setter(record, value)
+        if hasattr(record_class, "parse_dates"):
+            for record in records:
+                record.parse_dates()
+        self.records = dict(enumerate(records))
+        if self.on_read is not None:
+            for record in records:
+                self.on_read(record)
+        return iter(records)
+
+    def close(self):
+        if hasattr(self, "data"):
+            self.data.close()
+        self.file.close()
+
+# Reads a snapshot in either format. Returns the records, the journal seq and the last id.
+def is_binary(file):
+    with open(file, "rb") as f:
+        return f.read(len(binary_magic)) == binary_magic
+
+def read_snapshot(file):
+    with open(file, "rb") as f:
+        if f.read(len(binary_magic)) != binary_magic:
+            f.seek(0)
+            seq = 0
+            last_id = 0
+            unpickler = RecordUnpickler(f)
+            try:
+                try:
+                    records = unpickler.load()
+                except EOFError:
+                    if f.tell() > 0:
+                        raise
+                    return [], 0, 0 # A completely empty file is just a placeholder.
+                try:
+                    info = unpickler.load() # Files written before the journal existed only hold the list.
+                    seq = info["seq"]
+                    last_id = info.get("last_id", 0)
+                except EOFError:
+                    pass
+            except (EOFError, pickle.UnpicklingError, AttributeError, TypeError, KeyError, ValueError) as error:
+                raise DatabaseDamaged(f"{file} is damaged and could not be read ({error}). It has been left as it is so nothing writes over it. Please restore it from a backup.")
+            return records, seq, last_id
+
+    table = BinaryTable(file)
+    try:
+        return list(table), table.seq, table.last_id
+    finally:
+        table.close()
+
+# Storage. Used through the load_ and save_ functions below, so the rest of the program doesn't need to know how the lists are kept.
+# Every list but the archive is read into memory when the program opens, as the search indexes, room checks and schedule need every record. Only the archive is read as it's needed (see ArchiveSegments).
+store = None # The JournalStore, set by open_database().
+
+# The lists that get stored, with the file each one uses.
+database_files = {"customers": customer_file, "pets": pet_file, "bookings": booking_file, "archived_bookings": archived_booking_file}
+
+record_classes = {"customers": Customer, "pets": Pet, "bookings": Booking, "archived_bookings": Booking}
+file_classes = {database_files[name]: record_classes[name] for name in database_files}
+
+# Records are pickled under the name of the module the program was started as, which is normally "__main__". This finds the classes whatever it was called, so the files can still be read when the program is imported instead.
+class RecordUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if module in ("__main__", __name__) and name in ("Customer", "Pet", "Booking"):
+            return globals()[name]
+        return super().find_class(module, name)
+
+def load_record(data):
+    return RecordUnpickler(io.BytesIO(data)).load()
+
+# Checks a record against search conditions, which are (field, test, value). "contains" is a case-insensitive substring match, "equals" has to match exactly.
+def record_matches(record, conditions):
+    for field, test, value in conditions:
+        if test == "contains":
+            if value.lower() not in getattr(record, field).lower():
+                return False
+        elif getattr(record, field) != value:
+            return False
+    return True
+
+# Keeps each list in its own .pkl and journal. Searching is a linear search through the list in memory.
+class JournalStore:
+    archive = None # The ArchiveSegments for archived bookings, once loaded.
+
+    def load(self, name):
+        if name == "archived_bookings":
+            self.archive = ArchiveSegments(archive_folder)
+            return self.archive
+        return read_database(database_files[name])
+
+    def last_id(self, name):
+        if name == "archived_bookings":
+            return self.archive.last_id
+        return highest_ids.get(database_files[name], 0)
+
+    # The database version is kept in a small text file, the same way as the passwords.
+    def version(self):
+        try:
+            with open(version_file, "r") as f:
+                return int(f.readline().strip() or 1)
+        except FileNotFoundError:
+            return 1
+
+    def set_version(self, version):
+        write_atomic(version_file, lambda f: f.write(f"{version}\n"), "w")
+
+    # Saving is split in two (see the background writer). encode runs on the window thread and pickles the record straight away, so later edits can't change what gets written. It returns the change to queue.
+    # A change to the archive rewrites the month it's in instead (see ArchiveSegments).
+    def encode(self, name, record, deleted=False):
+        if name == "archived_bookings":
+            return self.archive.change(self.archive.key(record))
+        if deleted:
+            return ("delete", name, record.id, None)
+        return ("put", name, record.id, pickle.dumps(record, pickle.HIGHEST_PROTOCOL))
+
+    def encode_all(self, name, records):
+        if name == "archived_bookings":
+            return [self.archive.change(key) for key in self.archive.months()]
+        return [("all", name, None, list(records))]
+
+    # Lots of records changed at once (see save_records). Archive months with more than one of them in are only pickled once.
+    def encode_many(self, name, records, deleted=False):
+        if name == "archived_bookings":
+            return [self.archive.change(key) for key in dict.fromkeys(self.archive.key(record) for record in records)]
+        return [self.encode(name, record, deleted) for record in records]
+
+    # write runs on the writer thread with a batch of (op, name, id, encoded record). Changes are collected per file so each journal is opened once, but a full rewrite ("all") has to happen in order, so anything before it is written first.
+    # Records being added go first, then archive months, then records being deleted. A booking being archived is then in the archive before it's taken out of the bookings journal, and one being unarchived is back in the bookings journal before its month is rewritten without it.
+    # So a crash in between can leave a booking in both, but never in neither.
+    def write(self, batch):
+        puts, months, deletes = {}, [], {}
+        for op, name, record_id, payload in batch:
+            if op == "all":
+                self.write_in_order(puts, months, deletes)
+                puts, months, deletes = {}, [], {}
+                compact_database(database_files[name], payload)
+            elif op == "month":
+                months.append((record_id, payload))
+            elif op == "put":
+                puts.setdefault(name, []).append((op, record_id, payload))
+            else:
+                deletes.setdefault(name, []).append((op, record_id, payload))
+        self.write_in_order(puts, months, deletes)
+
+    def write_in_order(self, puts, months, deletes):
+        self.append(puts)
+        for key, payload in months:
+            self.archive.write(key, payload)
+        self.append(deletes)
+
+    def append(self, entries):
+        for name, changes in entries.items():
+            append_journal(database_files[name], record_list(name), changes)
+
+    # Used by the writer when it has nothing else to do. Returns how long until the journals are due an fsync, or None if none need one.
+    def sync_due(self):
+        if not unsynced:
+            return None
+        return max(0, last_fsync + fsync_every - time.monotonic())
+
+    def sync(self, force=False):
+        sync_journals(force)
+
+    # Returns the matching records.
+    def search(self, name, records, conditions):
+        if not conditions:
+            return list(records)
+        return [record for record in records if record_matches(record, conditions)]
+
+# Archived bookings, kept in one file per month (by start date) instead of one big list, as the archive only ever grows. Opening the program only reads a small manifest of how many bookings each month has.
+# A month is read in the first time it's needed, e.g. when the archive window scrolls to it, and is indexed like any other record then. So record_index only has the archived bookings read in so far.
+# It works like a list for the rest of the program (len, slices, append, remove and looping through it), so VirtualList and the registry don't need to know. It's in order of month rather than the order things were archived.
+# Months are small, so a change rewrites the whole month's file. The month is pickled on the window thread (see change) and the file written by the background writer.
+archive_folder = "Database/archive"
+
+class ArchiveSegments:
+    def __init__(self, folder):
+        self.folder = folder
+        self.manifest = os.path.join(folder, "manifest.pkl")
+        self.loaded = {} # Month -> its bookings, for the months read in so far.
+        self.counts = {} # Month -> how many bookings it has, for every month.
+        self.last_id = 0
+        os.makedirs(folder, exist_ok=True)
+
+        # The archive used to be one .pkl like the other lists. It's split up the first time, and the old file left alone as a backup.
+        if not os.path.exists(self.manifest) and os.path.exists(archived_booking_file):
+            self.split(read_database(archived_booking_file), highest_ids.get(archived_booking_file, 0))
+
+        try:
+            with open(self.manifest, "rb") as f:
+                info = pickle.load(f)
+            self.counts, self.last_id = info["counts"], info["last_id"]
+        except FileNotFoundError:
+            pass
+        except (EOFError, pickle.UnpicklingError, KeyError, TypeError):
+            self.counts = {} # Only holds counts, so it can be worked out again from the months themselves below.
+
+        # A month written just before a crash might not have made it into the manifest, so the folder is checked for any it doesn't know about.
+        for file in os.listdir(folder):
+            if file.endswith(".pkl") and file != "manifest.pkl" and file[:-4] not in self.counts:
+                self.month(file[:-4])
+
+    # The month a booking is kept in, e.g. "2025-03". Bookings without a valid start date go in "undated", which comes after every month.
+    def key(self, booking):
+        if booking.start_date is None:
+            return "undated"
+        return f"{booking.start_date.year:04d}-{booking.start_date.month:02d}"
+
+    def file(self, key):
+        return os.path.join(self.folder, key + ".pkl")
+
+    def months(self):
+        return sorted(self.counts)
+
+    # A month's bookings, opening the file the first time. A month saved in the binary format is opened as a BinaryTable, so only the bookings actually shown get read, and they're indexed as they are.
+    def month(self, key):
+        if key not in self.loaded:
+            file = self.file(key)
+            if not os.path.exists(file): # A month nothing has been archived in yet.
+                records, last_id = [], 0
+            elif is_binary(file):
+                records = BinaryTable(file, on_read=lambda record: index_record("archived_bookings", record))
+                last_id = records.last_id
+            else:
+                records, seq, last_id = read_snapshot(file)
+                for record in records:
+                    last_id = max(last_id, record.id)
+                    index_record("archived_bookings", record)
+            self.loaded[key] = records
+            self.counts[key] = len(records)
+            self.last_id = max(self.last_id, last_id)
+        return self.loaded[key]
+
+    # A month as a list that can be changed. A month still in a BinaryTable is read in completely first, and the file closed, as it's about to be replaced.
+    def editable(self, key):
+        month = self.month(key)
+        if isinstance(month, BinaryTable):
+            self.loaded[key] = list(month)
+            month.close()
+        return self.loaded[key]
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    # Only reads in the months the index or slice covers. Like a list, negative indexes count from the end.
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            position = index + len(self) if index < 0 else index
+            for key in self.months():
+                if position < self.counts[key]:
+                    if position < 0:
+                        break
+                    return self.month(key)[position]
+                position -= self.counts[key]
+            raise IndexError("archive index out of range")
+        start, stop, step = index.indices(len(self))
+        if step != 1:
+            return [self[position] for position in range(start, stop, step)]
+        records = []
+        position = 0
+        for key in self.months():
+            if position >= stop:
+                break
+            count = self.counts[key]
+            if position + count > start:
+                records += self.month(key)[max(0, start - position):stop - position]
+            position += count
+        return records
+
+    def __iter__(self):
+        for key in self.months():
+            yield from self.month(key)
+
+    # The bookings read in so far, without reading any more. Used by build_indexes, as months can be read in before it runs (see __init__).
+    def read_so_far(self):
+        for month in self.loaded.values():
+            yield from month.records.values() if isinstance(month, BinaryTable) else month
+
+    def append(self, booking):
+        key = self.key(booking)
+        self.editable(key).append(booking)
+        self.counts[key] += 1
+        self.last_id = max(self.last_id, booking.id)
+
+    def remove(self, booking):
+        key = self.key(booking)
+        self.editable(key).remove(booking)
+        self.counts[key] -= 1
+
+    # The change the writer needs to save a month: the month itself (in snapshot_format) and the manifest, both already encoded.
+    def change(self, key):
+        records = self.editable(key)
+        month = encode_snapshot(records, 0, max((record.id for record in records), default=0), Booking)
+        manifest = pickle.dumps({"counts": dict(self.counts), "last_id": self.last_id})
+        return ("month", "archived_bookings", key, (month, manifest))
+
+    # Runs on the writer thread. The month goes first, so a manifest never counts bookings that aren't there.
+    def write(self, key, payload):
+        month, manifest = payload
+        write_atomic(self.file(key), lambda f: f.write(month))
+        write_atomic(self.manifest, lambda f: f.write(manifest))
+
+    def split(self, records, last_id):
+        months = {}
+        for record in records:
+            months.setdefault(self.key(record), []).append(record)
+            last_id = max(last_id, record.id)
+        for key, month in months.items():
+            data = encode_snapshot(month, 0, max(record.id for record in month), Booking)
+            write_atomic(self.file(key), lambda f: f.write(data))
+        write_atomic(self.manifest, lambda f: pickle.dump({"counts": {key: len(month) for key, month in months.items()}, "last_id": last_id}, f))
+
+# Background writer. Saving used to happen inside the button's command, so the window froze while the disk caught up. Now the window thread only encodes the change (see JournalStore.encode) and puts it on write_queue.
+# The writer thread takes everything waiting, plus anything else that arrives within write_delay, and writes it as one batch (group commit), so a burst of edits is one write rather than many.
+write_delay = 0.05 # Seconds the writer waits for more changes before writing a batch.
+write_check_every = 200 # Milliseconds between the window checking write_results.
+write_queue = queue.Queue() # (op, name, id, encoded record), op being "put", "delete", "all" or "month" (where the id is the month, see ArchiveSegments).
+write_results = queue.Queue() # ("saved", (changes, seconds taken)) or ("error", message), passed back to the window thread by check_writes.
+write_stats = {"batches": 0, "changes": 0, "errors": 0} # Totals so far, kept up to date by check_writes.
+writer_thread = None
+
+# Called by the save_ functions. With no record, the whole list is rewritten.
+def queue_save(name, records, record=None, deleted=False):
+    if record is None:
+        queue_changes(store.encode_all(name, records))
+    else:
+        queue_changes([store.encode(name, record, deleted)])
+
+def queue_changes(changes):
+    start_writer()
+    for change in changes:
+        write_queue.put(change)
+
+def start_writer():
+    global writer_thread
+    if writer_thread is None:
+        # A daemon thread, as it never finishes by itself. flush_writes runs when the program closes instead, so nothing waiting is lost.
+        writer_thread = threading.Thread(target=run_writer, daemon=True)
+        writer_thread.start()
+
+def run_writer():
+    while True:
+        try:
+            batch = [write_queue.get(timeout=store.sync_due())]
+        except queue.Empty: # Quiet for long enough that the journals are due an fsync.
+            run_sync()
+            continue
+        wait_until = time.monotonic() + write_delay
+        while True:
+            try:
+                batch.append(write_queue.get(timeout=max(0, wait_until - time.monotonic())))
+            except queue.Empty:
+                break
+        try:
+            start = time.perf_counter()
+            store.write(coalesce_writes(batch))
+            store.sync()
+            write_results.put(("saved", (len(batch), time.perf_counter() - start)))
+        except Exception as error: # Kept going after an error, otherwise every later save would be lost as well.
+            write_results.put(("error", str(error)))
+        finally:
+            for change in batch:
+                write_queue.task_done()
+
+# Only the last change to each record in a batch needs writing. A rewrite of the whole list replaces every change to that list before it.
+# Dicts keep the position a key was first added at, so records added in the batch are still written in the order they were added.
+# Archive months are moved to the end instead, as each one carries the manifest as it was then, and the newest manifest has to be the one written last.
+def coalesce_writes(batch):
+    changes = {}
+    for op, name, record_id, payload in batch:
+        if op == "all":
+            for key in [key for key in changes if key[0] == name]:
+                del changes[key]
+        elif op == "month":
+            changes.pop((name, record_id), None)
+        changes[(name, record_id)] = (op, name, record_id, payload)
+    return list(changes.values())
+
+# Waits until everything queued has been written. Used before closing, and anywhere that needs the files to be up to date.
+def flush_writes():
+    if writer_thread is not None:
+        write_queue.join()
+        store.sync(force=True)
+    # By the time atexit runs, Python has stopped waiting for threads, so any compaction still going is waited for here.
+    while compactions:
+        compactions.pop().join()
+
+def run_sync():
+    try:
+        store.sync()
+    except OSError as error:
+        write_results.put(("error", str(error)))
+
+# Runs on the window thread every write_check_every. Errors are shown here, since message boxes can't be opened from the writer thread.
+def check_writes():
+    while True:
+        try:
+            result, detail = write_results.get_nowait()
+        except queue.Empty:
+            break
+        if result == "error":
+            write_stats["errors"] += 1
+            messagebox.showerror("Save Failed", f"Some changes could not be saved:\n{detail}")
+        else:
+            changes, seconds = detail
+            write_stats["batches"] += 1
+            write_stats["changes"] += changes
+            note_timing("write batch", seconds)
+    root.after(write_check_every, check_writes)
+
+atexit.register(flush_writes)
+
+# Rewrites every saved list in the given format straight away, rather than waiting for each one's next compaction. Run as "python PetHotelProg.py --convert binary" (or pickle).
+def convert_database(to_format):
+    global snapshot_format
+    snapshot_format = to_format
+    for file in (customer_file, pet_file, booking_file):
+        records = read_database(file)
+        flush_writes() # Reading can start a compaction of its own (e.g. to repair ids), which is waited for first, so the converted file is always the one written last.
+        compact_database(file, records)
+    archive = ArchiveSegments(archive_folder)
+    for key in archive.months():
+        archive.write(key, archive.change(key)[3])
+    flush_writes() # Waits for the compactions to finish.
+    # Checked rather than assumed, so a file that didn't get converted is never reported as done.
+    failed = [file for file in [customer_file, pet_file, booking_file] + [archive.file(key) for key in archive.months()] if is_binary(file) != (to_format == "binary")]
+    if failed:
+        raise SystemExit(f"These could not be converted to {to_format}, and have been left as they were: {', '.join(failed)}")
+    for file in (customer_file, pet_file, booking_file):
+        print(f"{file}: {'binary' if is_binary(file) else 'pickle'}")
+    print(f"{archive_folder}: {len(archive.months())} months")
+
+# Opens the store and loads every list. Called once after logging in, as the lists in memory are kept up to date from then on, so the menus don't need to reload them.
+@timed
+def open_database():
+    global store
+    flush_writes() # Anything still queued belongs to the old store.
+    store = JournalStore()
+    load_customers()
+    load_pets()
+    load_bookings()
+    load_archive_bookings()
+    build_indexes()
+    upgrade_database()
+    if root is not None:
+        root.after(write_check_every, check_writes)
+        root.after_idle(auto_archive)
+        if metrics_file is not None:
+            root.after_idle(publish_metrics)
+
+# Record registry. Every add, edit, delete and archive goes through these functions, so the id indexes (and anything else built from the lists) never go out of sync with the lists.
+record_index = {"customers": {}, "pets": {}, "bookings": {}, "archived_bookings": {}} # For each list, id -> record.
+last_ids = {"customers": 0, "pets": 0, "bookings": 0} # Highest id handed out so far. Bookings and archived bookings share ids, as bookings move between them.
+
+def record_list(name):
+    return {"customers": customers, "pets": pets, "bookings": bookings, "archived_bookings": archived_bookings}[name]
+
+def save_record(name, record, deleted=False):
+    {"customers": save_customers, "pets": save_pets, "bookings": save_bookings, "archived_bookings": save_archive_bookings}[name](record, deleted)
+
+# Saves lots of records from one list at once. The same as save_record for each, but the store can combine them, e.g. each archive month is only saved once.
+@timed
+def save_records(name, records, deleted=False):
+    queue_changes(store.encode_many(name, records, deleted))
+
+# Rebuilds every index from the lists. Only needed after loading.
+@timed
+def build_indexes():
+    customer_search.clear()
+    room_availability.clear()
+    booking_dates.clear()
+    schedule_layouts.clear()
+    for columns in booking_columns.values():
+        columns.clear()
+    for name in record_index:
+        record_index[name] = {}
+        if name == "archived_bookings":
+            records = archived_bookings.read_so_far() # The rest are indexed a month at a time as they're read in (see ArchiveSegments).
+        else:
+            records = record_list(name)
+        for record in records:
+            index_record(name, record)
+    last_ids["customers"] = store.last_id("customers")
+    last_ids["pets"] = store.last_id("pets")
+    last_ids["bookings"] = max(store.last_id("bookings"), store.last_id("archived_bookings"))
+
+# Ids only ever go up, so a deleted record's id is never reused by something else.
+def new_id(name):
+    if name == "archived_bookings":
+        name = "bookings"
+    last_ids[name] += 1
+    return last_ids[name]
+
+def index_record(name, record):
+    record_index[name][record.id] = record
+    if name in booking_columns:
+        booking_columns[name].add(record)
+    if name == "customers":
+        customer_search.add(record)
+    elif name == "bookings": # Archived bookings don't take up a room.
+        room_availability.add(record)
+        booking_dates.add(record)
+        forget_schedule_months(record)
+    elif name == "pets":
+        schedule_layouts.clear() # Bars show the pet's name, so any month could have changed.
+
+def unindex_record(name, record):
+    record_index[name].pop(record.id, None)
+    if name in booking_columns:
+        booking_columns[name].remove(record)
+    if name == "customers":
+        customer_search.remove(record)
+    elif name == "bookings":
+        room_availability.remove(record)
+        booking_dates.remove(record)
+        forget_schedule_months(record)
+    elif name == "pets":
+        schedule_layouts.clear()
+
+def add_record(name, record):
+    record_list(name).append(record)
+    index_record(name, record)
+    save_record(name, record)
+    data_changed(name)
+
+# Changes are passed in as keyword arguments, so the record can be taken out of the indexes with its old values and put back in with the new ones.
+# The list is list_name rather than name here, as pets have a name field that gets passed in as a change.
+def update_record(list_name, record, **changes):
+    unindex_record(list_name, record)
+    for field, value in changes.items():
+        record.set(field, value)
+    if isinstance(record, Booking):
+        record.parse_dates() # The dates may have changed.
+    index_record(list_name, record)
+    save_record(list_name, record)
+    data_changed(list_name)
+
+def delete_record(name, record):
+    unindex_record(name, record)
+    record_list(name).remove(record)
+    save_record(name, record, deleted=True)
+    data_changed(name)
+
+# Used for archiving and unarchiving bookings.
+def move_record(source, target, record):
+    delete_record(source, record)
+    add_record(target, record)
+    if source == "archived_bookings":
+        kept_unarchived.add(record.id) # Someone brought it back on purpose, so auto_archive leaves it alone.
+
+# Archives lots of bookings at once, for auto_archive. The same as move_record for each, but the bookings list is filtered once rather than searched for every booking, and everything is saved together.
+@timed
+def archive_records(records):
+    moving = {record.id for record in records}
+    for record in records:
+        unindex_record("bookings", record)
+    bookings[:] = [booking for booking in bookings if booking.id not in moving] # Changed in place, as the menus keep hold of the list.
+    for record in records:
+        archived_bookings.append(record)
+        index_record("archived_bookings", record)
+    save_records("archived_bookings", records) # Archive first, so a crash part way through can't lose a booking.
+    save_records("bookings", records, deleted=True)
+    data_changed("bookings")
+    data_changed("archived_bookings")
+
+# Finished bookings are moved to the archive automatically, once they ended more than archive_after_days ago, so the bookings list only holds current and upcoming stays (and recent ones, in case they need changing).
+# Runs when the program opens and then every archive_every. Finding them uses the date index, so it doesn't go through every booking. Moving a lot at once (e.g. the first time) is done archive_chunk at a time, letting the window carry on in between, and the writing happens on the background writer.
+archive_after_days = 30 # None turns automatic archiving off.
+archive_every = 60 * 60 * 1000 # Milliseconds, so once an hour.
+archive_chunk = 500
+# Bookings auto_archive skips. Ones open in an edit window (id -> how many windows), as archiving would take them out from under it, and ones unarchived since the program was opened, as archiving them again would undo what someone just did.
+bookings_being_edited = {}
+kept_unarchived = set()
+
+# Bookings that should be archived by now. Bookings without valid dates are never in the date index, so they're left for someone to sort out.
+def finished_bookings():
+    if archive_after_days is None:
+        return []
+    last = date.today() - timedelta(days=archive_after_days + 1)
+    return [record_index["bookings"][booking_id] for booking_id in booking_dates.ending(date.min, last) if booking_id not in bookings_being_edited and booking_id not in kept_unarchived]
+
+def auto_archive():
+    finished = finished_bookings()
+    if finished:
+        archive_records(finished[:archive_chunk])
+    if len(finished) > archive_chunk:
+        root.after(10, auto_archive) # More to do, but the window gets a turn first.
+    else:
+        root.after(archive_every, auto_archive)
+
+# Search index for text fields. Each field is lower-cased once when a record is added, and every 3 letter chunk of it (a "trigram") points to the ids of the records containing it.
+# A search only has to check the records that contain every trigram of the search term, rather than going through every record.
+class NgramIndex:
+    def __init__(self, fields, n=3):
+        self.fields = fields
+        self.n = n
+        self.clear()
+
+    def clear(self):
+        self.values = {field: {} for field in self.fields} # field -> id -> lower-case value. Kept so nothing has to be lower-cased again when searching.
+        self.postings = {field: {} for field in self.fields} # field -> trigram -> set of ids.
+
+    def grams(self, text):
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def add(self, record):
+        for field in self.fields:
+            value = str(getattr(record, field)).lower()
+            self.values[field][record.id] = value
+            for gram in self.grams(value):
+                self.postings[field].setdefault(gram, set()).add(record.id)
+
+    # Uses the saved values rather than the record, as the record may have been changed already.
+    def remove(self, record):
+        for field in self.fields:
+            value = self.values[field].pop(record.id, None)
+            if value is None:
+                continue
+            for gram in self.grams(value):
+                ids = self.postings[field].get(gram)
+                if ids is not None:
+                    ids.discard(record.id)
+                    if not ids:
+                        del self.postings[field][gram]
+
+    # Takes {field: search term} and returns the set of ids matching every term, case-insensitively. Passing a set of ids as within only checks those.
+    def search(self, terms, within=None):
+        result = within
+        # Terms at least a trigram long go first, as they can use the postings. Shorter terms then only check what is left.
+        for field, term in sorted(terms.items(), key=lambda item: len(item[1]) < self.n):
+            term = term.lower()
+            values = self.values[field]
+            if len(term) >= self.n:
+                # Intersecting the smallest sets first keeps this quick, and a trigram that no one has means there are no matches.
+                candidates = result
+                for ids in sorted((self.postings[field].get(gram, set()) for gram in self.grams(term)), key=len):
+                    candidates = set(ids) if candidates is None else candidates & ids
+                    if not candidates:
+                        break
+                # Having every trigram doesn't always mean the whole term is there (e.g. "abcab" has both trigrams of "abca" but not "abca" itself), so each one is checked.
+                result = {record_id for record_id in candidates if term in values[record_id]}
+            else:
+                pool = values if result is None else result
+                result = {record_id for record_id in pool if term in values[record_id]}
+            if not result:
+                return set()
+        return result if result is not None else set(self.values[self.fields[0]])
+
+customer_search = NgramIndex(("fname", "sname", "address", "postcode", "email", "phonenum"))
+
+# Search used by the customer menu. Returns the customers matching every term. If the last results are passed in as within, only they are checked (see narrows).
+@timed
+def find_customers(terms, within=None):
+    ids = customer_search.search(terms, None if within is None else {customer.id for customer in within})
+    return [record_index["customers"][record_id] for record_id in sorted(ids)] # Ids only go up, so this is the same order the customers were added in.
+
+# Dates are stored as DD/MM/YYYY text. Returns None for anything that isn't a real date. Splitting it by hand is a lot quicker than strptime, which matters when every booking is read in at once.
+# Most bookings share their dates with others, so each date is only worked out once, and those bookings share the same date object.
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    try:
+        day, month, year = text.split("/")
+        return date(int(year), int(month), int(day))
+    except (AttributeError, ValueError):
+        return None
+
+# Which rooms are booked on which dates, so finding a free room doesn't mean going through every booking.
+# Each room has a list of (start, end, booking id), sorted by start date, with dates as day numbers (date.toordinal()). The end date isn't included, so a room can be booked again from the day the last pet is collected.
+class RoomAvailability:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.stays = {} # room -> sorted list of (start, end, booking id).
+        self.longest = {} # room -> longest stay in days. Anything starting longer ago than that before a date must have ended by then.
+
+    def stay(self, booking):
+        start, end = booking.start_date, booking.end_date
+        if start is None or end is None or end <= start: # Bookings with broken dates can't clash with anything.
+            return None
+        return (start.toordinal(), end.toordinal(), booking.id)
+
+    def add(self, booking):
+        stay = self.stay(booking)
+        if stay is not None:
+            insort(self.stays.setdefault(booking.room, []), stay)
+            self.longest[booking.room] = max(self.longest.get(booking.room, 0), stay[1] - stay[0])
+
+    # Called before a booking is changed, so it still has the dates it was added with.
+    def remove(self, booking):
+        stay = self.stay(booking)
+        if stay is not None:
+            remove_sorted(self.stays.get(booking.room, []), stay)
+
+    # Ids of the bookings in a room that overlap start to end (dates). ignore_id leaves out the booking being edited, so it doesn't clash with itself.
+    def conflicts(self, room, start, end, ignore_id=None):
+        stays = self.stays.get(room, [])
+        start, end = start.toordinal(), end.toordinal()
+        # Only stays starting before the end date can overlap. Going back from there, it stops once they start too early to still be going on at the start date.
+        i = bisect_left(stays, (end,))
+        earliest = start - self.longest.get(room, 0)
+        found = []
+        while i > 0 and stays[i - 1][0] > earliest:
+            i -= 1
+            if stays[i][1] > start and stays[i][2] != ignore_id:
+                found.append(stays[i][2])
+        return found
+
+    # Rooms with nothing booked between the two dates, in the same order as all_rooms.
+    def free_rooms(self, start, end, ignore_id=None):
+        return [room for room in all_rooms if not self.conflicts(room, start, end, ignore_id)]
+
+room_availability = RoomAvailability()
+
+# Takes an entry out of a sorted list, using bisect to find it.
+def remove_sorted(entries, entry):
+    i = bisect_left(entries, entry)
+    if i < len(entries) and entries[i] == entry:
+        del entries[i]
+
+# Bookings in date order, so the schedule and date searches can go straight to the dates they want with bisect, instead of going through (and reading the dates of) every booking.
+class DateIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.by_start = [] # Sorted list of (start, end, booking id), with dates as day numbers.
+        self.by_end = [] # Sorted list of (end, booking id).
+        self.longest = 0 # Longest stay in days, so looking back from a date knows when to stop.
+
+    def add(self, booking):
+        if booking.start_date is None or booking.end_date is None or booking.end_date < booking.start_date:
+            return
+        start, end = booking.start_date.toordinal(), booking.end_date.toordinal()
+        insort(self.by_start, (start, end, booking.id))
+        insort(self.by_end, (end, booking.id))
+        self.longest = max(self.longest, end - start)
+
+    # Like RoomAvailability, this is called before the booking's dates change.
+    def remove(self, booking):
+        if booking.start_date is None or booking.end_date is None or booking.end_date < booking.start_date:
+            return
+        start, end = booking.start_date.toordinal(), booking.end_date.toordinal()
+        remove_sorted(self.by_start, (start, end, booking.id))
+        remove_sorted(self.by_end, (end, booking.id))
+
+    # Ids of the bookings starting from first to last (both dates included).
+    def starting(self, first, last):
+        return [entry[-1] for entry in self.by_start[bisect_left(self.by_start, (first.toordinal(),)):bisect_left(self.by_start, (last.toordinal() + 1,))]]
+
+    # Ids of the bookings ending from first to last.
+    def ending(self, first, last):
+        return [entry[-1] for entry in self.by_end[bisect_left(self.by_end, (first.toordinal(),)):bisect_left(self.by_end, (last.toordinal() + 1,))]]
+
+    # Ids of the bookings on at any point from first to last, including ones that start before or end after, e.g. everything the schedule shows for a month.
+    def between(self, first, last):
+        first = first.toordinal()
+        # Anything that started longer than the longest stay before first has already ended.
+        entries = self.by_start[bisect_left(self.by_start, (first - self.longest,)):bisect_left(self.by_start, (last.toordinal() + 1,))]
+        return [booking_id for start, end, booking_id in entries if end >= first]
+
+booking_dates = DateIndex()
+
+# Bookings kept as columns of numbers as well as the list of objects, for questions about lots of bookings at once, like how full the hotel is or how much each room gets used.
+# Each column is an array of whole numbers, with dates as day numbers and rooms as their position in all_rooms (-1 if it's not there), so even a million bookings only take a few megabytes and no date text is read.
+# With numpy installed, queries work on a whole column at once. Without it they loop over the arrays, which is slower but gives the same answers.
+# Stays are counted by night, from the start date up to the day before the end date, the same as RoomAvailability. Bookings without valid dates are left out.
+# The archive's columns only have the months read in so far (see ArchiveSegments), so looping through archived_bookings first fills them in for questions about the whole history.
+class BookingColumns:
+    columns = ("id", "start", "end", "room", "pet_id", "cust_id")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.data = {column: array("q") for column in self.columns}
+        self.rows = {} # Booking id -> its row.
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, booking):
+        if booking.start_date is None or booking.end_date is None or booking.end_date < booking.start_date:
+            return
+        values = (booking.id, booking.start_date.toordinal(), booking.end_date.toordinal(), room_numbers.get(booking.room, -1), whole_number(booking.pet_id), whole_number(booking.cust_id))
+        self.rows[booking.id] = len(self.data["id"])
+        for column, value in zip(self.columns, values):
+            self.data[column].append(value)
+
+    # The last row is moved into the removed one's place, so nothing else has to shift down.
+    def remove(self, booking):
+        row = self.rows.pop(booking.id, None)
+        if row is None:
+            return
+        last = len(self.data["id"]) - 1
+        if row != last:
+            for column in self.data.values():
+                column[row] = column[last]
+            self.rows[self.data["id"][row]] = row
+        for column in self.data.values():
+            column.pop()
+
+    # A numpy view of a column. It shares the array's memory rather than copying it, so it mustn't be kept, as the array can't grow while a view of it exists.
+    def view(self, column):
+        return numpy.frombuffer(self.data[column], dtype=numpy.int64)
+
+    # Ids of the bookings staying any night from first to last.
+    def staying(self, first, last):
+        first, last = first.toordinal(), last.toordinal()
+        if numpy is not None:
+            return self.view("id")[(self.view("start") <= last) & (self.view("end") > first)].tolist()
+        return [booking_id for booking_id, start, end in zip(self.data["id"], self.data["start"], self.data["end"]) if start <= last and end > first]
+
+    # Number of rooms taken on each night from first to last. Each stay adds one from its first night and takes one away after its last, and a running total of that gives the count for every night.
+    def occupancy(self, first, last):
+        first, days = first.toordinal(), (last - first).days + 1
+        if numpy is not None:
+            start, end = self.view("start"), self.view("end")
+            taken = (start < first + days) & (end > first)
+            changes = numpy.bincount(numpy.clip(start[taken] - first, 0, days), minlength=days + 1)
+            changes -= numpy.bincount(numpy.clip(end[taken] - first, 0, days), minlength=days + 1)
+            return numpy.cumsum(changes[:days]).tolist()
+        changes = [0] * (days + 1)
+        for start, end in zip(self.data["start"], self.data["end"]):
+            if start < first + days and end > first:
+                changes[min(max(start - first, 0), days)] += 1
+                changes[min(max(end - first, 0), days)] -= 1
+        taken = []
+        total = 0
+        for change in changes[:days]:
+            total += change
+            taken.append(total)
+        return taken
+
+    # Nights each room is taken from first to last, in the same order as all_rooms.
+    def room_nights(self, first, last):
+        first, after = first.toordinal(), last.toordinal() + 1
+        if numpy is not None:
+            room = self.view("room")
+            nights = numpy.minimum(self.view("end"), after) - numpy.maximum(self.view("start"), first)
+            used = (nights > 0) & (room >= 0)
+            return numpy.bincount(room[used], weights=nights[used], minlength=len(all_rooms)).astype(int).tolist()
+        totals = [0] * len(all_rooms)
+        for room, start, end in zip(self.data["room"], self.data["start"], self.data["end"]):
+            nights = min(end, after) - max(start, first)
+            if nights > 0 and room >= 0:
+                totals[room] += nights
+        return totals
+
+    # Number of stays starting in each month of a year, January first.
+    def stays_per_month(self, year):
+        month_starts = [date(year, month, 1).toordinal() for month in range(1, 13)] + [date(year + 1, 1, 1).toordinal()]
+        if numpy is not None:
+            start = self.view("start")
+            in_year = start[(start >= month_starts[0]) & (start < month_starts[-1])]
+            return numpy.bincount(numpy.searchsorted(month_starts, in_year, side="right") - 1, minlength=12).tolist()
+        counts = [0] * 12
+        for start in self.data["start"]:
+            if month_starts[0] <= start < month_starts[-1]:
+                counts[bisect_left(month_starts, start + 1) - 1] += 1
+        return counts
+
+room_numbers = {room: number for number, room in enumerate(all_rooms)}
+booking_columns = {"bookings": BookingColumns(), "archived_bookings": BookingColumns()}
+
+# Ids are normally whole numbers already, but very old bookings can have them as text.
+def whole_number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+schedule_layouts = {} # (year, month) -> the bars the schedule shows for that month (see ScheduleCanvas.show). Kept so going back to a month doesn't work it all out again.
+
+# Drops the saved layout of every month a booking is on. Called with its old dates when it's changed or removed, and its new ones when it's added back.
+def forget_schedule_months(booking):
+    if booking.start_date is None or booking.end_date is None:
+        return
+    year, month = booking.start_date.year, booking.start_date.month
+    while (year, month) <= (booking.end_date.year, booking.end_date.month):
+        schedule_layouts.pop((year, month), None)
+        month += 1
+        if month > 12:
+            year += 1
+            month = 1
+
+# Ids of the customers with every word of name in their first name or surname, e.g. "jo smi" finds John Smith. Uses the trigram index, like the customer search.
+def customers_named(name):
+    ids = None
+    for word in name.split():
+        found = customer_search.search({"fname": word}) | customer_search.search({"sname": word})
+        ids = found if ids is None else ids & found
+    return ids or set()
+
+# Like narrows, but for the booking search. The room, customer and pet are "contains" terms. The dates and mode have to be the same as before, including whether they were given at all, so the last results are still in date order.
+def booking_search_narrows(old_terms, new_terms):
+    dates = ("from", "to", "mode")
+    return all(old_terms.get(field) == new_terms.get(field) for field in dates) and narrows(old_terms, new_terms, exact=dates)
+
+# Search used by the booking menu. Any filter can be left out. With dates, overlapping finds every booking on at any point from first to last, otherwise only ones starting on or after first and ending on or before last.
+# Dates go through booking_dates first, so only the bookings in range are looked at, and the rest of the filters only check those.
+# within is the last results when only the room, customer or pet have narrowed (see booking_search_narrows). They already have the right dates, so only the other filters are checked.
+@timed
+def find_bookings(room="", customer="", pet="", first=None, last=None, overlapping=True, within=None):
+    conditions = [("room", "contains", room)] if room else []
+    if within is not None:
+        candidates = within
+    elif first is None and last is None:
+        if not customer and not pet:
+            return find_records("bookings", conditions) # Only the room to check, so the store can do it.
+        candidates = bookings
+    else:
+        low = first or date.min # A missing date means no limit on that side.
+        high = last or date.max
+        if overlapping:
+            ids = booking_dates.between(low, high)
+        elif first is not None:
+            ids = [booking_id for booking_id in booking_dates.starting(low, high) if record_index["bookings"][booking_id].end_date <= high]
+        else:
+            ids = booking_dates.ending(low, high)
+        candidates = [record_index["bookings"][booking_id] for booking_id in ids] # In date order, which is more useful than the order they were made in here.
+    if customer:
+        customer_ids = customers_named(customer)
+    if pet:
+        pet_ids = {match.id for match in pets if pet.lower() in match.name.lower()}
+    return [booking for booking in candidates if (not customer or booking.cust_id in customer_ids) and (not pet or booking.pet_id in pet_ids) and record_matches(booking, conditions)]
+
+# Search used by the pet and booking menus, with conditions in the same format as record_matches.
+@timed
+def find_records(name, conditions, within=None):
+    if within is not None:
+        return [record for record in within if record_matches(record, conditions)]
+    return store.search(name, record_list(name), conditions)
+
+# True if the new search terms can only match the same or fewer records than the old ones, so only the old results need checking.
+# That's the case when every old "contains" term is still inside the new one (e.g. "smi" -> "smith"), and exact terms haven't changed.
+def narrows(old_terms, new_terms, exact=()):
+    for field, old in old_terms.items():
+        new = new_terms.get(field, "")
+        if field in exact:
+            if new != old:
+                return False
+        elif old.lower() not in new.lower():
+            return False
+    return True
+
+# The results of a search menu's current search. Kept so scrolling doesn't search again, and typing more of a search only checks the last results.
+# find(terms, within) does the search, within being the last results when the new terms narrow the old ones (see narrows), otherwise None. Searches that can't reuse the last results are given narrows=None.
+class SearchResults:
+    def __init__(self, everything, find, narrows=None):
+        self.everything = everything # Returns the whole list, shown when there's no search.
+        self.find = find
+        self.narrows = narrows
+        self.terms = {} # Search terms currently in use. Empty when no search is given.
+        self.matches = None # Records matching terms, or None when every record is shown.
+
+    # Returns False if the terms haven't changed, so there's nothing to update.
+    def search(self, terms):
+        if terms == self.terms:
+            return False
+        if not terms:
+            self.matches = None
+        elif self.matches is not None and self.narrows is not None and self.narrows(self.terms, terms):
+            self.matches = self.find(terms, self.matches)
+        else:
+            self.matches = self.find(terms, None)
+        self.terms = terms
+        return True
+
+    # Called when the list changes. The last results are thrown away and the search run again, so records added or edited since then show up (or drop out) like they should.
+    def refresh(self):
+        if self.terms:
+            self.matches = self.find(self.terms, None)
+
+    def forget(self, record):
+        if self.matches is not None and record in self.matches:
+            self.matches.remove(record)
+
+    def shown(self):
+        return self.everything() if self.matches is None else self.matches
+
+search_delay = 100 # How long (in ms) typing has to stop for before a live search runs.
+
+# Live search for the search menus. Each change restarts a short timer using after(), so the search runs once typing stops, rather than once per letter.
+class LiveSearch:
+    def __init__(self, widget, run):
+        self.widget = widget
+        self.run = run
+        self.pending = None
+
+    def changed(self, *args): # trace_add passes in details about the variable, which aren't needed.
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+        self.pending = self.widget.after(search_delay, self.now)
+
+    # Runs the search straight away. Used by the search buttons as well.
+    def now(self):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+        self.run()
+
+# Brings databases saved by older versions of the program up to date. Version 1 bookings stored the customer and pet as positions in their lists, rather than their ids.
+def upgrade_database():
+    version = store.version()
+    if version < 2:
+        for booking in bookings + list(archived_bookings):
+            if 0 <= int(booking.cust_id) < len(customers):
+                booking.cust_id = customers[int(booking.cust_id)].id
+            if 0 <= int(booking.pet_id) < len(pets):
+                booking.pet_id = pets[int(booking.pet_id)].id
+        save_bookings()
+        save_archive_bookings()
+    if version < 3: # Records used to be pickled with a dict each (see Record). They still load, but are rewritten in the smaller format.
+        save_customers() # The archive is rewritten anyway when it's split into months (see ArchiveSegments).
+        save_pets()
+        save_bookings()
+    if version < database_version:
+        flush_writes() # The rewritten lists have to be saved before the version says they are.
+        store.set_version(database_version)
+
 # Load and Save functions for customers, pets and bookings. Handles scenarios where files do not exist, although this isn't recommended and should never occur under normal use.
+# Save functions take the record that changed, and whether it was deleted. Calling them with nothing rewrites the whole list instead. Either way the write happens on the background writer (see queue_save).
+@timed
 def load_pets():
     global pets
-    try:
-        with open(pet_file, "rb") as file:
-            pets = pickle.load(file)
-    except (FileNotFoundError, EOFError):
-        pets = []
+    pets = store.load("pets")
 
-def save_pets():
-    with open(pet_file, "wb") as file:
-        pickle.dump(pets, file)
+@timed
+def save_pets(record=None, deleted=False):
+    queue_save("pets", pets, record, deleted)
 
+@timed
 def load_customers():
     global customers
-    try:
-        with open(customer_file, "rb") as file:
-            customers = pickle.load(file)
-    except (FileNotFoundError, EOFError):
-        customers = []
+    customers = store.load("customers")
 
-def save_customers():
-    with open(customer_file, "wb") as file:
-        pickle.dump(customers, file)
+@timed
+def save_customers(record=None, deleted=False):
+    queue_save("customers", customers, record, deleted)
 
+@timed
 def load_bookings():
     global bookings
-    try:
-        with open(booking_file, "rb") as file:
-            bookings = pickle.load(file)
-    except (FileNotFoundError, EOFError):
-        bookings = []
+    bookings = store.load("bookings")
 
-def save_bookings():
-    with open(booking_file, "wb") as file:
-        pickle.dump(bookings, file)
+@timed
+def save_bookings(record=None, deleted=False):
+    queue_save("bookings", bookings, record, deleted)
 
+@timed
 def load_archive_bookings():
     global archived_bookings
-    try:
-        with open(archived_booking_file, "rb") as file:
-            archived_bookings = pickle.load(file)
-    except (FileNotFoundError, EOFError):
-        archived_bookings = []
+    archived_bookings = store.load("archived_bookings")
 
-def save_archive_bookings():
-    with open(archived_booking_file, "wb") as file:
-        pickle.dump(archived_bookings, file)
+@timed
+def save_archive_bookings(record=None, deleted=False):
+    queue_save("archived_bookings", archived_bookings, record, deleted)
 
-# Main Menu. Contains buttons to the other menus. Also loads the relevant lists into memory/program, as each page needs them when creating. 
+# Main Menu. Contains buttons to the other menus. The lists are loaded once when logging in (see open_database), so they don't need loading again here.
 def mainMenu():
-    load_customers()
-    load_pets()
-    load_bookings()
-
-    mainMenuW = tk.Tk()
-    mainMenuW.title("Main Menu")
-    apply_style(mainMenuW)
+    mainMenuW = new_screen()
     insert_image(mainMenuW)
 
-    custB = ttk.Button(mainMenuW,text="Customers", command=lambda: openCustMenu(mainMenuW))
-    petsB = ttk.Button(mainMenuW,text="Pets", command=lambda: openPetMenu(mainMenuW))
-    bookB = ttk.Button(mainMenuW,text="Bookings", command=lambda: openBookMenu(mainMenuW))
-    scheduleB = ttk.Button(mainMenuW,text="Schedule", command=lambda: openScheduleMenu(mainMenuW))
-    settingsB = ttk.Button(mainMenuW,text="⚙️", command=lambda: openSettingsMenu(mainMenuW)) # Emoticon used for easier recognition and visual design, as went over in design.
+    custB = ttk.Button(mainMenuW,text="Customers", command=lambda: show_screen("customers"))
+    petsB = ttk.Button(mainMenuW,text="Pets", command=lambda: show_screen("pets"))
+    bookB = ttk.Button(mainMenuW,text="Bookings", command=lambda: show_screen("bookings"))
+    scheduleB = ttk.Button(mainMenuW,text="Schedule", command=lambda: show_screen("schedule"))
+    settingsB = ttk.Button(mainMenuW,text="⚙️", command=lambda: show_screen("settings")) # Emoticon used for easier recognition and visual design, as went over in design.
     custB.grid(row=1, column=0, ipadx=40, ipady=20, pady=10, padx=10, sticky='ew')
     petsB.grid(row=2, column=0, ipadx=40, ipady=20, pady=10, padx=10, sticky='ew')
     bookB.grid(row=3, column=0, ipadx=40, ipady=20, pady=10, padx=10, sticky='ew')
     scheduleB.grid(row=4, column=0, ipadx=40, ipady=20, pady=10, padx=10, sticky='ew')
     settingsB.grid(row=4, column=1, ipadx=20, ipady=10, padx=20, pady=20, sticky="se") # Sticky controls which side the buttons stay to.
-    mainMenuW.mainloop()
+    return mainMenuW, None # Nothing on it needs refreshing.
 
-# Customer Menu. Must move start and end positions around, as only 10 entries of the list are shown at once, using the next and previous buttons. Requires the list to be refreshed each time. 
+# Customer Menu. Only the 10 rows that fit are shown at once, and the scrollbar moves through the list (see VirtualList). Requires the list to be refreshed each time. 
 def custMenu():
-    custMenuW = tk.Tk()
-    custMenuW.title("Customers")
-    apply_style(custMenuW)
+    custMenuW = new_screen()
 
-    load_customers()
-    start = 0
-    end = 10
-
-    # Recieves either -1 or 1 to go forward or backwards. 
-    def changePage(pn):
-        nonlocal start, end
+    # Uses the trigram index rather than going through every customer. When the new terms narrow the old ones, only the last results are checked.
+    results = SearchResults(lambda: customers, lambda terms, within: find_customers(terms, within=within), narrows)
 
-        # Change the start and end correctly and in a simpler way.
-        newstart = start + (pn * 10)
-        newend = newstart + 10
-
-        # Prevents errors by quitting before it can go out of bounds.
-        if newstart >= len(customers):  
-            return 
-        if newstart < 0:
-            return
-
-        start = newstart
-        end = newend
-        update_cust()  # Updates list after changing pages. 
-
-    def update_cust(fname=None, sname=None, address=None, postcode=None, email=None, phonenum=None): 
-        # = None allows for having nothing passed in or passing them in. Useful for when no search is given.
-        # Moved to menu. Used to be outside function. Lets me call update inside of it. 
-        def delete_customers(index):
-            cust_index = customers.index(results_customers[index])
-            confirm = messagebox.askyesno("Delete Customer", f"Are you sure you want to delete {customers[cust_index].fname} {customers[cust_index].sname}?")
-            if confirm:
-                del customers[cust_index]
-                save_customers()
-                messagebox.showinfo("Deleted", "Customer was deleted successfully.")
-                update_cust()
+    # Searches using the terms typed in, then goes back to the top of the list.
+    def search_cust(terms):
+        terms = {field: term for field, term in terms.items() if term} # Only the search terms that were filled in are used.
+        if results.search(terms):
+            update_cust(to_top=True)
 
+    # Moved to menu. Used to be outside function. Lets me call update inside of it. 
+    def delete_customers(customer_id):
+        customer = record_index["customers"][customer_id]
+        confirm = messagebox.askyesno("Delete Customer", f"Are you sure you want to delete {customer.fname} {customer.sname}?")
+        if confirm:
+            delete_record("customers", customer)
+            results.forget(customer)
+            messagebox.showinfo("Deleted", "Customer was deleted successfully.")
+            update_cust()
+
+    # One row of the list. Shows first and last name on page.
+    # Commands for editing and deleting. Cid here keeps track of the customer's id to use later if clicked on, which is looked up in the id index. 
+    def customer_row(customer):
+        return (f"{customer.fname} {customer.sname}", [lambda cid=customer.id: editCustomer(cid, custMenuW), lambda cid=customer.id: delete_customers(cid)])
+
+    @timed
+    def update_cust(to_top=False): 
         resultFrame.grid(row=0, column=0, rowspan=10, columnspan=3, padx=10, pady=10, sticky="nsew")
+        custList.refresh(to_top)
 
-        # Clear any previous results
-        for widget in resultFrame.winfo_children(): # Having a frame makes this easier, since I can just destroy everything attached to one. 
-            widget.destroy()
-
-        filtered_customers = []
-
-        # Linear search through each customer and see if they match
-        for customer in customers:
-            match = True  # Fail condition
-
-            # Manually check each search term (and case-insensitive)
-            if fname and (fname.lower() not in customer.fname.lower()):
-                match = False
-            if sname and (sname.lower() not in customer.sname.lower()):
-                match = False
-            if address and (address.lower() not in customer.address.lower()):
-                match = False
-            if postcode and (postcode.lower() not in customer.postcode.lower()):
-                match = False
-            if email and (email.lower() not in customer.email.lower()):
-                match = False
-            if phonenum and (phonenum not in customer.phonenum):
-                match = False
-
-            # If the customer matches all conditions, add them to the filtered list to be shown
-            if match:
-                filtered_customers.append(customer)
-
-        # If no search terms are provided, show all customers
-        if not (fname or sname or address or postcode or email or phonenum):
-            filtered_customers = customers
-
-        # Splice the list to show only 10 entries at a time
-        results_customers = filtered_customers[start:end]  # Now applies to both normal and filtered results
-
-        # Display the filtered customers (split up if necessary)
-        for i, customer in enumerate(results_customers): 
-            # Enumerate returns something as separate objects. Here, it returns the filtered customers as objects with their own indexes, so I can show them.
-            customerL = ttk.Label(resultFrame, text=f"{customer.fname} {customer.sname}") # Shows first and last name on page.
-            customerL.grid(row=i, column=0, pady=2, padx=10, sticky="w")
-            resultFrame.columnconfigure(1, weight=1)
-
-            # Buttons for editing and deleting. Idx here keeps track of the i to use later if clicked on, as an index of that customer to be passed around. 
-            custEditB = ttk.Button(resultFrame, text="∆", style="Edit.TButton", command=lambda idx=i: editCustomer(idx, custMenuW))
-            custEditB.grid(row=i, column=2, sticky="e")
-            custDelB = ttk.Button(resultFrame, text="➖", style="Delete.TButton", command=lambda idx=i: delete_customers(idx))
-            custDelB.grid(row=i, column=3, sticky="e", padx=10, pady=10)
-
-        # Disabled buttons if the end of the list is reached, so nothing unexpected happens. 
-        if start > 0:
-            prevB.config(state=tk.NORMAL) # Tk states must be capitialised.
-        else:
-            prevB.config(state=tk.DISABLED)
-
-        if end < len(filtered_customers):
-            nextB.config(state=tk.NORMAL)
-        else:
-            nextB.config(state=tk.DISABLED)
+    # Used by refresh_screen when the customers have changed.
+    def refresh_cust():
+        results.refresh()
+        update_cust()
 
     # Search menu which pops up in the corner after pressing the search button.
     def searchMenu():
@@ -285,21 +1843,24 @@ def custMenu():
 
         if cust_search_menu == False: # Global not ideal, but using alternative would have been too difficult and time consuming. Global unimportant so not very bad, and am unlikely to name a variable this name. 
             searchFrame.grid(row=0, column=5, rowspan=7, padx=10, pady=10)
+            if searchFrame.winfo_children(): # Only built the first time it's opened, so the search terms are kept when it is closed and opened again.
+                cust_search_menu = True
+                return
             searchLab = ttk.Label(searchFrame, text="Search Options")
             fnameLab = ttk.Label(searchFrame, text="First Name: ")
-            fnameEntry = ttk.Entry(searchFrame)
+            fnameEntry = ttk.Entry(searchFrame, textvariable=search_vars["fname"])
             snameLab = ttk.Label(searchFrame, text="Surname: ")
-            snameEntry = ttk.Entry(searchFrame)
+            snameEntry = ttk.Entry(searchFrame, textvariable=search_vars["sname"])
             addressLab = ttk.Label(searchFrame, text="Address: ")
-            addressEntry = ttk.Entry(searchFrame)
+            addressEntry = ttk.Entry(searchFrame, textvariable=search_vars["address"])
             postcodeLab = ttk.Label(searchFrame, text="Postcode: ")
-            postcodeEntry = ttk.Entry(searchFrame)
+            postcodeEntry = ttk.Entry(searchFrame, textvariable=search_vars["postcode"])
             emailLab = ttk.Label(searchFrame, text="Email: ")
-            emailEntry = ttk.Entry(searchFrame)
+            emailEntry = ttk.Entry(searchFrame, textvariable=search_vars["email"])
             phonenumLab = ttk.Label(searchFrame, text="Phone Number: ")
-            phonenumEntry = ttk.Entry(searchFrame)
-            searchButton = ttk.Button(searchFrame, text="🔍", command = lambda: update_cust(fnameEntry.get().strip(), snameEntry.get().strip(), addressEntry.get().strip(), postcodeEntry.get().strip(), emailEntry.get().strip(), phonenumEntry.get().strip()))
-            # Sends what you put into the entries, to search the list by in the update function. 
+            phonenumEntry = ttk.Entry(searchFrame, textvariable=search_vars["phonenum"])
+            searchButton = ttk.Button(searchFrame, text="🔍", command=live_search.now)
+            # The list updates as you type (see live_search below). The button searches straight away instead of waiting.
             searchLab.grid(row=0, column=0, columnspan=2, pady=5)
             fnameLab.grid(row=1, column=0, sticky="ne", padx=5)
             snameLab.grid(row=2, column=0, sticky="ne", padx=5)
@@ -320,114 +1881,62 @@ def custMenu():
             searchFrame.grid_forget()
             cust_search_menu = False
 
+    # Each search entry has a variable, and any change to one restarts the live search's timer. Sends what you put into the entries, to search the list by.
+    search_vars = {field: tk.StringVar(custMenuW) for field in ("fname", "sname", "address", "postcode", "email", "phonenum")}
+    live_search = LiveSearch(custMenuW, lambda: search_cust({field: var.get().strip() for field, var in search_vars.items()}))
+    for var in search_vars.values():
+        var.trace_add("write", live_search.changed)
+
     # Frames are defined here but gridded/made visible when needed. Allows for better control over them. 
     searchFrame = ttk.Frame(custMenuW, padding="10", relief="solid", borderwidth=2)
     resultFrame = ttk.Frame(custMenuW, padding="10", relief="solid", borderwidth=2)
+    # If there is no search, all customers are shown.
+    custList = VirtualList(resultFrame, {"column": 0, "pady": 2, "padx": 10, "sticky": "w"}, [("∆", "Edit.TButton", {"column": 2, "sticky": "e"}), ("➖", "Delete.TButton", {"column": 3, "sticky": "e", "padx": 10, "pady": 10})],
+        results.shown, customer_row)
     searchcustB = ttk.Button(custMenuW, text="Search", command=lambda: searchMenu())
     addcustB = ttk.Button(custMenuW, text="Add Customer",command=lambda: addCustomer(custMenuW))
-    mainmenuB = ttk.Button(custMenuW, text="Return",command=lambda: openMainMenu(custMenuW))
-    prevB = ttk.Button(custMenuW, text = "◀", command= lambda: changePage(-1)) # Lets me go back and forth between pages using one function.
-    prevB.grid(row = 11, column = 0, sticky="w", padx=10, pady=10)
-    nextB = ttk.Button(custMenuW, text = "▶", command= lambda: changePage(1))
-    nextB.grid(row = 11, column = 2, sticky="e", padx=10, pady=10)
+    mainmenuB = ttk.Button(custMenuW, text="Return",command=lambda: show_screen("main"))
 
     searchcustB.grid(row = 0, column = 3, sticky="nsew", padx=10, pady=10), addcustB.grid(row = 12, column = 0, pady = 10, padx = 10, sticky="nsew"), mainmenuB.grid(row = 12, column = 1, pady = 10, padx = 10, sticky="nsew")
     update_cust()
-    custMenuW.mainloop()
+    return custMenuW, refresh_cust
 
-# Pets Menu. Must move start and end positions around, as only 10 entries of the list are shown at once, using the next and previous buttons. Requires the list to be refreshed each time. 
+# Pets Menu. Scrolls through the list the same way as the customer menu. Requires the list to be refreshed each time. 
 def petMenu():
-    petMenuW = tk.Tk()
-    petMenuW.title("Pets")
-    apply_style(petMenuW)
+    petMenuW = new_screen()
 
-    load_pets()
-    start = 0
-    end = 10
+    # Same as the customer menu, but goes through the store's search. Name and species are case-insensitive, but the age has to match exactly.
+    def find_pets(terms, within):
+        return find_records("pets", [(field, "equals" if field == "age" else "contains", term) for field, term in terms.items()], within=within)
 
-    # Receives either -1 or 1 to go forward or backwards.
-    def changePage(pn):
-        nonlocal start, end
+    results = SearchResults(lambda: pets, find_pets, lambda old, new: narrows(old, new, exact=("age",)))
 
-        # Change the start and end correctly and simpler.
-        newstart = start + (pn * 10)
-        newend = newstart + 10
+    def search_pet(terms):
+        terms = {field: term for field, term in terms.items() if term}
+        if results.search(terms):
+            update_pet(to_top=True)
 
-        # Prevents errors by quitting before it can go out of bounds
-        if newstart >= len(pets):
-            return
-        if newstart < 0:
-            return
+    def delete_pets(pet_id):
+        pet = record_index["pets"][pet_id]
+        confirm = messagebox.askyesno("Delete Pet", f"Are you sure you want to delete {pet.name} {pet.species}?")
+        if confirm:
+            delete_record("pets", pet)
+            results.forget(pet)
+            messagebox.showinfo("Deleted", "Pet was deleted successfully.")
+            update_pet()
 
-        start = newstart
-        end = newend
-        update_pet()  # Updates list after changing pages.
+    # Commands for editing and deleting. Pid here keeps track of the pet's id to use later if clicked on, which is looked up in the id index.
+    def pet_row(pet):
+        return (f"{pet.name} ({pet.species})", [lambda pid=pet.id: editPet(pid, petMenuW), lambda pid=pet.id: delete_pets(pid)])
 
-    def update_pet(name=None, species=None, age=None):
-        def delete_pets(index):
-            pet_index = pets.index(results_pets[index])
-            confirm = messagebox.askyesno("Delete Pet", f"Are you sure you want to delete {pets[pet_index].name} {pets[pet_index].species}?")
-            if confirm:
-                del pets[pet_index]
-                save_pets()
-                messagebox.showinfo("Deleted", "Pet was deleted successfully.")
-                update_pet()
-        # = None allows for having nothing passed in, and passing them in. Useful for when no search is given.
+    @timed
+    def update_pet(to_top=False):
         resultFrame.grid(row=0, column=0, rowspan=10, columnspan=3, padx=10, pady=10, sticky="nsew")
+        petList.refresh(to_top)
 
-        # Clear any previous results
-        for widget in resultFrame.winfo_children():  # Having a frame makes this easier, since I can just destroy everything attached to one.
-            widget.destroy()
-
-        filtered_pets = []
-
-        # Linear search through each pet and see if they match
-        for pet in pets:
-            match = True  # Fail condition
-
-            # Manually check each search term (and case-insensitive)
-            if name and (name.lower() not in pet.name.lower()):
-                match = False
-            if species and (species.lower() not in pet.species.lower()):
-                match = False
-            if age and (age != pet.age):
-                match = False
-
-            # If the pet matches all conditions, add them to the filtered list to be shown
-            if match:
-                filtered_pets.append(pet)
-
-        # If no search terms are provided, show all pets
-        if not (name or species or age):
-            filtered_pets = pets
-
-        # Splice the list to show only 10 entries at a time
-        results_pets = filtered_pets[start:end]  # Now applies to both normal and filtered results
-
-        # Display the filtered pets (split up if necessary)
-        for i, pet in enumerate(results_pets):
-            # Enumerate returns something as separate objects. Here, it returns the filtered pets as objects with their own indexes, so I can show them.
-            petL = ttk.Label(resultFrame, text=f"{pet.name} ({pet.species})")
-            petL.grid(row=i, column=0, pady=2, padx=10, sticky="w")
-
-            resultFrame.columnconfigure(1, weight=1)
-
-            # Buttons for editing and deleting. Idx here keeps track of the i to use later if clicked on, as an index of that pet to be passed around.
-            petEditB = ttk.Button(resultFrame, text="∆", style="Edit.TButton", command=lambda idx=i: editPet(idx, petMenuW))
-            petEditB.grid(row=i, column=2, sticky="e")
-            petDelB = ttk.Button(resultFrame, text="➖", style="Delete.TButton", command=lambda idx=i: delete_pets(idx))
-            petDelB.grid(row=i, column=3, sticky="e", padx=10, pady=10)
-
-        # Disabled buttons if the end of the list is reached, so nothing unexpected happens.
-        if start > 0:
-            prevB.config(state=tk.NORMAL)
-        else:
-            prevB.config(state=tk.DISABLED)
-
-        if end < len(filtered_pets):
-            nextB.config(state=tk.NORMAL)
-        else:
-            nextB.config(state=tk.DISABLED)
+    def refresh_pet():
+        results.refresh()
+        update_pet()
 
     # Search menu which pops up in the corner after pressing the search button.
     def searchPetsMenu():
@@ -435,15 +1944,18 @@ def petMenu():
 
         if not pet_search_menu:
             searchFrame.grid(row=0, column=5, rowspan=7, padx=10, pady=10)
+            if searchFrame.winfo_children(): # Only built the first time, like the customer one.
+                pet_search_menu = True
+                return
             searchLab = ttk.Label(searchFrame, text="Search Options")
             nameLab = ttk.Label(searchFrame, text="Name: ")
-            nameEntry = ttk.Entry(searchFrame)
+            nameEntry = ttk.Entry(searchFrame, textvariable=search_vars["name"])
             speciesLab = ttk.Label(searchFrame, text="Species: ")
-            speciesEntry = ttk.Entry(searchFrame)
+            speciesEntry = ttk.Entry(searchFrame, textvariable=search_vars["species"])
             ageLab = ttk.Label(searchFrame, text="Age: ")
-            ageEntry = ttk.Entry(searchFrame)
-            searchButton = ttk.Button(searchFrame, text="🔍", command=lambda: update_pet(nameEntry.get().strip(), speciesEntry.get().strip(), ageEntry.get().strip()))
-            # Sends what you put into the entries, to search the list by in the update function.
+            ageEntry = ttk.Entry(searchFrame, textvariable=search_vars["age"])
+            searchButton = ttk.Button(searchFrame, text="🔍", command=live_search.now)
+            # Searches as you type, or straight away with the button.
             searchLab.grid(row=0, column=0, columnspan=2, pady=5)
             nameLab.grid(row=1, column=0, sticky="ne", padx=5)
             speciesLab.grid(row=2, column=0, sticky="ne", padx=5)
@@ -458,54 +1970,34 @@ def petMenu():
             searchFrame.grid_forget()
             pet_search_menu = False
 
+    # Live search, same as the customer menu.
+    search_vars = {field: tk.StringVar(petMenuW) for field in ("name", "species", "age")}
+    live_search = LiveSearch(petMenuW, lambda: search_pet({field: var.get().strip() for field, var in search_vars.items()}))
+    for var in search_vars.values():
+        var.trace_add("write", live_search.changed)
+
     # Frame and button creation and grid. Same reason as customer.
     searchFrame = ttk.Frame(petMenuW, padding="10", relief="solid", borderwidth=2)
     resultFrame = ttk.Frame(petMenuW, padding="10", relief="solid", borderwidth=2)
+    # If nothing is searched for, all pets are shown.
+    petList = VirtualList(resultFrame, {"column": 0, "pady": 2, "padx": 10, "sticky": "w"}, [("∆", "Edit.TButton", {"column": 2, "sticky": "e"}), ("➖", "Delete.TButton", {"column": 3, "sticky": "e", "padx": 10, "pady": 10})],
+        results.shown, pet_row)
     searchpetB = ttk.Button(petMenuW, text="Search", command=lambda: searchPetsMenu())
     addpetB = ttk.Button(petMenuW, text="Add Pet", command=lambda: addPet(petMenuW))
-    mainmenuB = ttk.Button(petMenuW, text="Return", command=lambda: openMainMenu(petMenuW))
-    prevB = ttk.Button(petMenuW, text="◀", command=lambda: changePage(-1))
-    nextB = ttk.Button(petMenuW, text="▶", command=lambda: changePage(1))
+    mainmenuB = ttk.Button(petMenuW, text="Return", command=lambda: show_screen("main"))
 
-    prevB.grid(row=11, column=0, sticky="w", padx=10, pady=10)
-    nextB.grid(row=11, column=2, sticky="e", padx=10, pady=10)
     searchpetB.grid(row=0, column=3, sticky="nsew", padx=10, pady=10)
     addpetB.grid(row=12, column=0, pady=10, padx=10, sticky="nsew")
     mainmenuB.grid(row=12, column=1, pady=10, padx=10, sticky="nsew")
 
     update_pet()
-    petMenuW.mainloop()
-
-# These functions handle changing windows. Sub-windows are handled by Toplevel, but the "main" menus for each part of the program are their own Tk windows. They accept a former window and then send to the window the function is named after, allowing for closing and reopening wherever inside the program.
-def openCustMenu(lastWindow):
-    lastWindow.destroy()
-    custMenu()
-
-def openBookMenu(lastWindow):
-    lastWindow.destroy()
-    bookMenu()
-
-def openPetMenu(lastWindow):
-    lastWindow.destroy()
-    petMenu()
-
-def openMainMenu(lastWindow):
-    lastWindow.destroy()
-    mainMenu()
-    
-def openSettingsMenu(lastWindow):
-    lastWindow.destroy()
-    settings()
-
-def openScheduleMenu(lastWindow):
-    lastWindow.destroy()
-    schedule()
+    return petMenuW, refresh_pet
 
 # Customer validation, used by Add and Edit Customer pages. When editing, an id is passed in, but when creating a new entry, it is not needed. It also takes the window name and error labels, in order to output the correct errors to the correct window.  
 def validateCustomer(fname, sname, address, postcode, email, phonenum, editing, fnameError, snameError, addressError, postcodeError, emailError, phonenumError, window, cust_id=None):
         # Creates customer object and appends it to the customer list, running save_ afterwards to save to file immediately. Success message is shown purely for users benefit, since it doesn't control anything.
         def submitCustomer(fname, sname, address, postcode, email, phonenum, window):
-            customer_id = len(customers) + 1
+            customer_id = new_id("customers")
             new_customer = Customer(
                 customer_id,
                 fname,
@@ -515,21 +2007,14 @@ def validateCustomer(fname, sname, address, postcode, email, phonenum, editing,
                 email,
                 phonenum
             )
-            customers.append(new_customer)
-            save_customers()
+            add_record("customers", new_customer)
             messagebox.showinfo("Success", "Customer added successfully")
             window.destroy()
         
         # Edits pre-existing customer object, running save afterwards to save to file immediately. Same reason for success message.
         def modifyCustomer(fname, sname, address, postcode, email, phonenum, cust_id, window):
-            customers[cust_id].fname = fname
-            customers[cust_id].sname = sname
-            customers[cust_id].address = address
-            customers[cust_id].postcode = postcode
-            customers[cust_id].email = email
-            customers[cust_id].phonenum = phonenum
-            
-            save_customers()
+            update_record("customers", record_index["customers"][cust_id], fname=fname, sname=sname, address=address, postcode=postcode, email=email, phonenum=phonenum)
+
             messagebox.showinfo("Success", "Customer modified successfully")
             window.destroy()
             
@@ -705,8 +2190,6 @@ def addCustomer(window):
     addcustsubmit.grid(row=12, column=0, columnspan=2, pady=10, sticky="nsew")
     cancelcustsubmit.grid(row=13, column=0, columnspan=2, pady=10, sticky="nsew")
 
-    addCustW.mainloop()
-
 # Adding a customer window. Needs window to be topleveled to. 
 def editCustomer(cust_id, window):
     editCustW = tk.Toplevel(window)
@@ -738,12 +2221,13 @@ def editCustomer(cust_id, window):
     phonenumError = ttk.Label(editCustFrame, text="", style="Error.TLabel")
 
     # Pre-fill fields with existing customer data
-    fnameEntry.insert(0, customers[cust_id].fname)
-    snameEntry.insert(0, customers[cust_id].sname)
-    addressEntry.insert(0, customers[cust_id].address)
-    postcodeEntry.insert(0, customers[cust_id].postcode)
-    emailEntry.insert(0, customers[cust_id].email)
-    phonenumEntry.insert(0, customers[cust_id].phonenum)
+    customer = record_index["customers"][cust_id]
+    fnameEntry.insert(0, customer.fname)
+    snameEntry.insert(0, customer.sname)
+    addressEntry.insert(0, customer.address)
+    postcodeEntry.insert(0, customer.postcode)
+    emailEntry.insert(0, customer.email)
+    phonenumEntry.insert(0, customer.phonenum)
 
     # Buttons for submitting. Same reason as previous.
     editcustsubmit = ttk.Button(editCustFrame, text="Submit", command=lambda: validateCustomer(
@@ -781,13 +2265,11 @@ def editCustomer(cust_id, window):
     editcustsubmit.grid(row=12, column=0, columnspan=2, pady=10, sticky="nsew")
     canceleditcustsubmit.grid(row=13, column=0, columnspan=2, pady=10, sticky="nsew")
 
-    editCustW.mainloop()
-
 # Pet validation, used by Add and Edit Pet pages. When editing, an id is passed in, but when creating a new entry, it is not needed. It also takes the window name and error labels, in order to output the correct errors to the correct window.  
 def validatePet(name, age, species, description, diet, add_info, editing, nameError, ageError, speciesError, descriptionError, dietError, add_infoError, window, pet_id=None):
     # Creates a new pet object and appends it to the pets list. Saves to file right after.
     def submitPet(name, age, species, description, diet, add_info, window):
-        pet_id = len(pets) + 1
+        pet_id = new_id("pets")
         new_pet = Pet(
             pet_id,
             name.strip(),
@@ -797,21 +2279,14 @@ def validatePet(name, age, species, description, diet, add_info, editing, nameEr
             diet.strip(),
             add_info.strip()
         )
-        pets.append(new_pet)
-        save_pets()
+        add_record("pets", new_pet)
         messagebox.showinfo("Success", "Pet added successfully")
         window.destroy()
 
     # Modifies an existing pet object. Saves immediately to file.
     def modifyPet(name, age, species, description, diet, add_info, pet_id, window):
-        pets[pet_id].name = name
-        pets[pet_id].age = age
-        pets[pet_id].species = species
-        pets[pet_id].description = description
-        pets[pet_id].diet = diet
-        pets[pet_id].add_info = add_info
+        update_record("pets", record_index["pets"][pet_id], name=name, age=age, species=species, description=description, diet=diet, add_info=add_info)
 
-        save_pets()
         messagebox.showinfo("Success", "Pet modified successfully")
         window.destroy()
 
@@ -972,8 +2447,6 @@ def addPet(window):
     addpetsubmit.grid(row=12, column=0, columnspan=2, pady=10, sticky="nsew")
     cancelpetsubmit.grid(row=13, column=0, columnspan=2, pady=10, sticky="nsew")
 
-    addPetW.mainloop()
-
 # Editing a pet window. Needs window to be topleveled to. 
 def editPet(pet_id, window):
     editPetW = tk.Toplevel(window)
@@ -1004,12 +2477,13 @@ def editPet(pet_id, window):
     add_infoEntry = ttk.Entry(editPetFrame)
     add_infoError = ttk.Label(editPetFrame, text="", style="Error.TLabel")
 
-    nameEntry.insert(0, pets[pet_id].name)
-    ageEntry.insert(0, pets[pet_id].age)
-    speciesEntry.insert(0, pets[pet_id].species)
-    descriptionEntry.insert(0, pets[pet_id].description)
-    dietEntry.insert(0, pets[pet_id].diet)
-    add_infoEntry.insert(0, pets[pet_id].add_info)
+    pet = record_index["pets"][pet_id]
+    nameEntry.insert(0, pet.name)
+    ageEntry.insert(0, pet.age)
+    speciesEntry.insert(0, pet.species)
+    descriptionEntry.insert(0, pet.description)
+    dietEntry.insert(0, pet.diet)
+    add_infoEntry.insert(0, pet.add_info)
 
     # Buttons for submitting, requires error labels as well. 
     editpetsubmit = ttk.Button(editPetFrame, text="Submit", command=lambda: validatePet(
@@ -1044,8 +2518,6 @@ def editPet(pet_id, window):
     editpetsubmit.grid(row=12, column=0, columnspan=2, pady=10, sticky="nsew")
     canceleditpetsubmit.grid(row=13, column=0, columnspan=2, pady=10, sticky="nsew")
 
-    editPetW.mainloop()
-
 # Opens a calendar widget for date selection. Falls back to manual entry if tkcalendar is unavailable.
 def open_calendar(entry):
     try:
@@ -1113,7 +2585,7 @@ def open_calendar(entry):
 def validateBooking(customer_id, pet_id, sdate, edate, dropoff, collect, room, customerError, petError, roomError, sdateError, edateError, dropoffError, collectError, window, editing=False, booking_id=None):
     # Creates a new booking object and appends it to the bookings list. Saves immediately to file.
     def createBooking(customer_id, pet_id, sdate, edate, dropoff, collect, room, window):
-        booking_id = len(bookings) + 1
+        booking_id = new_id("bookings")
         new_booking = Booking(
             booking_id,
             pet_id,
@@ -1124,22 +2596,19 @@ def validateBooking(customer_id, pet_id, sdate, edate, dropoff, collect, room, c
             collect,
             room
         )
-        bookings.append(new_booking)
-        save_bookings()
+        add_record("bookings", new_booking)
         messagebox.showinfo("Success", "Booking created successfully.")
         window.destroy()
 
     # Modifies an existing booking object. Saves immediately to file.
     def modifyBooking(customer_id, pet_id, sdate, edate, dropoff, collect, room, booking_id, window):
-        bookings[booking_id].cust_id = customer_id
-        bookings[booking_id].pet_id = pet_id
-        bookings[booking_id].sdate = sdate
-        bookings[booking_id].edate = edate
-        bookings[booking_id].dropoff = dropoff
-        bookings[booking_id].collect = collect
-        bookings[booking_id].room = room
+        booking = record_index["bookings"].get(booking_id)
+        if booking is None: # Archived or deleted (e.g. from another window) since this one was opened.
+            messagebox.showerror("Booking Not Found", "This booking has been archived or deleted since it was opened, so the changes could not be saved.")
+            window.destroy()
+            return
+        update_record("bookings", booking, cust_id=customer_id, pet_id=pet_id, sdate=sdate, edate=edate, dropoff=dropoff, collect=collect, room=room)
 
-        save_bookings()
         messagebox.showinfo("Success", "Booking modified successfully.")
         window.destroy()
 
@@ -1209,6 +2678,15 @@ def validateBooking(customer_id, pet_id, sdate, edate, dropoff, collect, room, c
             Error_Message += "Invalid End Date format.\n"
             edateError.config(text="Invalid format.")
 
+    # Makes sure the room isn't already booked for any of those nights. Only checked once the room and dates are known to be fine.
+    if not valid_failed:
+        clashes = room_availability.conflicts(room, start_date, end_date, booking_id if editing else None)
+        if clashes:
+            valid_failed = True
+            clash = record_index["bookings"][clashes[0]]
+            Error_Message += f"{room} is already booked from {clash.sdate} to {clash.edate}.\n"
+            roomError.config(text="Already booked for those dates.")
+
     # Validate Dropoff Time. Ensures it's provided.
     if not dropoff.strip(":"):
         valid_failed = True
@@ -1221,7 +2699,7 @@ def validateBooking(customer_id, pet_id, sdate, edate, dropoff, collect, room, c
         Error_Message += "Collection time required.\n"
         collectError.config(text="Required.")
 
-    customer_id = customer_id.split("} ")[-1].split(",")[-1].strip() # Earlier, the names got attached to the entry, so the customer can see them. This removes them.
+    customer_id = customer_id.split("} ")[-1].split(",")[-1].strip() # Earlier, the names got attached to the entry, so the customer can see them. This removes them, leaving the id.
     pet_id = pet_id.split("} ")[-1].split(",")[-1].strip() 
     # Debugging.
     # print(customer_id)
@@ -1230,9 +2708,9 @@ def validateBooking(customer_id, pet_id, sdate, edate, dropoff, collect, room, c
     # If validation passes, either create or modify the booking based on the editing flag.
     if not valid_failed:
         if editing:
-            modifyBooking(int(customer_id)-1, int(pet_id)-1, sdate, edate, dropoff, collect, room, booking_id, window)
+            modifyBooking(int(customer_id), int(pet_id), sdate, edate, dropoff, collect, room, booking_id, window)
         else:
-            createBooking(int(customer_id)-1, int(pet_id)-1, sdate, edate, dropoff, collect, room, window)
+            createBooking(int(customer_id), int(pet_id), sdate, edate, dropoff, collect, room, window)
     else:
         # Show error message if validation fails.
         messagebox.showerror("Validation Error", Error_Message)
@@ -1248,13 +2726,18 @@ def submitBooking(window):
     addBookFrame = ttk.Frame(addBookW, padding="10")
     addBookFrame.grid(row=0, column=0, padx=20, pady=20, sticky="nsew")
             
-    # Lists all unbooked rooms, using the all_rooms global. 
+    # Lists the rooms that are free for the dates entered, using the all_rooms global. Until both dates are filled in, every room is listed.
     def unbooked_rooms():
-        free_rooms = ["Select a Room"] # Default option
-        for room in all_rooms:
-            if room not in [booking.room for booking in bookings]: # Gets rooms that arent booked, from a list of all rooms.
-                free_rooms.append(room)
-        return free_rooms
+        start = parse_date(sdate_var.get().strip())
+        end = parse_date(edate_var.get().strip())
+        if start is None or end is None or end <= start:
+            return ["Select a Room"] + all_rooms # Default option
+        return ["Select a Room"] + room_availability.free_rooms(start, end)
+
+    # Called whenever either date changes. The room chosen is kept if it's still free.
+    def refresh_rooms(*args):
+        free_rooms = unbooked_rooms()
+        roomDrop.set_menu(room_var.get() if room_var.get() in free_rooms else "Select a Room", *free_rooms)
 
     def cust_ids():
         customer_ids = []
@@ -1271,15 +2754,13 @@ def submitBooking(window):
         return pet_ids
 
     # Retrieve available rooms, customers, and pets for the booking.
+    sdate_var = tk.StringVar(addBookW)
+    edate_var = tk.StringVar(addBookW)
     free_rooms = unbooked_rooms()
     customer_ids = cust_ids()
     pets_ids = pet_ids()
 
-    # Check if there are no available rooms, customers, or pets and show appropriate error messages.
-    if not free_rooms:
-        addBookW.destroy()
-        messagebox.showerror("No Rooms Available", "All rooms are currently booked.")
-        return
+    # Check if there are no customers or pets and show appropriate error messages. Rooms are checked once the dates are picked.
 
     if not customers:
         addBookW.destroy()
@@ -1316,7 +2797,7 @@ def submitBooking(window):
     petError.grid(row=4, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
 
     sdateLab = ttk.Label(addBookFrame, text="Start Date: ")
-    sdateEntry = ttk.Entry(addBookFrame, width=15)
+    sdateEntry = ttk.Entry(addBookFrame, width=15, textvariable=sdate_var)
     sdateButton = ttk.Button(addBookFrame, text="Pick a Date", command= lambda: open_calendar(sdateEntry))
     sdateLab.grid(row=5, column=0, sticky="nsew", padx=5, pady=5)
     sdateEntry.grid(row=5, column=1, sticky="nsew", padx=5, pady=5)
@@ -1325,7 +2806,7 @@ def submitBooking(window):
     sdateError.grid(row=6, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
 
     edateLab = ttk.Label(addBookFrame, text="End Date: ")
-    edateEntry = ttk.Entry(addBookFrame, width=15)
+    edateEntry = ttk.Entry(addBookFrame, width=15, textvariable=edate_var)
     edateButton = ttk.Button(addBookFrame, text="Pick a Date", command= lambda: open_calendar(edateEntry))
     edateLab.grid(row=7, column=0, sticky="nsew", padx=5, pady=5)
     edateEntry.grid(row=7, column=1, sticky="nsew", padx=5, pady=5)
@@ -1357,6 +2838,8 @@ def submitBooking(window):
     roomDrop.grid(row=13, column=1, sticky="nsew", padx=5, pady=5)
     roomError = ttk.Label(addBookFrame, text="", style="Error.TLabel")
     roomError.grid(row=14, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+    sdate_var.trace_add("write", refresh_rooms)
+    edate_var.trace_add("write", refresh_rooms)
 
     # Submit button to validate and create the booking.
     addbooksubmit = ttk.Button(addBookFrame, text="Submit", command=lambda: validateBooking(selected_customer.get().strip(), selected_pet.get().strip(), sdateEntry.get().strip(), edateEntry.get().strip(), f"{dropoffHour.get()}:{dropoffMinute.get()}", f"{collectHour.get()}:{collectMinute.get()}", room_var.get(), customerError, petError, roomError, sdateError, edateError, dropoffError, collectError, addBookW))
@@ -1365,9 +2848,6 @@ def submitBooking(window):
     cancelbooksubmit = ttk.Button(addBookFrame, text="Cancel", command=addBookW.destroy)
     cancelbooksubmit.grid(row=16, column=0, columnspan=3, pady=10, sticky="nsew")
 
-    # Start the booking creation window.
-    addBookW.mainloop()
-
 # Lets user edit an existing booking. Opens a pre-filled window for editing.
 def editBooking(book_id, window):  
     editBookW = tk.Toplevel(window)
@@ -1379,13 +2859,17 @@ def editBooking(book_id, window):
     editBookFrame = ttk.Frame(editBookW, padding="10")
     editBookFrame.grid(row=0, column=0, padx=20, pady=20, sticky="nsew")
 
-    # Lists all unbooked rooms, using the all_rooms global.
+    # Same as when creating a booking, but the booking being edited doesn't count, so its own room stays listed.
     def unbooked_rooms():
-        free_rooms = ["Select a Room"] # Default option
-        for room in all_rooms:
-            if room not in [booking.room for booking in bookings]:
-                free_rooms.append(room)
-        return free_rooms
+        start = parse_date(sdate_var.get().strip())
+        end = parse_date(edate_var.get().strip())
+        if start is None or end is None or end <= start:
+            return ["Select a Room"] + all_rooms # Default option
+        return ["Select a Room"] + room_availability.free_rooms(start, end, book_id)
+
+    def refresh_rooms(*args):
+        free_rooms = unbooked_rooms()
+        roomDrop.set_menu(room_var.get() if room_var.get() in free_rooms else "Select a Room", *free_rooms)
 
     def cust_ids():
         customer_ids = []
@@ -1401,16 +2885,14 @@ def editBooking(book_id, window):
             pet_ids.append((f"{pet.name} {pet.species}", pet.id))
         return pet_ids
 
-    # Retrieve available rooms, customers, and pets for the booking.
+    # Retrieve available rooms, customers, and pets for the booking. The dates are filled in from the booking further down.
+    sdate_var = tk.StringVar(editBookW)
+    edate_var = tk.StringVar(editBookW)
     free_rooms = unbooked_rooms()
     customer_ids = cust_ids()
     pets_ids = pet_ids()
 
-    # Check if there are no available rooms, customers, or pets and show appropriate error messages.
-    if not free_rooms:
-        editBookW.destroy()
-        messagebox.showerror("No Rooms Available", "All rooms are currently booked.")
-        return
+    # Check if there are no customers or pets and show appropriate error messages.
 
     if not customers:
         editBookW.destroy()
@@ -1423,14 +2905,28 @@ def editBooking(book_id, window):
         return
 
     # Create dropdowns and input fields for booking details, pre-filled with booking data.
+    booking = record_index["bookings"][book_id]
+
+    # Kept out of auto_archive while the window is open. <Destroy> is also sent for each widget inside the window, so only the window's own counts.
+    def editing_finished(event):
+        if event.widget is editBookW:
+            bookings_being_edited[book_id] -= 1
+            if not bookings_being_edited[book_id]:
+                del bookings_being_edited[book_id]
+
+    bookings_being_edited[book_id] = bookings_being_edited.get(book_id, 0) + 1
+    editBookW.bind("<Destroy>", editing_finished)
     room_var = tk.StringVar(editBookW)
-    room_var.set(bookings[book_id].room)  # Pre-fill
+    room_var.set(booking.room)  # Pre-fill
     
+    # Pre-filled in the same (name, id) format as the dropdown options, so validateBooking can read the id back out. Falls back to the default option if the customer or pet was deleted.
     selected_customer = tk.StringVar(editBookW)
-    selected_customer.set(bookings[book_id].cust_id)
+    customer = record_index["customers"].get(booking.cust_id)
+    selected_customer.set((f"{customer.fname} {customer.sname}", customer.id) if customer else "Select a Customer")
 
     selected_pet = tk.StringVar(editBookW)
-    selected_pet.set(bookings[book_id].pet_id)
+    pet = record_index["pets"].get(booking.pet_id)
+    selected_pet.set((f"{pet.name} {pet.species}", pet.id) if pet else "Select a Pet")
         
     custIDLab = ttk.Label(editBookFrame, text="Customer: ")
     custIDDrop = ttk.OptionMenu(editBookFrame, selected_customer, *customer_ids)
@@ -1447,8 +2943,8 @@ def editBooking(book_id, window):
     petError.grid(row=4, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
 
     sdateLab = ttk.Label(editBookFrame, text="Start Date: ")
-    sdateEntry = ttk.Entry(editBookFrame, width=15)
-    sdateEntry.insert(0, bookings[book_id].sdate)
+    sdateEntry = ttk.Entry(editBookFrame, width=15, textvariable=sdate_var)
+    sdateEntry.insert(0, booking.sdate)
     sdateButton = ttk.Button(editBookFrame, text="Pick a Date", command= lambda: open_calendar(sdateEntry))
     sdateLab.grid(row=5, column=0, sticky="nsew", padx=5, pady=5)
     sdateEntry.grid(row=5, column=1, sticky="nsew", padx=5, pady=5)
@@ -1457,8 +2953,8 @@ def editBooking(book_id, window):
     sdateError.grid(row=6, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
 
     edateLab = ttk.Label(editBookFrame, text="End Date: ")
-    edateEntry = ttk.Entry(editBookFrame, width=15)
-    edateEntry.insert(0, bookings[book_id].edate)
+    edateEntry = ttk.Entry(editBookFrame, width=15, textvariable=edate_var)
+    edateEntry.insert(0, booking.edate)
     edateButton = ttk.Button(editBookFrame, text="Pick a Date", command= lambda: open_calendar(edateEntry))
     edateLab.grid(row=7, column=0, sticky="nsew", padx=5, pady=5)
     edateEntry.grid(row=7, column=1, sticky="nsew", padx=5, pady=5)
@@ -1474,8 +2970,8 @@ def editBooking(book_id, window):
     dropoffMinute.grid(row=9, column=2, sticky="nsew", padx=5, pady=5)
     dropoffError = ttk.Label(editBookFrame, text="", style="Error.TLabel")
     dropoffError.grid(row=10, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
-    dropoffHour.insert(0, bookings[book_id].dropoff.split(":")[0])
-    dropoffMinute.insert(0, bookings[book_id].dropoff.split(":")[1])
+    dropoffHour.insert(0, booking.dropoff.split(":")[0])
+    dropoffMinute.insert(0, booking.dropoff.split(":")[1])
 
     collectLab = ttk.Label(editBookFrame, text="Collection Time: ")
     collectHour = ttk.Spinbox(editBookFrame, from_=0, to=23, width=2, format="%02.0f")
@@ -1485,8 +2981,8 @@ def editBooking(book_id, window):
     collectMinute.grid(row=11, column=2, sticky="nsew", padx=5, pady=5)
     collectError = ttk.Label(editBookFrame, text="", style="Error.TLabel")
     collectError.grid(row=12, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
-    collectHour.insert(0, bookings[book_id].collect.split(":")[0])
-    collectMinute.insert(0, bookings[book_id].collect.split(":")[1])
+    collectHour.insert(0, booking.collect.split(":")[0])
+    collectMinute.insert(0, booking.collect.split(":")[1])
 
     roomLab = ttk.Label(editBookFrame, text="Room: ")
     roomDrop = ttk.OptionMenu(editBookFrame, room_var, *free_rooms)
@@ -1494,6 +2990,9 @@ def editBooking(book_id, window):
     roomDrop.grid(row=13, column=1, sticky="nsew", padx=5, pady=5)
     roomError = ttk.Label(editBookFrame, text="", style="Error.TLabel")
     roomError.grid(row=14, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+    sdate_var.trace_add("write", refresh_rooms)
+    edate_var.trace_add("write", refresh_rooms)
+    refresh_rooms() # The dates were filled in before the traces were added, so the rooms need narrowing down once here.
 
     # Submit button to validate and modify the booking.
     addbooksubmit = ttk.Button(editBookFrame, text="Submit", command=lambda: validateBooking(selected_customer.get().strip(), selected_pet.get().strip(), sdateEntry.get().strip(), edateEntry.get().strip(), f"{dropoffHour.get()}:{dropoffMinute.get()}", f"{collectHour.get()}:{collectMinute.get()}", room_var.get(), customerError, petError, roomError, sdateError, edateError, dropoffError, collectError, editBookW, True, book_id))
@@ -1502,42 +3001,40 @@ def editBooking(book_id, window):
     cancelbooksubmit = ttk.Button(editBookFrame, text="Cancel", command=editBookW.destroy)
     cancelbooksubmit.grid(row=16, column=0, columnspan=3, pady=10, sticky="nsew")
 
-    # Start the booking editing window.
-    editBookW.mainloop()
-
 # Booking Menu, where the user can view, edit, and archive bookings.
 def bookMenu():
-    bookMenuW = tk.Tk()
-    bookMenuW.title("Bookings")
-    apply_style(bookMenuW)
+    bookMenuW = new_screen()
 
-    load_bookings()
-    load_archive_bookings()
-    start = 0
-    end = 10
+    # Dates are read as dates, so 1/2/2025 is the same as 01/02/2025. Typing more of the room, customer or pet only checks the last results.
+    def search_results(terms, within):
+        first = parse_date(terms["from"]) if "from" in terms else None
+        last = parse_date(terms["to"]) if "to" in terms else None
+        if ("from" in terms and first is None) or ("to" in terms and last is None):
+            return [] # A date that isn't valid (or is only half typed) can't match anything.
+        return find_bookings(terms.get("room", ""), terms.get("customer", ""), terms.get("pet", ""), first, last, terms.get("mode") != "Within dates", within=within)
+
+    results = SearchResults(lambda: bookings, search_results, booking_search_narrows)
 
     # Viewing, which creates a simple page out of the id that gets passed in. Also a Toplevel.
-    def view_booking(window, idx, archived=False):
+    def view_booking(window, booking_id, archived=False):
         viewBookW = tk.Toplevel(window)
         viewBookW.title("View Booking")
         apply_style(viewBookW)
         viewBookW.geometry("300x400")
         viewBookW.minsize(300, 400)
 
-        # Select the appropriate booking list using the boolean. 
+        # Select the appropriate booking index using the boolean. 
         if archived:
-            booking = archived_bookings[idx]
+            booking = record_index["archived_bookings"][booking_id]
         else:
-            booking = bookings[idx]
+            booking = record_index["bookings"][booking_id]
 
         # Debugging prints. 
         # print(f"Booking Data: {vars(booking)}")
 
-        # Ensure cust_id and pet_id are integers before accessing the lists, and then accessing the lists. 
-        cust_id = int(booking.cust_id)
-        pet_id = int(booking.pet_id)
-        customer = customers[cust_id]
-        pet = pets[pet_id]
+        # Looks up the customer and pet by id. Either could have been deleted since the booking was made, so that is shown instead.
+        customer = record_index["customers"].get(booking.cust_id)
+        pet = record_index["pets"].get(booking.pet_id)
 
         # UI Labels for Booking Details
         viewBookFrame = ttk.Frame(viewBookW, padding="10", relief="solid", borderwidth=2)
@@ -1548,9 +3045,9 @@ def bookMenu():
 
         # Nothing to enter, so no entries. Just labels.
         bookCustIDLab = ttk.Label(viewBookFrame, text="Customer:")
-        bookCustID = ttk.Label(viewBookFrame, text=f"{customer.fname} {customer.sname}")
+        bookCustID = ttk.Label(viewBookFrame, text=f"{customer.fname} {customer.sname}" if customer else "(Deleted customer)")
         bookPetIDLab = ttk.Label(viewBookFrame, text="Pet:")
-        bookPetID = ttk.Label(viewBookFrame, text=f"{pet.name} ({pet.species})")
+        bookPetID = ttk.Label(viewBookFrame, text=f"{pet.name} ({pet.species})" if pet else "(Deleted pet)")
         bookSdateLab = ttk.Label(viewBookFrame, text="Start Date:")
         bookSdate = ttk.Label(viewBookFrame, text=booking.sdate)
         bookEdateLab = ttk.Label(viewBookFrame, text="End Date:")
@@ -1581,94 +3078,50 @@ def bookMenu():
         returnB = ttk.Button(viewBookW, text="Close", command=viewBookW.destroy)
         returnB.grid(row=8, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
 
-    # Recieves either -1 or 1 to go forward or backwards. 
-    def changePage(pn):
-        nonlocal start, end
-
-        # Change the start and end correctly.
-        newstart = start + (pn * 10)
-        newend = newstart + 10
-
-        # Prevents errors by quitting before it can go out of bounds
-        if newstart >= len(bookings):  
-            return 
-        if newstart < 0:
-            return
-
-        start = newstart
-        end = newend
-        update_bookings()  # Updates list after changing pages. 
-
     # Unique function to bookings, allowing for archival and unarchiving as the archived bookings are their own list for clarity and easier management.
-    def archive_booking(index):
+    def archive_booking(booking_id):
         confirm = messagebox.askyesno("Archive Booking", f"Are you sure you want to archive this booking? It can be retrieved later.")
         if confirm:
-            archived_bookings.append(bookings[index])
-            del bookings[index]
-            save_bookings()
-            save_archive_bookings()
+            booking = record_index["bookings"][booking_id]
+            move_record("bookings", "archived_bookings", booking)
+            results.forget(booking)
             messagebox.showinfo("Archived", "Booking was moved successfully.")
             update_bookings()
 
-    def update_bookings(room=None, sdate=None, edate=None):
-        def delete_booking(index):
-            book_index = bookings.index(results_bookings[index])
-            confirm = messagebox.askyesno("Delete Booking", f"Are you sure you want to delete this booking?")
-            if confirm:
-                del bookings[book_index]
-                save_bookings()
-                messagebox.showinfo("Deleted", "Booking was deleted successfully.")
-                update_bookings()
-        resultFrame.grid(row=0, column=0, rowspan=10, columnspan=3, padx=10, pady=10, sticky="nsew")
-
-        # Clear previous results
-        for widget in resultFrame.winfo_children():
-            widget.destroy()
-
-        filtered_bookings = []
-
-        # Linear search through each booking. Same logic as the rest. 
-        for booking in bookings:
-            match = True
-            if room and (room.lower() not in booking.room.lower()):
-                match = False
-            if sdate and (sdate != booking.sdate):
-                match = False
-            if edate and (edate != booking.edate):
-                match = False
+    # Searches using the terms typed in. Same as the pet menu.
+    def search_bookings(terms):
+        terms = {field: term for field, term in terms.items() if term}
+        if "from" not in terms and "to" not in terms:
+            terms.pop("mode", None) # The mode only matters once a date is given.
+        if results.search(terms):
+            update_bookings(to_top=True)
 
-            if match:
-                filtered_bookings.append(booking)
-
-        if not (room or sdate or edate):
-            filtered_bookings = bookings
-
-        results_bookings = filtered_bookings[start:end]
-
-        for i, booking in enumerate(results_bookings):
-            bookingL = ttk.Label(resultFrame, text=f"{booking.room} {booking.sdate} - {booking.edate}")
-            bookingL.grid(row=i, column=0, pady=10, padx=10)
-
-            resultFrame.columnconfigure(1, weight=1)
+    def delete_booking(booking_id):
+        confirm = messagebox.askyesno("Delete Booking", f"Are you sure you want to delete this booking?")
+        if confirm:
+            booking = record_index["bookings"][booking_id]
+            delete_record("bookings", booking)
+            results.forget(booking)
+            messagebox.showinfo("Deleted", "Booking was deleted successfully.")
+            update_bookings()
 
-            bookingEditB = ttk.Button(resultFrame, text="∆", style="Edit.TButton", command=lambda idx=i: editBooking(idx, bookMenuW))
-            bookingEditB.grid(row=i, column=2, sticky="e", padx=5, pady=10)
-            bookingArchiveB = ttk.Button(resultFrame, text="📦", style="Edit.TButton", command=lambda idx=i: archive_booking(idx))
-            bookingArchiveB.grid(row=i, column=3, sticky="e", padx=5, pady=10)
-            bookingViewB = ttk.Button(resultFrame, text="👁‍🗨", style="Delete.TButton", command=lambda idx=i: view_booking(bookMenuW,idx))
-            bookingViewB.grid(row=i, column=4, sticky="e", padx=5, pady=10)
-            bookingDelB = ttk.Button(resultFrame, text="➖", style="Delete.TButton", command=lambda idx=i: delete_booking(idx))
-            bookingDelB.grid(row=i, column=5, sticky="e", padx=5, pady=10)
+    # Edit, archive, view and delete, in the same order as the buttons in bookList.
+    def booking_row(booking):
+        return (f"{booking.room} {booking.sdate} - {booking.edate}", [
+            lambda bid=booking.id: editBooking(bid, bookMenuW),
+            lambda bid=booking.id: archive_booking(bid),
+            lambda bid=booking.id: view_booking(bookMenuW, bid),
+            lambda bid=booking.id: delete_booking(bid)])
 
-        if start > 0:
-            prevB.config(state=tk.NORMAL)
-        else:
-            prevB.config(state=tk.DISABLED)
+    @timed
+    def update_bookings(to_top=False):
+        resultFrame.grid(row=0, column=0, rowspan=10, columnspan=3, padx=10, pady=10, sticky="nsew")
+        bookList.refresh(to_top)
 
-        if end < len(filtered_bookings):
-            nextB.config(state=tk.NORMAL)
-        else:
-            nextB.config(state=tk.DISABLED)
+    # Also catches bookings auto_archive has moved out from under a search.
+    def refresh_bookings():
+        results.refresh()
+        update_bookings()
     
     def archiveBookings():
         archivedBW = tk.Toplevel(bookMenuW)
@@ -1679,72 +3132,28 @@ def bookMenu():
         archiveFrame = ttk.Frame(archivedBW, padding="10", relief="solid", borderwidth=2)
         archiveFrame.grid(row=0, column=0, rowspan=10, columnspan=3, padx=10, pady=10, sticky="nsew")
 
-        start = 0
-        end = 10
-
         # Split them up as they can only be accessed from different locations. Needed access to update_archive
-        def unarchive_booking(index):
+        def unarchive_booking(booking_id):
             confirm = messagebox.askyesno("Unarchive Booking", f"Are you sure you want to restore this booking? It can be archived again later.")
             if confirm:
-                bookings.append(archived_bookings[index])
-                del archived_bookings[index]
-                save_bookings()
-                save_archive_bookings()
+                move_record("archived_bookings", "bookings", record_index["archived_bookings"][booking_id])
                 messagebox.showinfo("Restored", "Booking was moved successfully.")
                 update_bookings()
                 update_archive_display()
 
-        def update_archive_display():
-            nonlocal start, end
-
-            # Clear previous results
-            for widget in archiveFrame.winfo_children():
-                widget.destroy()
-
-            for i, booking in enumerate(archived_bookings[start:end]):
-                archiveFrame.columnconfigure(1, weight=1)
-                arcbookL = ttk.Label(archiveFrame, text=f"{booking.sdate} - {booking.edate} --- Room: {booking.room}")
-                arcbookL.grid(row=i, column=0, pady=10, padx=10)
-
-                bookViewB = ttk.Button(archiveFrame, text="👁‍🗨", style="Edit.TButton", command=lambda idx=start + i: view_booking(archivedBW, idx, archived=True))
-                bookViewB.grid(row=i, column=1, sticky="e", padx=5, pady=10)
+        # View and unarchive, in the same order as the buttons in archiveList.
+        def archive_row(booking):
+            return (f"{booking.sdate} - {booking.edate} --- Room: {booking.room}", [
+                lambda bid=booking.id: view_booking(archivedBW, bid, archived=True),
+                lambda bid=booking.id: unarchive_booking(bid)])
 
-                bookUnarcB = ttk.Button(archiveFrame, text="📦", style="Delete.TButton", command=lambda idx=start + i: unarchive_booking(idx))
-                bookUnarcB.grid(row=i, column=2, sticky="e", padx=5, pady=10)
-
-            # List buttons. Same logic as before.
-            if start > 0:
-                prevB.config(state=tk.NORMAL)
-            else:
-                prevB.config(state=tk.DISABLED)
-
-            if end < len(archived_bookings):
-                nextB.config(state=tk.NORMAL)
-            else:
-                nextB.config(state=tk.DISABLED)
-
-        def changePage(pn):
-            nonlocal start, end
-
-            # Change the start and end correctly.
-            newstart = start + (pn * 10)
-            newend = newstart + 10
-
-            # Prevents errors by quitting before it can go out of bounds
-            if newstart >= len(archived_bookings):
-                return
-            if newstart < 0:
-                return
-
-            start = newstart
-            end = newend
-            update_archive_display()  # Updates list after changing pages.
-
-        prevB = ttk.Button(archivedBW, text="◀", command=lambda: changePage(-1))
-        nextB = ttk.Button(archivedBW, text="▶", command=lambda: changePage(1))
+        def update_archive_display():
+            archiveList.refresh()
 
-        prevB.grid(row=11, column=0, pady=10, padx=5, sticky="w")
-        nextB.grid(row=11, column=2, pady=10, padx=5, sticky="e")
+        archiveList = VirtualList(archiveFrame, {"column": 0, "pady": 10, "padx": 10}, [
+            ("👁‍🗨", "Edit.TButton", {"column": 1, "sticky": "e", "padx": 5, "pady": 10}),
+            ("📦", "Delete.TButton", {"column": 2, "sticky": "e", "padx": 5, "pady": 10})],
+            lambda: archived_bookings, archive_row)
 
         returnB = ttk.Button(archivedBW, text="Return", command=archivedBW.destroy)
         returnB.grid(row=12, column=0, columnspan=4, pady=10, padx=10, sticky="nsew")
@@ -1756,54 +3165,197 @@ def bookMenu():
 
         if not booking_search_menu:
             searchFrame.grid(row=0, column=5, rowspan=7, padx=10, pady=10)
+            if searchFrame.winfo_children(): # Only built the first time, like the customer one.
+                booking_search_menu = True
+                return
             searchLab = ttk.Label(searchFrame, text="Search Options")
             roomLab = ttk.Label(searchFrame, text="Room: ")
-            roomEntry = ttk.Entry(searchFrame)
-            sdateLab = ttk.Label(searchFrame, text="Start Date: ")
-            sdateEntry = ttk.Entry(searchFrame)
-            edateLab = ttk.Label(searchFrame, text="End Date: ")
-            edateEntry = ttk.Entry(searchFrame)
-            searchButton = ttk.Button(searchFrame, text="Search", command=lambda: update_bookings(roomEntry.get().strip(), sdateEntry.get().strip(), edateEntry.get().strip()))
+            roomEntry = ttk.Entry(searchFrame, textvariable=search_vars["room"])
+            customerLab = ttk.Label(searchFrame, text="Customer: ")
+            customerEntry = ttk.Entry(searchFrame, textvariable=search_vars["customer"])
+            petLab = ttk.Label(searchFrame, text="Pet: ")
+            petEntry = ttk.Entry(searchFrame, textvariable=search_vars["pet"])
+            fromLab = ttk.Label(searchFrame, text="From: ")
+            fromEntry = ttk.Entry(searchFrame, textvariable=search_vars["from"])
+            toLab = ttk.Label(searchFrame, text="To: ")
+            toEntry = ttk.Entry(searchFrame, textvariable=search_vars["to"])
+            # Overlaps finds anything booked at some point between the dates, Within only finds stays completely inside them. Either date can be left empty.
+            modeDrop = ttk.OptionMenu(searchFrame, search_vars["mode"], search_vars["mode"].get(), "Overlaps dates", "Within dates")
+            searchButton = ttk.Button(searchFrame, text="Search", command=live_search.now)
 
             searchLab.grid(row=0, column=0, columnspan=2, pady=5)
             roomLab.grid(row=1, column=0, sticky="ne", padx=5)
-            sdateLab.grid(row=2, column=0, sticky="ne", padx=5)
-            edateLab.grid(row=3, column=0, sticky="ne", padx=5)
+            customerLab.grid(row=2, column=0, sticky="ne", padx=5)
+            petLab.grid(row=3, column=0, sticky="ne", padx=5)
+            fromLab.grid(row=4, column=0, sticky="ne", padx=5)
+            toLab.grid(row=5, column=0, sticky="ne", padx=5)
 
             roomEntry.grid(row=1, column=1, padx=5)
-            sdateEntry.grid(row=2, column=1, padx=5)
-            edateEntry.grid(row=3, column=1, padx=5)
-            searchButton.grid(row=4, column=1, padx=5)
+            customerEntry.grid(row=2, column=1, padx=5)
+            petEntry.grid(row=3, column=1, padx=5)
+            fromEntry.grid(row=4, column=1, padx=5)
+            toEntry.grid(row=5, column=1, padx=5)
+            modeDrop.grid(row=6, column=1, padx=5, sticky="ew")
+            searchButton.grid(row=7, column=1, padx=5)
             booking_search_menu = True
         else:
             searchFrame.grid_forget()
             booking_search_menu = False
 
+    # Live search, same as the customer menu.
+    search_vars = {field: tk.StringVar(bookMenuW) for field in ("room", "customer", "pet", "from", "to", "mode")}
+    search_vars["mode"].set("Overlaps dates")
+    live_search = LiveSearch(bookMenuW, lambda: search_bookings({field: var.get().strip() for field, var in search_vars.items()}))
+    for var in search_vars.values():
+        var.trace_add("write", live_search.changed)
+
     searchFrame = ttk.Frame(bookMenuW, padding="10", relief="solid", borderwidth=2)
     resultFrame = ttk.Frame(bookMenuW, padding="10", relief="solid", borderwidth=2)
+    bookList = VirtualList(resultFrame, {"column": 0, "pady": 10, "padx": 10}, [
+        ("∆", "Edit.TButton", {"column": 2, "sticky": "e", "padx": 5, "pady": 10}),
+        ("📦", "Edit.TButton", {"column": 3, "sticky": "e", "padx": 5, "pady": 10}),
+        ("👁‍🗨", "Delete.TButton", {"column": 4, "sticky": "e", "padx": 5, "pady": 10}),
+        ("➖", "Delete.TButton", {"column": 5, "sticky": "e", "padx": 5, "pady": 10})],
+        results.shown, booking_row)
     searchbookB = ttk.Button(bookMenuW, text="Search", command=lambda: searchBookingsMenu())
     addbookB = ttk.Button(bookMenuW, text="Create Booking",command=lambda: submitBooking(bookMenuW))
     viewArcBookB = ttk.Button(bookMenuW, text="View Archives",command=lambda: archiveBookings())
-    mainmenuB = ttk.Button(bookMenuW, text="Return",command=lambda: openMainMenu(bookMenuW))
-    prevB = ttk.Button(bookMenuW, text="◀", command=lambda: changePage(-1))
-    nextB = ttk.Button(bookMenuW, text="▶", command=lambda: changePage(1))
+    mainmenuB = ttk.Button(bookMenuW, text="Return",command=lambda: show_screen("main"))
 
-    prevB.grid(row=11, column=0, sticky="w", padx=10, pady=10)
-    nextB.grid(row=11, column=2, sticky="e", padx=10, pady=10)
     searchbookB.grid(row=0, column=3, sticky="nsew", padx=10, pady=10)
     addbookB.grid(row=12, column=0, pady=5, padx=5, sticky="nsew")
     viewArcBookB.grid(row=12, column=1, pady=5, padx=5, sticky="nsew")
     mainmenuB.grid(row=12, column=2, pady=5, padx=5, sticky="nsew")
 
     update_bookings()
-    bookMenuW.mainloop()
+    return bookMenuW, refresh_bookings
+
+# Month view for the schedule, drawn on one canvas rather than with a label for every room, day and booking.
+# The rooms and days are only drawn once. Booking bars are kept by booking id, so changing month only moves, adds or removes the bars that are different.
+class ScheduleCanvas:
+    label_width = 70 # Sizes at normal zoom.
+    day_width = 36
+    row_height = 32
+    header_height = 30
+
+    def __init__(self, frame):
+        self.canvas = tk.Canvas(frame, background=prog_colour, highlightthickness=0)
+        yscroll = ttk.Scrollbar(frame, orient="vertical", command=self.canvas.yview)
+        xscroll = ttk.Scrollbar(frame, orient="horizontal", command=self.canvas.xview)
+        self.canvas.config(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        yscroll.grid(row=0, column=1, sticky="ns")
+        xscroll.grid(row=1, column=0, sticky="ew")
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
+
+        self.zoom = 1.0
+        self.font = (system_font, font_size)
+        self.rows = {room: i for i, room in enumerate(all_rooms)} # Room -> row, so finding a booking's row doesn't search all_rooms.
+        self.bars = {} # Booking id -> (rectangle, text, what it shows), where what it shows is (row, start day, end day, text).
+        self.width = self.label_width + 31 * self.day_width
+        self.height = self.header_height + len(all_rooms) * self.row_height
+
+        # Rooms down the side, with a line under each.
+        for room, i in self.rows.items():
+            y = self.header_height + i * self.row_height
+            self.canvas.create_text(8, y + self.row_height / 2, text=room, anchor="w", fill=txt_colour, font=self.font)
+            self.canvas.create_line(0, y + self.row_height, self.width, y + self.row_height, fill=txt_colour)
+        # Days along the top, with a line before each. There are always 31, and the ones a month doesn't have are hidden.
+        self.days = []
+        for day in range(1, 32):
+            x = self.label_width + (day - 1) * self.day_width
+            line = self.canvas.create_line(x, 0, x, self.height, fill=txt_colour)
+            number = self.canvas.create_text(x + self.day_width / 2, self.header_height / 2, text=day, fill=txt_colour, font=self.font)
+            self.days.append((line, number))
+        self.month_days = 31
+        self.canvas.config(scrollregion=(0, 0, self.width, self.height))
+
+        # Wheel scrolls up and down, Shift+wheel scrolls sideways and Ctrl+wheel zooms. Windows and Mac use MouseWheel, Linux uses buttons 4 and 5.
+        for event in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind(event, self.wheel)
+
+    # Where a bar goes, at the current zoom.
+    def bar_coords(self, row, start_day, end_day):
+        left = self.label_width + (start_day - 1) * self.day_width
+        top = self.header_height + row * self.row_height
+        return [value * self.zoom for value in (left + 1, top + 3, left + (end_day - start_day + 1) * self.day_width - 1, top + self.row_height - 3)]
+
+    # Takes the number of days in the month and {booking id: (row, start day, end day, text)} for every booking to show.
+    def show(self, month_days, layout):
+        if month_days != self.month_days:
+            for day, (line, number) in enumerate(self.days, 1):
+                state = "normal" if day <= month_days else "hidden"
+                self.canvas.itemconfig(line, state=state)
+                self.canvas.itemconfig(number, state=state)
+            self.month_days = month_days
+
+        # Bars for bookings that aren't in this month any more.
+        for booking_id in [booking_id for booking_id in self.bars if booking_id not in layout]:
+            rectangle, text, _ = self.bars.pop(booking_id)
+            self.canvas.delete(rectangle, text)
+
+        for booking_id, shown in layout.items():
+            bar = self.bars.get(booking_id)
+            if bar is not None and bar[2] == shown:
+                continue # Already drawn the same, e.g. a booking going over the end of a month.
+            row, start_day, end_day, label = shown
+            coords = self.bar_coords(row, start_day, end_day)
+            if bar is None:
+                rectangle = self.canvas.create_rectangle(*coords, fill="Red", outline="black", width=2)
+                text = self.canvas.create_text(coords[0] + 5, (coords[1] + coords[3]) / 2, text=label, anchor="w", fill=txt_colour, font=self.font)
+            else:
+                rectangle, text, _ = bar
+                self.canvas.coords(rectangle, *coords)
+                self.canvas.coords(text, coords[0] + 5, (coords[1] + coords[3]) / 2)
+                self.canvas.itemconfig(text, text=label)
+            self.bars[booking_id] = (rectangle, text, shown)
+
+    def wheel(self, event):
+        step = -1 if event.num == 4 or event.delta > 0 else 1
+        if event.state & 0x4: # Ctrl
+            self.zoom_at(event, 1.25 if step < 0 else 0.8)
+        elif event.state & 0x1: # Shift
+            self.canvas.xview_scroll(step, "units")
+        else:
+            self.canvas.yview_scroll(step, "units")
+
+    # Zooms between half and 3 times the normal size, keeping whatever is under the mouse in the same place.
+    def zoom_at(self, event, factor):
+        zoom = min(3.0, max(0.5, self.zoom * factor))
+        factor = zoom / self.zoom
+        if factor == 1:
+            return
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        self.canvas.scale("all", 0, 0, factor, factor) # Only moves and stretches the items. The text stays the same size.
+        self.zoom = zoom
+        width, height = self.width * zoom, self.height * zoom
+        self.canvas.config(scrollregion=(0, 0, width, height))
+        self.canvas.xview_moveto((x * factor - event.x) / width)
+        self.canvas.yview_moveto((y * factor - event.y) / height)
+
+# Works out the bars the schedule shows for a month, with rows being room -> row on the schedule. The date index gives just the ones in this month, using the dates already read in.
+@timed
+def month_layout(first_day, last_day, rows):
+    layout = {}
+    for booking_id in booking_dates.between(first_day, last_day):
+        booking = record_index["bookings"][booking_id]
+        row = rows.get(booking.room)
+        if row is None: # Room isn't in all_rooms any more, so there's nowhere to show it.
+            continue
+
+        # Adjust the start and end to fit within the current month. Bookings starting before it start at day 1, and ones ending after it run to the last day.
+        start_day = booking.start_date.day if booking.start_date >= first_day else 1
+        end_day = booking.end_date.day if booking.end_date <= last_day else last_day.day
+
+        # Display the booking, using the pet's name. Looked up by id, so it's still the right pet after others are deleted.
+        pet = record_index["pets"].get(booking.pet_id)
+        layout[booking_id] = (row, start_day, end_day, pet.name if pet else "(Deleted pet)")
+    return layout
 
 # Schedule/Timetable to show bookings visually.
 def schedule():
-    scheduleW = tk.Tk()
-    scheduleW.title("Schedule")
-    apply_style(scheduleW)
-    scheduleW.geometry("1200x750")
+    scheduleW = new_screen()
 
     def get_month_days(month):
         # Returns the number of days in the given month
@@ -1818,49 +3370,28 @@ def schedule():
             else:
                 return 28
 
+    @timed
     def update_schedule():
         # Updates the schedule display for the current month
         monthLab.config(text=month.strftime("%B %Y"))
 
-        # Display all rooms, using the room number as the label and the rooms global. Did not need separate frames, due to borderwidth.
-        for i in range(len(all_rooms)):
-            roomNumLab = ttk.Label(scheduleFrame, text=all_rooms[i], borderwidth=10, relief="solid")
-            roomNumLab.grid(row=i+1, column=0, padx=5, pady=5, sticky="w")
-
-        # Display bookings for the current month
-        for i in range(len(bookings)):
-            # Set start_day and end_day to handle non use cases.
-            start_day = None
-            end_day = None
-            start_date = datetime.strptime(bookings[i].sdate, "%d/%m/%Y")
-            end_date = datetime.strptime(bookings[i].edate, "%d/%m/%Y")
-
-            # Adjust start_date and end_date to fit within the current month
-            if start_date.month == month.month and start_date.year == month.year:
-                # Booking starts in the current month
-                start_day = start_date.day
-            elif start_date < month:
-                # Booking starts before the current month
-                start_day = 1
-
-            if end_date.month == month.month and end_date.year == month.year:
-                # Booking ends in the current month
-                end_day = end_date.day
-            elif end_date > month:
-                # Booking ends after the current month
-                end_day = get_month_days(month)
-
-            # Check if start_day and end_day are both set before trying to display the booking
-            if start_day is not None and end_day is not None:
-                room = all_rooms.index(bookings[i].room)
-
-                # Display the booking
-                #print(int(bookings[i].pet_id))
-                #print(pets[int(bookings[i].pet_id)].name)
-                #print(f"Booking: {pets[int(bookings[i].pet_id)].name} / Start: {start_day}, End: {end_day} / Columnspan: {end_day - start_day}") # Debugging print, lets me see what its using for the label.
-                
-                bookingLab = ttk.Label(scheduleFrame, text=f"{pets[int(bookings[i].pet_id)].name}", background="Red", padding=5, borderwidth=2, relief="solid")
-                bookingLab.grid(row=room+1, column=start_day+1, columnspan=end_day - start_day + 1, sticky="ew")
+        first_day = month.date()
+        last_day = first_day.replace(day=get_month_days(month))
+        # Months already worked out are reused, until a booking on them changes (see forget_schedule_months).
+        layout = schedule_layouts.get((month.year, month.month))
+        if layout is None:
+            layout = schedule_layouts[(month.year, month.month)] = month_layout(first_day, last_day, scheduleView.rows)
+
+        # Only the bars that are different from the last month shown get redrawn.
+        scheduleView.show(last_day.day, layout)
+
+        # How full the hotel is this month, from the booking columns rather than going through each booking.
+        taken = booking_columns["bookings"].occupancy(first_day, last_day)
+        nights = booking_columns["bookings"].room_nights(first_day, last_day)
+        text = f"Occupancy: {sum(taken) / (len(all_rooms) * len(taken)):.0%}, fullest night {max(taken)} of {len(all_rooms)} rooms"
+        if any(nights):
+            text += f", busiest room {all_rooms[nights.index(max(nights))]}"
+        occupancyLab.config(text=text)
 
     def change_month(forward=None): 
         # Allows calling the function without changing the active month, which is needed to start it.
@@ -1884,16 +3415,6 @@ def schedule():
         
         month = month.replace(month=new_month, year=year)
 
-        for widget in scheduleFrame.winfo_children():
-            widget.destroy()
-
-        for i in range(get_month_days(month) + 1):  # Ensure all days are accounted for
-            scheduleFrame.columnconfigure(i, weight=1)
-
-        for i in range(get_month_days(month)):
-            dayLab = ttk.Label(scheduleFrame, text=i + 1)
-            dayLab.grid(row=0, column=i + 2, padx=5, pady=5, sticky="nsew")
-
         update_schedule()
 
     # Gets the first day of the current month
@@ -1911,17 +3432,20 @@ def schedule():
 
     prevB = ttk.Button(headerFrame, text="◀", command=lambda: change_month(False))
     monthLab = ttk.Label(headerFrame, text="", font=(system_font, font_size + 4, "bold"))
-    returnB = ttk.Button(headerFrame, text="Return", command=lambda: openMainMenu(scheduleW))
+    returnB = ttk.Button(headerFrame, text="Return", command=lambda: show_screen("main"))
     nextB = ttk.Button(headerFrame, text="▶", command=lambda: change_month(True))
 
     prevB.grid(row=0, column=0, padx=5, pady=5, sticky="w")
     monthLab.grid(row=0, column=1, pady=5, padx=5, sticky="e")
     returnB.grid(row=0, column=2, padx=5, pady=5, sticky="w") 
     nextB.grid(row=0, column=3, padx=5, pady=5, sticky="e")
+    occupancyLab = ttk.Label(headerFrame, text="")
+    occupancyLab.grid(row=1, column=0, columnspan=4, padx=5, sticky="w")
 
     # Frame for displaying days, rooms and the actual bookings.
     scheduleFrame = ttk.Frame(scheduleW, padding="10", relief="solid", borderwidth=2)
     scheduleFrame.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+    scheduleView = ScheduleCanvas(scheduleFrame) # Days, rooms and bookings are all drawn on this.
 
     # These are responsible for forcing the amount of space the frames take, so the header frame isn't too large for example (which is what will happen if they are removed)
     scheduleW.rowconfigure(0, weight=1)
@@ -1929,12 +3453,22 @@ def schedule():
     scheduleW.rowconfigure(2, weight=10)
     scheduleW.columnconfigure(0, weight=1)
 
-    update_schedule()
-    change_month() # Month function to display the days.
-    scheduleW.mainloop()
+    change_month() # Month function to display the days and bookings.
+    return scheduleW, update_schedule
              
 # Password Menu, which is the first page that the user will see. Takes input password, hashing and compares to existing password in text file.
 def passwordMenu():
+    # Loads the database before the password screen goes, so if a file is damaged the program stays here rather than opening with lists missing.
+    def login():
+        try:
+            open_database()
+        except DatabaseDamaged as error:
+            messagebox.showerror("Database Damaged", str(error))
+            return
+        pwMenuW.destroy()
+        apply_style(root) # Back to the normal size, now the password screen is gone.
+        show_screen("main")
+
     def passCheck():
         password = pwentry.get()
         with open("Database/passwords.txt", "r") as f:
@@ -1951,13 +3485,11 @@ def passwordMenu():
         # Depending on the password entered, the access level will be set to 0 or 1, which is read when the .txt is opened.
         if password_hash == validPw1:
             accessLevel = 0
-            pwMenuW.destroy()
-            mainMenu()
+            login()
             
         elif password_hash == validPw2:
             accessLevel = 1
-            pwMenuW.destroy()
-            mainMenu()
+            login()
     
         else:
             messagebox.showerror("Error", "Incorrect Password!")
@@ -1965,11 +3497,17 @@ def passwordMenu():
             pwentry.delete(0, tk.END) 
             # Deletes the entry box so the user can try again, in most cases the user will want to retype the password again as they cannot see it, so this is a user experience feature.  
 
-    pwMenuW = tk.Tk()
-    pwMenuW.title("Password")
-    apply_style(pwMenuW)
-    pwMenuW.geometry("500x600")
-    pwMenuW.minsize(500, 600)
+    # The one window the whole program runs in. Every screen after this is a frame inside it (see show_screen).
+    global root
+    root = tk.Tk()
+    root.title("Password")
+    root.protocol("WM_DELETE_WINDOW", close_program)
+    configure_styles()
+    apply_style(root)
+    root.geometry("500x600")
+    root.minsize(500, 600)
+    pwMenuW = new_screen()
+    pwMenuW.grid(row=0, column=0, sticky="nsew")
     
     # Image/Logo for aesthetics.
     insert_image(pwMenuW)
@@ -1979,15 +3517,170 @@ def passwordMenu():
     pwerrorlab = ttk.Label(pwMenuW, text="", style="Error.TLabel")
 
     pwlab.grid(row=1, column=0, pady=10, padx=10, sticky="nsew"), pwentry.grid(row=2, column=0, pady=10, padx=10, ipady=10, sticky="nsew"), pwsubmit.grid(row=4, column=0, pady=10, padx=10, sticky="nsew"), pwerrorlab.grid(row=3, column=0, pady=10, sticky="nsew") 
-    pwMenuW.mainloop()
+    root.mainloop()
+
+# Diagnostics shown in the settings screen, so it can be seen when the database is getting too big for the computer it's on.
+diagnostics_every = 1000 # Milliseconds between the diagnostics tab updating, while it's shown.
+
+# Memory the program is using, in bytes. Linux has the current amount in /proc. Elsewhere the most it has used is the closest there is, which macOS gives in bytes and others in KB. None on Windows.
+def memory_use():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def file_size(file):
+    try:
+        return os.path.getsize(file)
+    except OSError:
+        return 0
+
+# Size of each file the lists are saved in. The archive is a folder of files, so it's given as one total, which is 0 until anything has been archived.
+def database_sizes():
+    sizes = {}
+    for name in ("customers", "pets", "bookings"):
+        file = database_files[name]
+        sizes[os.path.basename(file)] = file_size(file)
+        sizes[os.path.basename(file) + ".journal"] = file_size(file + ".journal")
+    sizes["archive"] = sum(file_size(os.path.join(archive_folder, file)) for file in os.listdir(archive_folder)) if os.path.isdir(archive_folder) else 0
+    return sizes
+
+# Number of widgets in each screen, and in each window opened from one. A window opened from a screen is counted on its own rather than as part of the screen.
+def widget_counts():
+    counts = {}
+    def count(widget, window):
+        counts[window] = counts.get(window, 0) + 1
+        for child in widget.winfo_children():
+            count(child, child.title() if isinstance(child, tk.Toplevel) else window)
+    for name, screen in screens.items():
+        count(screen["frame"], f"{screen_titles[name]} screen")
+    return counts
+
+def megabytes(size):
+    return f"{size / 2**20:.1f} MB" if size >= 2**20 else f"{size / 1024:.1f} KB"
+
+# Metrics file, for watching the program from elsewhere (e.g. node exporter's textfile collector, which reads *.prom files from a folder). Turned on by starting the program with --metrics FILE.
+# A background thread writes it every metrics_every, in Prometheus' text format, with the same numbers as JSON next to it (the same name ending .json). Both are written with write_atomic, so nothing reading them sees half a file.
+# The lists, write_stats and timings belong to the window thread, and reading them while it changes them can fail (e.g. a dict changing size while it's looped through). So the window thread copies what's needed into window_metrics (see publish_metrics), and the metrics thread only ever reads that copy.
+metrics_file = None
+metrics_every = 15 # Seconds.
+metrics_thread = None
+window_metrics = {"records": {}, "writes": {"batches": 0, "changes": 0, "errors": 0}, "operations": {}} # Replaced as a whole, never changed, so the metrics thread always sees a complete copy.
+
+def start_metrics(file, every=None):
+    global metrics_file, metrics_every, metrics_thread
+    metrics_file = file
+    if every is not None:
+        metrics_every = every
+    if metrics_thread is None:
+        metrics_thread = threading.Thread(target=run_metrics, daemon=True) # Stopped with the program. Whatever it was writing is left in a .tmp, never half written into the file itself.
+        metrics_thread.start()
+        atexit.register(write_metrics, True) # Once more on the way out, so the last numbers aren't lost.
+
+# Any error (e.g. the folder isn't there) is printed and it's tried again next time, rather than the thread stopping for good.
+def run_metrics():
+    while True:
+        try:
+            write_metrics()
+        except Exception as error:
+            print(f"Metrics could not be written: {error!r}")
+        time.sleep(metrics_every)
+
+# Runs on the window thread every metrics_every, once the database is open.
+def publish_metrics():
+    global window_metrics
+    window_metrics = copy_window_metrics()
+    root.after(int(metrics_every * 1000), publish_metrics)
+
+def metrics_json_file():
+    return os.path.splitext(metrics_file)[0] + ".json"
+
+# The part of the metrics owned by the window thread, so only run on it.
+def copy_window_metrics():
+    operations = {}
+    for name, timing in timings.items():
+        buckets = list(timing["buckets"])
+        total = 0
+        cumulative = []
+        for count in buckets:
+            total += count
+            cumulative.append(total)
+        operations[name] = {"count": total, "sum": timing["total"], "buckets": dict(zip([str(limit) for limit in timing_buckets] + ["+Inf"], cumulative))}
+    return {
+        "records": {name: len(record_list(name)) for name in record_index},
+        "writes": dict(write_stats),
+        "operations": operations,
+    }
+
+# Everything in the metrics file: the window thread's last copy, plus what any thread can read (file sizes, memory, and the write queue, which is made to be shared between threads). Widgets can only be read from the window thread, so they aren't included.
+def collect_metrics(window):
+    return {
+        "timestamp": time.time(),
+        "records": window["records"],
+        "files": database_sizes(),
+        "memory_bytes": memory_use(),
+        "writes": dict(window["writes"], waiting=write_queue.qsize()),
+        "operations": window["operations"],
+    }
+
+def metric_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+# The metrics in Prometheus' text format. Every line is a name, optional {labels}, and a value, with # HELP and # TYPE lines before each metric.
+def prometheus_text(metrics):
+    lines = []
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{metric_label(label)}"' for key, label in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    metric("pethotel_records", "gauge", "Number of records in each list, including the archive.", [({"list": name}, count) for name, count in metrics["records"].items()])
+    metric("pethotel_archive_bytes", "gauge", "Size of the booking archive on disk.", [({}, metrics["files"]["archive"])])
+    metric("pethotel_database_bytes", "gauge", "Size of each database file on disk.", [({"file": file}, size) for file, size in metrics["files"].items()])
+    if metrics["memory_bytes"] is not None:
+        metric("pethotel_memory_bytes", "gauge", "Memory used by the program (the most it has used, where the current amount isn't available).", [({}, metrics["memory_bytes"])])
+    metric("pethotel_write_batches_total", "counter", "Batches of changes saved by the background writer.", [({}, metrics["writes"]["batches"])])
+    metric("pethotel_write_changes_total", "counter", "Changes saved by the background writer.", [({}, metrics["writes"]["changes"])])
+    metric("pethotel_write_errors_total", "counter", "Batches of changes that could not be saved.", [({}, metrics["writes"]["errors"])])
+    metric("pethotel_writes_waiting", "gauge", "Changes waiting to be saved.", [({}, metrics["writes"]["waiting"])])
+    # Histograms have _bucket, _sum and _count lines rather than one value, so they're written out here rather than with metric().
+    lines.append("# HELP pethotel_operation_duration_seconds How long loads, saves, searches, screen refreshes and the writer's batches took.")
+    lines.append("# TYPE pethotel_operation_duration_seconds histogram")
+    for name, operation in sorted(metrics["operations"].items()):
+        for limit, count in operation["buckets"].items():
+            lines.append(f'pethotel_operation_duration_seconds_bucket{{operation="{metric_label(name)}",le="{limit}"}} {count}')
+        lines.append(f'pethotel_operation_duration_seconds_sum{{operation="{metric_label(name)}"}} {operation["sum"]}')
+        lines.append(f'pethotel_operation_duration_seconds_count{{operation="{metric_label(name)}"}} {operation["count"]}')
+    metric("pethotel_metrics_timestamp_seconds", "gauge", "When this file was written, as a Unix time.", [({}, metrics["timestamp"])])
+    return "\n".join(lines) + "\n"
+
+# On the way out the window thread has stopped, so it's safe to take the numbers straight from it (fresh), rather than its last copy.
+def write_metrics(fresh=False):
+    if metrics_file is None:
+        return
+    metrics = collect_metrics(copy_window_metrics() if fresh else window_metrics)
+    text = prometheus_text(metrics)
+    write_atomic(metrics_file, lambda f: f.write(text), "w")
+    write_atomic(metrics_json_file(), lambda f: json.dump(metrics, f, indent=1), "w")
 
 # Settings Menu, which allows the user to change the font, font size and colours of the program.
 def settings():
-    settingsMenuW = tk.Tk()
-    settingsMenuW.title("Settings")
-    apply_style(settingsMenuW)
-    settingsMenuW.geometry("500x600")
-    settingsMenuW.minsize(500, 600)
+    settingsMenuW = new_screen()
+
+    # Puts the new settings into effect. ttk widgets pick up the new styles straight away, but the other screens are built again next time they're opened, as the logo and schedule canvas don't use ttk styles.
+    def restyle():
+        configure_styles()
+        root.configure(background=bg_colour)
+        forget_screens(keep="settings")
 
     # Makes use of tkfont to get the fonts available on the system.
     def get_fonts():
@@ -2003,26 +3696,26 @@ def settings():
             size = 30
         system_font = font
         font_size = size
-        apply_style(settingsMenuW)
+        restyle()
 
     # Functions to change colours, which are saved to different globals but make use of the same colour chooser.
     def choose_progcolour():
         global prog_colour
         colour = colorchooser.askcolor(title = "Choose colour")[1]
         prog_colour = colour
-        apply_style(settingsMenuW)
+        restyle()
 
     def choose_bgcolour():
         global bg_colour
         colour = colorchooser.askcolor(title = "Choose colour")[1]
         bg_colour = colour
-        apply_style(settingsMenuW)
+        restyle()
 
     def choose_txtcolour():
         global txt_colour
         colour = colorchooser.askcolor(title = "Choose colour")[1]
         txt_colour = colour
-        apply_style(settingsMenuW)
+        restyle()
     
     # This is used to change the password, and is only available to owners from the hidden button.
     def passwChange():          
@@ -2038,8 +3731,7 @@ def settings():
                 if hashed_adminpassword is not None:  
                     lines[1] = hashed_adminpassword + "\n"
 
-                with open("Database/passwords.txt", "w") as f:
-                    f.writelines(lines)
+                write_atomic("Database/passwords.txt", lambda f: f.writelines(lines), "w") # Written safely, as a half-written password file would lock everyone out.
                 messagebox.showinfo("Success", "Password(s) changed successfully.")
                 pwtop.destroy()
 
@@ -2120,7 +3812,9 @@ def settings():
     size_var = tk.IntVar(value=font_size)
     font_var = tk.StringVar(value="Arial")
     
-    settingsFrame = ttk.Frame(settingsMenuW, padding="10", relief="solid", borderwidth=2)
+    # The settings are split into tabs. Appearance has the fonts, colours and passwords, and Diagnostics shows how the program is coping.
+    settingsTabs = ttk.Notebook(settingsMenuW)
+    settingsFrame = ttk.Frame(settingsTabs, padding="10", relief="solid", borderwidth=2)
     fontLabel = ttk.Label(settingsFrame, text="Font:")
     fontDrop = ttk.Combobox(settingsFrame, textvariable=font_var, values=get_fonts(), state="readonly")
     fontSizeSpinbox = ttk.Spinbox(settingsFrame, from_=4, to=30, increment=1, textvariable=size_var)
@@ -2133,9 +3827,10 @@ def settings():
     colourProgB = ttk.Button(settingsFrame, text = "Change Program Colour", command = choose_progcolour)
     colourTextB = ttk.Button(settingsFrame, text = "Change Text Colour", command = choose_txtcolour)
     changeB = ttk.Button(settingsFrame, text = "Change", command = lambda: set_fonts(font_var.get(), size_var.get()))
-    closeB = ttk.Button(settingsFrame, text = "Close", command = lambda: openMainMenu(settingsMenuW))
+    closeB = ttk.Button(settingsMenuW, text = "Close", command = lambda: show_screen("main"))
 
-    settingsFrame.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+    settingsTabs.add(settingsFrame, text="Appearance")
+    settingsTabs.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
     fontLabel.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
     fontDrop.grid(row=1, column=1, padx=5, pady=5, sticky="nsew")
     fontSizeSpinbox.grid(row=1, column=2, padx=5, pady=5, sticky="nsew")
@@ -2143,6 +3838,138 @@ def settings():
     colourBgB.grid(row=4, column=1, padx=5, pady=10, sticky="nsew")
     colourProgB.grid(row=5, column=1, padx=5, pady=5, sticky="nsew")
     colourTextB.grid(row=6, column=1, padx=5, pady=5, sticky="nsew")
-    closeB.grid(row=8, column=1, padx=5, pady=5, sticky="nsew")
-    
-passwordMenu()
+    closeB.grid(row=1, column=0, padx=10, pady=10)
+
+    # Diagnostics tab. Each section is a list of (name, value) rows. A row's labels are made the first time it turns up, then only have their text changed, and are removed if it goes (e.g. a window being closed).
+    diagnosticsFrame = ttk.Frame(settingsTabs, padding="10", relief="solid", borderwidth=2)
+    settingsTabs.add(diagnosticsFrame, text="Diagnostics")
+    section_places = {"Records": (0, 0, 1), "Files": (1, 0, 1), "Program": (2, 0, 1), "Timings": (0, 1, 3), "Windows": (0, 2, 3)} # Row, column and rowspan of each section.
+    diagnostic_sections = {} # Section -> (its frame, {row name: (name label, value label)}).
+    diagnostics_pending = None
+
+    def diagnostic_rows():
+        memory = memory_use()
+        program = [("Memory", megabytes(memory) if memory is not None else "Not available"), ("Saves waiting", str(write_queue.qsize())), ("Batches saved", f"{write_stats['batches']:,}"), ("Save errors", str(write_stats["errors"]))]
+        if profile_mode:
+            program.append(("Slow actions", str(len(slow_actions))))
+        return {
+            "Records": [(name.replace("_", " ").capitalize(), f"{len(record_list(name)):,}") for name in record_index],
+            "Files": [(file, megabytes(size)) for file, size in database_sizes().items()],
+            "Program": program,
+            # Refreshes and searches are called a lot, so the average says more about them. Loads mostly only happen once, so the last is what's worth seeing.
+            "Timings": [(name, f"last {timing['last'] * 1000:.1f} ms, average {timing['total'] / timing['calls'] * 1000:.1f} ms, {timing['calls']:,} times") for name, timing in sorted(timings.items())],
+            "Windows": [(window, f"{count:,} widgets") for window, count in sorted(widget_counts().items())],
+        }
+
+    # Updates every diagnostics_every while the tab can be seen. It stops when it can't, and starts again when the tab or the settings screen is shown (see the <Map> bindings below).
+    def update_diagnostics():
+        nonlocal diagnostics_pending
+        if diagnostics_pending is not None:
+            diagnosticsFrame.after_cancel(diagnostics_pending)
+            diagnostics_pending = None
+        if not diagnosticsFrame.winfo_viewable():
+            return
+        for title, rows in diagnostic_rows().items():
+            if title not in diagnostic_sections:
+                row, column, rowspan = section_places[title]
+                frame = ttk.Frame(diagnosticsFrame, padding="5")
+                frame.grid(row=row, column=column, rowspan=rowspan, padx=10, pady=5, sticky="nw")
+                ttk.Label(frame, text=title, style="Heading.TLabel").grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 5))
+                diagnostic_sections[title] = (frame, {})
+            frame, labels = diagnostic_sections[title]
+            names = {name for name, value in rows}
+            for name in [name for name in labels if name not in names]:
+                for label in labels.pop(name):
+                    label.destroy()
+            for i, (name, value) in enumerate(rows, start=1):
+                if name not in labels:
+                    labels[name] = (ttk.Label(frame, text=name), ttk.Label(frame))
+                name_label, value_label = labels[name]
+                name_label.grid(row=i, column=0, sticky="w", padx=(0, 10))
+                value_label.grid(row=i, column=1, sticky="w")
+                value_label.config(text=value)
+        diagnostics_pending = diagnosticsFrame.after(diagnostics_every, update_diagnostics)
+
+    # Hiding a screen only unmaps the screen's frame, not the tab inside it, so both are watched.
+    diagnosticsFrame.bind("<Map>", lambda event: update_diagnostics())
+    settingsMenuW.bind("<Map>", lambda event: update_diagnostics())
+    return settingsMenuW, None
+
+# Changing screens. Everything runs in the one root window, and each main menu is a frame inside it. A screen is built the first time it's opened, then kept, so going back to it only has to show it again (sub-windows are still Toplevels).
+# Each screen function returns its frame and the function that refreshes it (or None). It's only refreshed when one of the lists it shows has changed since it last was.
+root = None
+screen_builders = {"main": mainMenu, "customers": custMenu, "pets": petMenu, "bookings": bookMenu, "schedule": schedule, "settings": settings}
+screen_titles = {"main": "Main Menu", "customers": "Customers", "pets": "Pets", "bookings": "Bookings", "schedule": "Schedule", "settings": "Settings"}
+screen_uses = {"main": (), "customers": ("customers",), "pets": ("pets",), "bookings": ("bookings", "archived_bookings"), "schedule": ("bookings", "pets"), "settings": ()}
+screens = {} # Name -> {"frame", "refresh", "seen"}, where seen is list_versions when it was last refreshed.
+list_versions = {"customers": 0, "pets": 0, "bookings": 0, "archived_bookings": 0} # Goes up every time a list changes (see data_changed).
+current_screen = None
+refresh_pending = False
+
+# Frame for a screen to be built in. Its first row and column stretch to fill the window, which is what apply_style did for each window before.
+def new_screen():
+    frame = ttk.Frame(root, style="Screen.TFrame")
+    frame.columnconfigure(0, weight=1)
+    frame.rowconfigure(0, weight=1)
+    return frame
+
+@timed
+def show_screen(name):
+    global current_screen
+    if name not in screens:
+        frame, refresh = screen_builders[name]()
+        screens[name] = {"frame": frame, "refresh": refresh, "seen": dict(list_versions)} # Just built, so it's up to date.
+    if current_screen in screens:
+        screens[current_screen]["frame"].grid_remove()
+    current_screen = name
+    screens[name]["frame"].grid(row=0, column=0, sticky="nsew")
+    root.title(screen_titles[name])
+    refresh_screen()
+
+# Refreshes the screen being shown, if anything it shows has changed.
+def refresh_screen():
+    global refresh_pending
+    refresh_pending = False
+    screen = screens.get(current_screen)
+    if screen is None or screen["refresh"] is None:
+        return
+    if any(screen["seen"][list_name] != list_versions[list_name] for list_name in screen_uses[current_screen]):
+        screen["seen"] = dict(list_versions)
+        screen["refresh"]()
+
+# Called by the registry whenever a list changes. Other screens catch up when they are next shown, and the one open now is refreshed once Tk is idle, so it also shows changes made from its sub-windows.
+def data_changed(name):
+    global refresh_pending
+    list_versions[name] += 1
+    if current_screen is not None and not refresh_pending:
+        refresh_pending = True
+        root.after_idle(refresh_screen)
+
+# Throws away the built screens, so they're built again with the new settings.
+def forget_screens(keep=None):
+    for name in list(screens):
+        if name != keep:
+            screens.pop(name)["frame"].destroy()
+
+# Used when the window is closed. Waits for the writer to finish saving first, so no edit is lost.
+def close_program():
+    flush_writes()
+    root.destroy()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pet Hotel booking system.")
+    parser.add_argument("--convert", choices=("binary", "pickle"), help="rewrite the saved lists in this format, then exit without opening the program")
+    parser.add_argument("--profile", action="store_true", help=f"time every action, and log the slow ones to {profile_folder}/slow_actions.log")
+    parser.add_argument("--profile-capture", choices=("cprofile", "tracemalloc", "both"), help="with --profile, also save a cProfile and/or tracemalloc snapshot of each slow action")
+    parser.add_argument("--metrics", metavar="FILE", help="write metrics to this file (in Prometheus' text format, e.g. pethotel.prom) and as JSON next to it, every --metrics-every seconds")
+    parser.add_argument("--metrics-every", type=float, default=metrics_every, help="seconds between the metrics file being written")
+    parser.add_argument("--slow-ms", type=float, default=slow_action_after * 1000, help="with --profile, how long (in ms) an action has to take to count as slow")
+    arguments = parser.parse_args()
+    if arguments.convert:
+        convert_database(arguments.convert)
+    else:
+        if arguments.profile or arguments.profile_capture:
+            start_profiling(arguments.profile_capture, arguments.slow_ms / 1000)
+        if arguments.metrics:
+            start_metrics(arguments.metrics, arguments.metrics_every)
+        passwordMenu()
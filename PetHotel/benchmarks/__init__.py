@@ -0,0 +1,2 @@
+# Benchmarks for the Pet Hotel program. Each script runs on its own and prints its results as JSON, e.g. python benchmarks/operations.py --bookings 1000000
+# dataset.py makes up the data, harness.py has the timing and reporting shared between them.
@@ -0,0 +1,81 @@
+# Makes up customers, pets and bookings for the benchmarks, in the same format the program saves them in. The same seed always gives the same data, so results can be compared between versions.
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import PetHotelProg as hotel
+
+first_names = ["Olivia", "Amelia", "Isla", "Ava", "Mia", "Ivy", "Lily", "Grace", "Freya", "Sophia", "Noah", "Oliver", "George", "Leo", "Arthur", "Harry", "Oscar", "Jack", "Charlie", "Thomas", "Ann", "Anna", "Hannah", "Joanne", "Daniel"]
+last_names = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson", "Davies", "Robinson", "Wright", "Thompson", "Evans", "Walker", "White", "Roberts", "Green", "Hall", "Wood", "Jackson", "Clarke", "Smithson", "Hughes", "Edwards", "Turner", "Hill"]
+streets = ["High Street", "Station Road", "Church Lane", "Park Avenue", "Mill Road", "Victoria Road", "Green Lane", "Manor Close", "Kings Way", "The Crescent"]
+towns = ["Leeds", "York", "Bath", "Hull", "Derby", "Exeter", "Ipswich", "Lincoln"]
+pet_names = ["Bella", "Max", "Luna", "Milo", "Daisy", "Teddy", "Poppy", "Alfie", "Rosie", "Coco", "Bailey", "Ruby", "Buster", "Willow", "Pepper", "Biscuit", "Nala", "Simba", "Oreo", "Ziggy"]
+species = ["Dog", "Dog", "Dog", "Cat", "Cat", "Rabbit", "Guinea Pig", "Hamster", "Parrot", "Tortoise"] # Repeated to make dogs and cats the most common, like they would be.
+descriptions = ["Brown and white, friendly", "Black, shy with strangers", "Ginger, very playful", "Grey, older and calm", "Spotted, loves walks", "White, nervous around other animals"]
+diets = ["Dry food", "Wet food", "Meat", "Vegetables", "Seeds", "Hay and pellets", "Special diet"]
+notes = ["", "", "", "Needs medication twice a day", "Afraid of thunder", "Allergic to chicken", "Bring own bed"]
+dropoffs = ["08:00", "09:00", "10:00", "11:30", "12:00"]
+collects = ["14:00", "15:00", "16:00", "17:30", "18:00"]
+
+def make_customers(count, rng):
+    customers = []
+    for customer_id in range(1, count + 1):
+        fname = rng.choice(first_names)
+        sname = rng.choice(last_names)
+        address = f"{rng.randrange(1, 300)} {rng.choice(streets)}, {rng.choice(towns)}"
+        postcode = f"{rng.choice('ABCDEFGHLMNS')}{rng.choice('ABCDEFGHLMNS')}{rng.randrange(1, 30)} {rng.randrange(1, 10)}{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}"
+        email = f"{fname.lower()}.{sname.lower()}{customer_id}@example.com"
+        phonenum = "07" + "".join(rng.choice("0123456789") for _ in range(9))
+        customers.append(hotel.Customer(customer_id, fname, sname, address, postcode, email, phonenum))
+    return customers
+
+def make_pets(count, rng):
+    return [hotel.Pet(pet_id, rng.choice(pet_names), str(rng.randrange(1, 16)), rng.choice(species), rng.choice(descriptions), rng.choice(diets), rng.choice(notes)) for pet_id in range(1, count + 1)]
+
+# Bookings are spread over the given number of years, up to the end of this one, so most have finished and some are still to come. Each is 1-20 nights in a random room, for a random customer and pet.
+def make_bookings(count, customer_count, pet_count, rng, first=None, years=10):
+    if first is None:
+        first = date(date.today().year - years + 1, 1, 1)
+    days = years * 365
+    bookings = []
+    for booking_id in range(1, count + 1):
+        start = first + timedelta(days=rng.randrange(days))
+        end = start + timedelta(days=rng.randrange(1, 21))
+        bookings.append(hotel.Booking(booking_id, rng.randrange(1, pet_count + 1), rng.randrange(1, customer_count + 1), start.strftime("%d/%m/%Y"), end.strftime("%d/%m/%Y"),
+                                      rng.choice(dropoffs), rng.choice(collects), rng.choice(hotel.all_rooms)))
+    return bookings
+
+def make_dataset(customers, pets, bookings, seed=1, years=10):
+    rng = random.Random(seed)
+    return {
+        "customers": make_customers(customers, rng),
+        "pets": make_pets(pets, rng),
+        "bookings": make_bookings(bookings, max(customers, 1), max(pets, 1), rng, years=years),
+    }
+
+# Splits bookings the way auto_archive would: ones that finished more than archive_after_days ago go in the archive.
+def split_archive(bookings):
+    last = date.today() - timedelta(days=hotel.archive_after_days + 1)
+    current = [booking for booking in bookings if booking.end_date > last]
+    finished = [booking for booking in bookings if booking.end_date <= last]
+    return current, finished
+
+# Saves a dataset into Database/ in the current folder, using the program's own save functions, so it ends up exactly how the program would have saved it. The finished bookings go in the archive.
+def write_dataset(data):
+    os.makedirs("Database", exist_ok=True)
+    hotel.open_database()
+    current, finished = split_archive(data["bookings"])
+    hotel.customers[:] = data["customers"]
+    hotel.pets[:] = data["pets"]
+    hotel.bookings[:] = current
+    hotel.save_customers()
+    hotel.save_pets()
+    hotel.save_bookings()
+    for booking in finished:
+        hotel.archived_bookings.append(booking)
+    hotel.save_records("archived_bookings", finished)
+    hotel.store.set_version(hotel.database_version)
+    hotel.flush_writes()
+    return current, finished
@@ -0,0 +1,66 @@
+# Shared pieces for the benchmark scripts: running something a number of times, summing up how long it took, and writing the results out as JSON.
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import PetHotelProg as hotel
+
+# The program keeps its files in Database/ under the folder it's run from, so the benchmarks run in a temporary folder to keep away from the real ones.
+@contextmanager
+def temporary_folder():
+    start = os.getcwd()
+    folder = tempfile.mkdtemp(prefix="pethotel-bench-")
+    os.chdir(folder)
+    try:
+        yield folder
+    finally:
+        hotel.flush_writes()
+        os.chdir(start)
+        shutil.rmtree(folder, ignore_errors=True)
+
+# Value at the given percentage of a list of timings, using the nearest one rather than averaging two.
+def percentile(times, percent):
+    ordered = sorted(times)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))]
+
+def summary(times):
+    return {"runs": len(times), "min": min(times), "median": percentile(times, 50), "max": max(times)}
+
+# Runs run() repeat times, with setup() (if given) before each one, which isn't timed. Returns the timings summed up, and what the last run returned.
+def time_runs(run, repeat, setup=None):
+    times = []
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+    return summary(times), result
+
+# What the results were measured on, so results from different machines or versions aren't mixed up.
+def environment():
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database_version": hotel.database_version,
+        "snapshot_format": hotel.snapshot_format,
+        "numpy": hotel.numpy is not None,
+    }
+
+# Prints the report, and saves it as well if a file was given.
+def write_report(report, output=None):
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,137 @@
+# Times the program's main operations on made-up data, without opening the window: loading and saving each list, the searches behind the customer, pet and booking menus, finding free rooms, and working out each month of the schedule.
+# Results are printed as JSON (and saved with --output), so they can be compared between versions.
+# Usage: python benchmarks/operations.py [--customers 10000] [--pets 15000] [--bookings 100000] [--repeat 5] [--output results.json]
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import PetHotelProg as hotel
+from benchmarks import dataset, harness
+
+# Searches as they'd be typed into each search menu. Customers take the search terms, pets the conditions search_pet makes from them, and bookings find_bookings' arguments.
+customer_searches = {
+    "surname": {"sname": "smith"},
+    "first and surname": {"fname": "ann", "sname": "jo"},
+    "postcode": {"postcode": "ab1"},
+    "email (most match)": {"email": "example"},
+}
+pet_searches = {
+    "species": [("species", "contains", "dog")],
+    "name": [("name", "contains", "bel")],
+    "age": [("age", "equals", "3")],
+    "name and species": [("name", "contains", "b"), ("species", "contains", "cat")],
+}
+today = date.today()
+booking_searches = {
+    "room": {"room": "R3"},
+    "customer": {"customer": "smith"},
+    "pet": {"pet": "bella"},
+    "next 30 days, overlapping": {"first": today, "last": today + timedelta(days=30)},
+    "next 30 days, within": {"first": today, "last": today + timedelta(days=30), "overlapping": False},
+    "room, customer and dates": {"room": "R1", "customer": "jones", "first": today - timedelta(days=30), "last": today + timedelta(days=90)},
+}
+
+# Timings for loading and saving every list. Loads clear parse_date's cache first, as it would be empty when the program starts.
+def time_storage(results, repeat):
+    loads = {"customers": hotel.load_customers, "pets": hotel.load_pets, "bookings": hotel.load_bookings, "archived_bookings": hotel.load_archive_bookings}
+    for name, load in loads.items():
+        results[f"load_{name}"], _ = harness.time_runs(load, repeat, setup=hotel.parse_date.cache_clear)
+    results["build_indexes"], _ = harness.time_runs(hotel.build_indexes, repeat)
+    results["open_database"], _ = harness.time_runs(hotel.open_database, repeat, setup=hotel.parse_date.cache_clear)
+
+    # Saving goes through the background writer, so each one waits for it to finish. With no record the whole list is rewritten, with one only that record is. Either way this includes the writer's write_delay.
+    saves = {"customers": hotel.save_customers, "pets": hotel.save_pets, "bookings": hotel.save_bookings, "archived_bookings": hotel.save_archive_bookings}
+    for name, save in saves.items():
+        results[f"save_{name}"], _ = harness.time_runs(lambda: (save(), hotel.flush_writes()), repeat)
+        records = hotel.record_list(name)
+        if len(records):
+            middle = len(records) // 2
+            record = records[middle]
+            results[f"save_{name}_one_record"], _ = harness.time_runs(lambda: (save(record), hotel.flush_writes()), repeat)
+
+def time_searches(results, repeat):
+    for label, terms in customer_searches.items():
+        results[f"find_customers: {label}"], matches = harness.time_runs(lambda: hotel.find_customers(terms), repeat)
+        results[f"find_customers: {label}"]["matches"] = len(matches)
+    # Typing more of a search only checks the last results (see narrows).
+    wider = hotel.find_customers({"sname": "smi"})
+    results["find_customers: narrowed smi -> smith"], matches = harness.time_runs(lambda: hotel.find_customers({"sname": "smith"}, within=wider), repeat)
+    results["find_customers: narrowed smi -> smith"]["matches"] = len(matches)
+
+    for label, conditions in pet_searches.items():
+        results[f"find_records pets: {label}"], matches = harness.time_runs(lambda: hotel.find_records("pets", conditions), repeat)
+        results[f"find_records pets: {label}"]["matches"] = len(matches)
+
+    for label, arguments in booking_searches.items():
+        results[f"find_bookings: {label}"], matches = harness.time_runs(lambda: hotel.find_bookings(**arguments), repeat)
+        results[f"find_bookings: {label}"]["matches"] = len(matches)
+
+# Free rooms for random stays over the next year, the same as unbooked_rooms in the booking windows works out each time a date changes.
+def time_free_rooms(results, queries):
+    rng = random.Random(2)
+    stays = []
+    for _ in range(queries):
+        start = today + timedelta(days=rng.randrange(365))
+        stays.append((start, start + timedelta(days=rng.randrange(1, 15))))
+    stays = iter(stays)
+    results["unbooked_rooms"], _ = harness.time_runs(lambda: hotel.room_availability.free_rooms(*next(stays)), queries)
+
+# Each month from a year ago to a year ahead, worked out from scratch as the schedule does the first time a month is shown. The occupancy line under it is timed separately.
+def time_schedule(results, repeat):
+    rows = {room: i for i, room in enumerate(hotel.all_rooms)}
+    months = []
+    for offset in range(-12, 13):
+        year, month = divmod(today.year * 12 + today.month - 1 + offset, 12)
+        first_day = date(year, month + 1, 1)
+        months.append((first_day, (first_day + timedelta(days=31)).replace(day=1) - timedelta(days=1)))
+
+    def layouts():
+        return sum(len(hotel.month_layout(first_day, last_day, rows)) for first_day, last_day in months)
+
+    def occupancy():
+        for first_day, last_day in months:
+            hotel.booking_columns["bookings"].occupancy(first_day, last_day)
+            hotel.booking_columns["bookings"].room_nights(first_day, last_day)
+
+    results["schedule month_layout (25 months)"], bars = harness.time_runs(layouts, repeat)
+    results["schedule month_layout (25 months)"]["bars"] = bars
+    results["schedule occupancy (25 months)"], _ = harness.time_runs(occupancy, repeat)
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the Pet Hotel program's main operations on made-up data.")
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--pets", type=int, default=15000)
+    parser.add_argument("--bookings", type=int, default=100000)
+    parser.add_argument("--format", choices=("binary", "pickle"), default=hotel.snapshot_format, help="snapshot format")
+    parser.add_argument("--repeat", type=int, default=5, help="times each operation is run")
+    parser.add_argument("--queries", type=int, default=1000, help="number of free room checks")
+    parser.add_argument("--years", type=int, default=10, help="years the bookings are spread over, up to the end of this one. Fewer means more of them are still current rather than archived")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="file to save the results in as well")
+    arguments = parser.parse_args()
+    hotel.snapshot_format = arguments.format
+
+    start = time.perf_counter()
+    data = dataset.make_dataset(arguments.customers, arguments.pets, arguments.bookings, arguments.seed, arguments.years)
+    report = {
+        "environment": harness.environment(),
+        "sizes": {"customers": arguments.customers, "pets": arguments.pets, "bookings": arguments.bookings, "years": arguments.years, "seed": arguments.seed},
+        "generate_seconds": time.perf_counter() - start,
+        "results": {},
+    }
+    with harness.temporary_folder():
+        current, finished = dataset.write_dataset(data)
+        report["sizes"]["current_bookings"] = len(current)
+        report["sizes"]["archived_bookings"] = len(finished)
+        time_storage(report["results"], arguments.repeat)
+        time_searches(report["results"], arguments.repeat)
+        time_free_rooms(report["results"], arguments.queries)
+        time_schedule(report["results"], arguments.repeat)
+    harness.write_report(report, arguments.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Compares the pickle and binary snapshot formats: how long a whole list takes to load, how long the first page of one takes, and the peak memory (RSS) of each.
+# Each measurement runs in its own process, as peak RSS only ever goes up within one.
+# Usage: python benchmarks/snapshot_format.py [--bookings 200000] [--repeat 3]
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import PetHotelProg as hotel
+from benchmarks import dataset, harness
+
+
+# Peak RSS in bytes. On Linux it comes from /proc, as ru_maxrss there carries over from the parent across exec. Otherwise ru_maxrss is used, which macOS reports in bytes. None on Windows, which has neither.
+def peak_rss():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# Runs in the child process: loads the file the given way and prints what it measured.
+def measure(file, how):
+    before = peak_rss()
+    start = time.perf_counter()
+    if how == "full":
+        records = hotel.read_snapshot(file)[0]
+    elif hotel.is_binary(file):
+        table = hotel.BinaryTable(file)
+        records = table[:10]
+    else:
+        records = hotel.read_snapshot(file)[0][:10] # A pickle has to be read completely to get anything out of it.
+    seconds = time.perf_counter() - start
+    print(json.dumps({"seconds": seconds, "peak_rss": peak_rss(), "rss_before": before, "records": len(records)}))
+
+
+def run(file, how, repeat):
+    results = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--measure", file, how], capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output))
+    peaks = [result["peak_rss"] for result in results if result["peak_rss"] is not None]
+    return {"seconds": min(result["seconds"] for result in results), "peak_rss_mb": round(min(peaks) / 2**20, 1) if peaks else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares how long the pickle and binary snapshot formats take to load, and the memory each uses.")
+    parser.add_argument("--bookings", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.measure:
+        measure(*arguments.measure)
+        return
+
+    bookings = dataset.make_bookings(arguments.bookings, arguments.bookings // 6 + 1, arguments.bookings // 4 + 1, random.Random(1))
+    report = {"bookings": arguments.bookings, "formats": {}}
+    with harness.temporary_folder() as folder:
+        for snapshot_format in ("pickle", "binary"):
+            hotel.snapshot_format = snapshot_format
+            file = os.path.join(folder, f"bookings.{snapshot_format}")
+            with open(file, "wb") as f:
+                f.write(hotel.encode_snapshot(bookings, 0, arguments.bookings, hotel.Booking))
+            report["formats"][snapshot_format] = {
+                "file_mb": round(os.path.getsize(file) / 2**20, 2),
+                "load_all": run(file, "full", arguments.repeat),
+                "first_page": run(file, "page", arguments.repeat),
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
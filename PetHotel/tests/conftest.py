@@ -0,0 +1,38 @@
+# Each test gets its own copy of the program, run in an empty folder, so the lists, indexes and files from one test can't leak into the next.
+# The program keeps everything in module globals, so a new copy of the module is the simplest way to start again, and opening a second copy on the same folder is the same as restarting the program.
+import importlib.util
+import os
+import sys
+
+import pytest
+
+program = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PetHotelProg.py")
+
+def load_program():
+    spec = importlib.util.spec_from_file_location("PetHotelProg", program)
+    hotel = importlib.util.module_from_spec(spec)
+    sys.modules["PetHotelProg"] = hotel # Pickling a record looks its class up through here.
+    spec.loader.exec_module(hotel)
+    return hotel
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("Database")
+    return tmp_path
+
+# A fresh copy of the program in an empty database, without the window.
+@pytest.fixture
+def hotel(folder):
+    opened = []
+
+    def start():
+        copy = load_program()
+        copy.restart = start
+        opened.append(copy)
+        copy.open_database()
+        return copy
+
+    yield start()
+    for copy in opened:
+        copy.flush_writes()
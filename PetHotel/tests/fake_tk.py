@@ -0,0 +1,107 @@
+# Stand-ins for the Tk widgets, so the code that drives them can be tested without a display. They keep whatever they were told (options, whether they're gridded, canvas items) for the tests to check.
+# Used in place of the program's tk and ttk modules, e.g. monkeypatch.setattr(hotel, "ttk", fake_tk).
+class Widget:
+    made = 0 # Widgets made so far, so tests can check nothing new was made.
+
+    def __init__(self, master=None, **options):
+        Widget.made += 1
+        self.master = master
+        self.options = options
+        self.gridded = False
+        self.bindings = {}
+        self.idle = [] # Functions passed to after_idle, waiting to be run.
+        self.destroyed = False
+        self.children = []
+        if master is not None:
+            master.children.append(self)
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def cget(self, option):
+        return self.options.get(option)
+
+    def grid(self, **options):
+        self.gridded = True
+
+    def grid_remove(self):
+        self.gridded = False
+
+    def bind(self, event, handler):
+        self.bindings[event] = handler
+
+    def columnconfigure(self, index, **options):
+        pass
+
+    rowconfigure = columnconfigure
+
+    def after_idle(self, function):
+        self.idle.append(function)
+
+    def run_idle(self):
+        waiting, self.idle = self.idle, []
+        for function in waiting:
+            function()
+
+    def title(self, text=None):
+        if text is None:
+            return self.options.get("title")
+        self.options["title"] = text
+
+    def winfo_children(self):
+        return self.children
+
+    def destroy(self):
+        self.destroyed = True
+
+class Scrollbar(Widget):
+    position = None
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+class Canvas(Widget):
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.items = {} # Id -> {"kind", "coords", and the options it was made or configured with}.
+        self.next_id = 1
+
+    def create(self, kind, coords, options):
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = dict(options, kind=kind, coords=list(coords))
+        return item
+
+    def create_text(self, *coords, **options):
+        return self.create("text", coords, options)
+
+    def create_line(self, *coords, **options):
+        return self.create("line", coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self.create("rectangle", coords, options)
+
+    def itemconfig(self, item, **options):
+        self.items[item].update(options)
+
+    def coords(self, item, *coords):
+        self.items[item]["coords"] = list(coords)
+
+    def delete(self, *items):
+        for item in items:
+            del self.items[item]
+
+    def kind(self, kind):
+        return [item for item in self.items.values() if item["kind"] == kind]
+
+    def yview(self, *args):
+        pass
+
+    xview = yview
+
+class Toplevel(Widget):
+    pass
+
+Label = Button = Frame = Widget
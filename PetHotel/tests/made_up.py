@@ -0,0 +1,34 @@
+# Made-up customers, pets and bookings for the tests that check an index against working the same answer out the slow way.
+# Records are added, changed and deleted through the registry first, so the indexes have been kept up to date rather than just built once.
+import random
+from datetime import date, timedelta
+
+words = ["ann", "anna", "joanne", "smith", "smithson", "jones", "ab1", "ab12", "high street", "x", "annabel", "abcab"]
+
+def fill(hotel, seed=1, count=300):
+    rng = random.Random(seed)
+    first = date(2025, 1, 1)
+    for i in range(60):
+        hotel.add_record("customers", hotel.Customer(hotel.new_id("customers"), rng.choice(words).title(), rng.choice(words).title(), rng.choice(words), rng.choice(words).upper(), f"{rng.choice(words)}{i}@example.com", "07" + str(rng.randrange(10**9))))
+        hotel.add_record("pets", hotel.Pet(hotel.new_id("pets"), rng.choice(["Bella", "Max", "Luna", "Annabel"]), str(rng.randrange(1, 15)), rng.choice(["Dog", "Cat"]), "", "", ""))
+    for i in range(count):
+        start = first + timedelta(days=rng.randrange(200))
+        end = start + timedelta(days=rng.randrange(0, 25)) # Some end on the day they start.
+        sdate, edate = start.strftime("%d/%m/%Y"), end.strftime("%d/%m/%Y")
+        if i % 50 == 0:
+            sdate = "not a date" # Never indexed by date.
+        hotel.add_record("bookings", hotel.Booking(hotel.new_id("bookings"), rng.randrange(1, 61), rng.randrange(1, 61), sdate, edate, "09:00", "17:00", rng.choice(hotel.all_rooms)))
+
+    for record in rng.sample(hotel.customers, 15):
+        hotel.update_record("customers", record, sname=rng.choice(words).title())
+    for record in rng.sample(hotel.customers, 10):
+        hotel.delete_record("customers", record)
+    for record in rng.sample(hotel.bookings, 40):
+        start = first + timedelta(days=rng.randrange(200))
+        hotel.update_record("bookings", record, sdate=start.strftime("%d/%m/%Y"), edate=(start + timedelta(days=rng.randrange(1, 30))).strftime("%d/%m/%Y"), room=rng.choice(hotel.all_rooms))
+    for record in rng.sample(hotel.bookings, 30):
+        hotel.delete_record("bookings", record)
+    return rng
+
+def dated(hotel):
+    return [booking for booking in hotel.bookings if booking.start_date is not None and booking.end_date is not None and booking.end_date >= booking.start_date]
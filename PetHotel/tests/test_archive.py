@@ -0,0 +1,106 @@
+# The booking archive (ArchiveSegments), kept a month at a time, and moving bookings in and out of it.
+import os
+import pickle
+from datetime import date, timedelta
+
+import pytest
+
+def booking(hotel, start, nights=3, room="R1"):
+    record = hotel.Booking(hotel.new_id("bookings"), 1, 1, start.strftime("%d/%m/%Y"), (start + timedelta(days=nights)).strftime("%d/%m/%Y"), "09:00", "17:00", room)
+    hotel.add_record("bookings", record)
+    return record
+
+def archived_ids(hotel):
+    return sorted(record.id for record in hotel.archived_bookings)
+
+@pytest.fixture(params=["binary", "pickle"])
+def archive(hotel, request):
+    hotel.snapshot_format = request.param
+    old = [booking(hotel, date(2023, month, 10)) for month in (1, 1, 2, 3)]
+    for record in old:
+        hotel.move_record("bookings", "archived_bookings", record)
+    hotel.flush_writes()
+    return old
+
+def test_archive_is_kept_by_month(hotel, archive):
+    assert hotel.archived_bookings.months() == ["2023-01", "2023-02", "2023-03"]
+    reopened = hotel.restart()
+    assert len(reopened.archived_bookings) == 4
+    assert reopened.archived_bookings.loaded == {} # Nothing read in until it's needed.
+    assert [record.id for record in reopened.archived_bookings[1:3]] == [2, 3]
+    assert 4 not in reopened.record_index["archived_bookings"] # Only the months read in are indexed.
+    assert archived_ids(reopened) == [1, 2, 3, 4]
+
+def test_archive_can_be_indexed_like_a_list(hotel, archive):
+    reopened = hotel.restart()
+    archived = reopened.archived_bookings
+    assert archived[2].id == 3
+    assert list(archived.loaded) == ["2023-02"] # Only the month the booking is in.
+    assert [archived[position].id for position in (0, 1, -1, -4)] == [1, 2, 4, 1]
+    assert [record.id for record in archived[::2]] == [1, 3]
+    assert [record.id for record in archived[::-1]] == [4, 3, 2, 1]
+    for position in (4, -5):
+        with pytest.raises(IndexError):
+            archived[position]
+
+def test_unarchive_survives_restart(hotel, archive):
+    hotel.move_record("archived_bookings", "bookings", hotel.record_index["archived_bookings"][3])
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    assert archived_ids(reopened) == [1, 2, 4]
+    assert [record.id for record in reopened.bookings] == [3]
+    assert reopened.new_id("bookings") == 5
+
+# A crash between the two halves of a move, shown by the second half failing. The booking can end up in both lists, but never in neither.
+def test_crash_while_unarchiving_keeps_the_booking(hotel, archive):
+    def crash(key, payload):
+        raise OSError("crashed")
+    hotel.store.archive.write = crash
+    hotel.move_record("archived_bookings", "bookings", hotel.record_index["archived_bookings"][3])
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    assert 3 in reopened.record_index["bookings"]
+
+def test_crash_while_archiving_keeps_the_booking(hotel, monkeypatch):
+    record = booking(hotel, date(2023, 5, 1))
+    hotel.flush_writes()
+    write_journal = hotel.append_journal
+    def crash(file, records, entries):
+        if any(op == "delete" for op, record_id, payload in entries):
+            raise OSError("crashed")
+        write_journal(file, records, entries)
+    monkeypatch.setattr(hotel, "append_journal", crash)
+    hotel.move_record("bookings", "archived_bookings", record)
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    assert archived_ids(reopened) == [record.id]
+
+# Each month's write carries the manifest as it was when it was queued, so the last one queued has to be written last.
+def test_newest_manifest_is_written_last(hotel):
+    batch = [("month", "archived_bookings", "2023-01", "old"), ("month", "archived_bookings", "2023-02", "middle"), ("month", "archived_bookings", "2023-01", "new")]
+    assert [change[3] for change in hotel.coalesce_writes(batch)] == ["middle", "new"]
+
+def test_counts_are_right_after_changes_to_several_months(hotel, archive):
+    january, february = hotel.record_index["archived_bookings"][1], hotel.archived_bookings[2]
+    hotel.move_record("archived_bookings", "bookings", january)
+    hotel.move_record("archived_bookings", "bookings", february)
+    hotel.move_record("bookings", "archived_bookings", january)
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    assert reopened.archived_bookings.counts == {"2023-01": 2, "2023-02": 0, "2023-03": 1}
+    assert archived_ids(reopened) == [1, 2, 4]
+
+# A month written just before a crash, but not in the manifest yet, is read in when the archive opens. Its bookings still have to be indexed afterwards.
+def test_months_missing_from_the_manifest_are_indexed(hotel, archive):
+    manifest = os.path.join(hotel.archive_folder, "manifest.pkl")
+    with open(manifest, "rb") as f:
+        info = pickle.load(f)
+    del info["counts"]["2023-02"]
+    with open(manifest, "wb") as f:
+        pickle.dump(info, f)
+
+    reopened = hotel.restart()
+    assert reopened.archived_bookings.counts["2023-02"] == 1
+    for record in reopened.archived_bookings:
+        assert reopened.record_index["archived_bookings"][record.id] is record
+    assert len(reopened.booking_columns["archived_bookings"]) == 4
@@ -0,0 +1,47 @@
+# Finished bookings being moved to the archive automatically (see auto_archive).
+from datetime import date, timedelta
+
+class Root: # Stands in for the window, which auto_archive only uses to schedule itself again.
+    def __init__(self):
+        self.waits = []
+
+    def after(self, wait, function):
+        self.waits.append(wait)
+
+def booking(hotel, start, nights=3):
+    record = hotel.Booking(hotel.new_id("bookings"), 1, 1, start.strftime("%d/%m/%Y"), (start + timedelta(days=nights)).strftime("%d/%m/%Y"), "09:00", "17:00", "R1")
+    hotel.add_record("bookings", record)
+    return record
+
+def run_until_done(hotel):
+    hotel.root = Root()
+    while not hotel.root.waits or hotel.root.waits[-1] != hotel.archive_every:
+        hotel.auto_archive()
+
+def test_only_bookings_finished_long_enough_ago_are_archived(hotel):
+    today = date.today()
+    old = [booking(hotel, today - timedelta(days=100 + i)) for i in range(7)]
+    recent = booking(hotel, today - timedelta(days=10))
+    upcoming = booking(hotel, today + timedelta(days=10))
+    hotel.archive_chunk = 3 # So it takes more than one go.
+    run_until_done(hotel)
+    assert sorted(record.id for record in hotel.archived_bookings) == sorted(record.id for record in old)
+    assert hotel.bookings == [recent, upcoming]
+    assert len(hotel.root.waits) == 3
+
+def test_bookings_being_edited_or_just_unarchived_are_left_alone(hotel):
+    today = date.today()
+    editing = booking(hotel, today - timedelta(days=100))
+    unarchived = booking(hotel, today - timedelta(days=200))
+    other = booking(hotel, today - timedelta(days=300))
+    hotel.move_record("bookings", "archived_bookings", unarchived)
+    hotel.move_record("archived_bookings", "bookings", unarchived)
+    hotel.bookings_being_edited[editing.id] = 1 # What editBooking does while its window is open.
+
+    run_until_done(hotel)
+    assert [record.id for record in hotel.archived_bookings] == [other.id]
+    assert {record.id for record in hotel.bookings} == {editing.id, unarchived.id}
+
+    del hotel.bookings_being_edited[editing.id] # The window is closed.
+    run_until_done(hotel)
+    assert editing.id in hotel.record_index["archived_bookings"]
@@ -0,0 +1,57 @@
+# The made-up data and timing helpers the benchmarks use (benchmarks/dataset.py and benchmarks/harness.py).
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks import dataset, harness
+
+@pytest.fixture
+def made_up(hotel, monkeypatch):
+    monkeypatch.setattr(dataset, "hotel", hotel) # So the records are made, and saved, by the test's own copy of the program.
+    return dataset
+
+def fields(records):
+    return [record.__getstate__() for record in records]
+
+def test_same_seed_gives_the_same_data(made_up):
+    first, again, other = made_up.make_dataset(50, 60, 200, seed=3), made_up.make_dataset(50, 60, 200, seed=3), made_up.make_dataset(50, 60, 200, seed=4)
+    for name in ("customers", "pets", "bookings"):
+        assert fields(first[name]) == fields(again[name])
+    assert fields(first["bookings"]) != fields(other["bookings"])
+    assert [len(first[name]) for name in ("customers", "pets", "bookings")] == [50, 60, 200]
+    assert all(1 <= booking.cust_id <= 50 and 1 <= booking.pet_id <= 60 and booking.end_date > booking.start_date for booking in first["bookings"])
+
+def test_split_archive_matches_auto_archive(made_up, hotel):
+    today = date.today()
+    def ending(days_ago):
+        end = today - timedelta(days=days_ago)
+        return hotel.Booking(days_ago, 1, 1, (end - timedelta(days=2)).strftime("%d/%m/%Y"), end.strftime("%d/%m/%Y"), "09:00", "17:00", "R1")
+    limit = hotel.archive_after_days
+    current, finished = made_up.split_archive([ending(0), ending(limit), ending(limit + 1), ending(limit + 30)])
+    assert [booking.id for booking in current] == [0, limit]
+    assert [booking.id for booking in finished] == [limit + 1, limit + 30]
+
+def test_written_dataset_opens_in_the_program(made_up, hotel):
+    data = made_up.make_dataset(20, 30, 100, seed=2)
+    current, finished = made_up.write_dataset(data)
+    reopened = hotel.restart()
+    assert fields(reopened.customers) == fields(data["customers"])
+    assert fields(reopened.bookings) == fields(current)
+    assert len(reopened.archived_bookings) == len(finished)
+
+def test_percentile_uses_the_nearest_value():
+    times = [5, 1, 4, 2, 3]
+    assert [harness.percentile(times, percent) for percent in (0, 20, 50, 90, 100)] == [1, 1, 3, 5, 5]
+    assert harness.summary(times) == {"runs": 5, "min": 1, "median": 3, "max": 5}
+
+def test_time_runs_leaves_setup_out(monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(harness.time, "perf_counter", lambda: next(clock))
+    calls = []
+    summary, result = harness.time_runs(lambda: calls.append("run") or len(calls), 3, setup=lambda: calls.append("setup"))
+    assert calls == ["setup", "run"] * 3
+    assert result == 6
+    assert summary["runs"] == 3 and summary["max"] == 1 # Each run is one tick of the clock, with setup outside it.
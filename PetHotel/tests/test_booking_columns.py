@@ -0,0 +1,38 @@
+# The bookings kept as columns of numbers (BookingColumns), checked against going through the booking objects.
+from datetime import date, timedelta
+
+import pytest
+
+from made_up import dated, fill
+
+@pytest.mark.parametrize("with_numpy", [True, False])
+def test_booking_columns_match_the_bookings(hotel, monkeypatch, with_numpy):
+    if with_numpy and hotel.numpy is None:
+        pytest.skip("numpy isn't installed")
+    if not with_numpy:
+        monkeypatch.setattr(hotel, "numpy", None)
+    rng = fill(hotel)
+    columns = hotel.booking_columns["bookings"]
+    bookings = dated(hotel)
+    assert len(columns) == len(bookings)
+    for _ in range(50):
+        first = date(2025, 1, 1) + timedelta(days=rng.randrange(-10, 230))
+        last = first + timedelta(days=rng.randrange(0, 40))
+        nights = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        assert sorted(columns.staying(first, last)) == sorted(b.id for b in bookings if b.start_date <= last and b.end_date > first)
+        assert columns.occupancy(first, last) == [sum(1 for b in bookings if b.start_date <= night < b.end_date) for night in nights]
+        assert columns.room_nights(first, last) == [sum(1 for b in bookings if b.room == room for night in nights if b.start_date <= night < b.end_date) for room in hotel.all_rooms]
+    assert columns.stays_per_month(2025) == [sum(1 for b in bookings if b.start_date.year == 2025 and b.start_date.month == month) for month in range(1, 13)]
+
+def test_archive_columns_fill_in_as_months_are_read(hotel):
+    for start in ("10/01/2023", "10/02/2023"):
+        record = hotel.Booking(hotel.new_id("bookings"), 1, 1, start, start[:3] + "03/2023", "09:00", "17:00", "R1")
+        hotel.add_record("bookings", record)
+        hotel.move_record("bookings", "archived_bookings", record)
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    columns = reopened.booking_columns["archived_bookings"]
+    assert len(columns) == 0 # Nothing read in yet.
+    list(reopened.archived_bookings)
+    assert columns.stays_per_month(2023)[:3] == [1, 1, 0]
+    assert len(reopened.booking_columns["bookings"]) == 0
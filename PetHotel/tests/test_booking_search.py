@@ -0,0 +1,49 @@
+# The booking menu's search (find_bookings), with date ranges rather than exact dates.
+from datetime import date, timedelta
+
+from made_up import fill
+
+def test_dates_find_overlapping_or_within(hotel):
+    stays = {"before": ("20/02/2025", "02/03/2025"), "inside": ("05/03/2025", "08/03/2025"), "after": ("30/03/2025", "04/04/2025"), "outside": ("01/04/2025", "03/04/2025")}
+    ids = {}
+    for name, (sdate, edate) in stays.items():
+        record = hotel.Booking(hotel.new_id("bookings"), 1, 1, sdate, edate, "09:00", "17:00", "R1")
+        hotel.add_record("bookings", record)
+        ids[record.id] = name
+    def found(*args, **kwargs):
+        return [ids[booking.id] for booking in hotel.find_bookings("", "", "", *args, **kwargs)]
+    march = (date(2025, 3, 1), date(2025, 3, 31))
+    assert found(*march) == ["before", "inside", "after"] # In date order.
+    assert found(*march, overlapping=False) == ["inside"]
+    assert found(date(2025, 3, 1), None, overlapping=False) == ["inside", "after", "outside"] # No end date means no limit.
+    assert found(None, date(2025, 3, 31), overlapping=False) == ["before", "inside"] # Only an end date finds the ones ending by then.
+    assert found() == ["before", "inside", "after", "outside"]
+
+def test_booking_search_matches_a_linear_search(hotel):
+    rng = fill(hotel)
+    for _ in range(200):
+        room = rng.choice(["", "", "R1", "R1", "R"])
+        customer = rng.choice(["", "", "ann", "smi jo"])
+        pet = rng.choice(["", "", "bel", "max"])
+        first = rng.choice([None, date(2025, 1, 1) + timedelta(days=rng.randrange(200))])
+        last = rng.choice([None, date(2025, 1, 1) + timedelta(days=rng.randrange(200, 260))])
+        overlapping = rng.random() < 0.5
+        customer_ids = {c.id for c in hotel.customers if all(any(word in name.lower() for name in (c.fname, c.sname)) for word in customer.split())}
+        pet_ids = {p.id for p in hotel.pets if pet in p.name.lower()}
+
+        def wanted(b):
+            if room not in b.room or (customer and b.cust_id not in customer_ids) or (pet and b.pet_id not in pet_ids):
+                return False
+            if first is None and last is None:
+                return True
+            if b.start_date is None or b.end_date is None or b.end_date < b.start_date:
+                return False
+            low, high = first or date.min, last or date.max
+            if overlapping:
+                return b.start_date <= high and b.end_date >= low
+            if first is not None:
+                return low <= b.start_date <= high and b.end_date <= high
+            return low <= b.end_date <= high
+
+        found = hotel.find_bookings(room, customer, pet, first, last, overlapping)
+        assert sorted(b.id for b in found) == sorted(b.id for b in hotel.bookings if wanted(b)), (room, customer, pet, first, last, overlapping)
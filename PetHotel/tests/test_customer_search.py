@@ -0,0 +1,21 @@
+# The customer search's trigram index (NgramIndex), checked against a linear search through the customers.
+from made_up import fill, words
+
+def test_customer_search_matches_a_linear_search(hotel):
+    rng = fill(hotel)
+    searches = [{"fname": word} for word in words] + [{"sname": "smi", "postcode": "ab"}, {"email": "on"}, {"address": "high street", "fname": "a"}, {"fname": "zzz"}]
+    searches += [{field: rng.choice(words)[:rng.randrange(1, 6)] for field in rng.sample(["fname", "sname", "address", "postcode", "email"], 2)} for _ in range(100)]
+    for terms in searches:
+        expected = [customer for customer in hotel.customers if all(term.lower() in str(getattr(customer, field)).lower() for field, term in terms.items())]
+        assert hotel.find_customers(terms) == expected, terms
+        # Narrowing from a wider search gives the same answer as searching from scratch.
+        wider = {field: term[:-1] for field, term in terms.items()}
+        if all(wider.values()):
+            assert hotel.find_customers(terms, within=hotel.find_customers(wider)) == expected, terms
+
+def test_customer_search_is_the_same_after_restart(hotel):
+    fill(hotel)
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    assert reopened.customer_search.values == hotel.customer_search.values
+    assert reopened.find_customers({"sname": "smi"}) == [customer for customer in reopened.customers if "smi" in customer.sname.lower()]
@@ -0,0 +1,40 @@
+# Dates read from the DD/MM/YYYY text once (parse_date, Booking.parse_dates), and the bookings kept in date order (DateIndex).
+from datetime import date, timedelta
+
+from made_up import dated, fill
+
+def test_parse_date(hotel):
+    assert hotel.parse_date("01/02/2025") == date(2025, 2, 1)
+    assert hotel.parse_date("1/2/2025") == date(2025, 2, 1)
+    for text in ("", "not a date", "31/02/2025", "01/02", None):
+        assert hotel.parse_date(text) is None
+    assert hotel.parse_date("01/02/2025") is hotel.parse_date("01/02/2025") # Shared, not worked out again.
+
+def test_changed_dates_are_parsed_again(hotel):
+    record = hotel.Booking(hotel.new_id("bookings"), 1, 1, "01/03/2025", "05/03/2025", "09:00", "17:00", "R1")
+    hotel.add_record("bookings", record)
+    hotel.update_record("bookings", record, sdate="02/04/2025", edate="not a date")
+    assert (record.start_date, record.end_date) == (date(2025, 4, 2), None)
+    assert hotel.booking_dates.by_start == [] # Broken dates aren't indexed.
+    hotel.update_record("bookings", record, edate="06/04/2025")
+    assert hotel.booking_dates.starting(date(2025, 4, 1), date(2025, 4, 30)) == [record.id]
+
+def test_date_index_matches_checking_every_booking(hotel):
+    rng = fill(hotel)
+    for _ in range(300):
+        first = date(2025, 1, 1) + timedelta(days=rng.randrange(-10, 230))
+        last = first + timedelta(days=rng.randrange(0, 40))
+        bookings = dated(hotel)
+        assert sorted(hotel.booking_dates.starting(first, last)) == sorted(b.id for b in bookings if first <= b.start_date <= last)
+        assert sorted(hotel.booking_dates.ending(first, last)) == sorted(b.id for b in bookings if first <= b.end_date <= last)
+        assert sorted(hotel.booking_dates.between(first, last)) == sorted(b.id for b in bookings if b.start_date <= last and b.end_date >= first)
+
+def vars_of(record):
+    return tuple(getattr(record, field) for field in type(record).fields)
+
+def test_dates_are_the_same_after_restart(hotel):
+    fill(hotel)
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    assert [vars_of(b) for b in reopened.bookings] == [vars_of(b) for b in hotel.bookings]
+    assert sorted(reopened.booking_dates.by_start) == sorted(hotel.booking_dates.by_start)
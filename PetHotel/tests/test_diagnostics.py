@@ -0,0 +1,42 @@
+# What the diagnostics tab shows: timings, file sizes, memory and widget counts.
+import os
+
+import fake_tk
+
+def test_timings_are_added_up(hotel):
+    for seconds in (0.002, 0.004, 30):
+        hotel.note_timing("search", seconds)
+    timing = hotel.timings["search"]
+    assert timing["calls"] == 3
+    assert timing["last"] == 30
+    assert abs(timing["total"] - 30.006) < 1e-9
+    assert timing["buckets"][hotel.timing_buckets.index(0.005)] == 2
+    assert timing["buckets"][-1] == 1 # Slower than every bucket.
+    assert sum(timing["buckets"]) == 3
+
+def test_megabytes(hotel):
+    assert hotel.megabytes(0) == "0.0 KB"
+    assert hotel.megabytes(1536) == "1.5 KB"
+    assert hotel.megabytes(3 * 2**20) == "3.0 MB"
+
+def test_file_sizes(hotel):
+    hotel.add_record("customers", hotel.Customer(hotel.new_id("customers"), "Ann", "Smith", "", "", "", ""))
+    hotel.flush_writes()
+    sizes = hotel.database_sizes()
+    file = hotel.database_files["customers"]
+    assert sizes[os.path.basename(file) + ".journal"] == os.path.getsize(file + ".journal") > 0
+    assert set(sizes) >= {"customers.pkl", "pets.pkl", "bookings.pkl", "archive"}
+
+def test_memory_use(hotel):
+    memory = hotel.memory_use()
+    assert memory is None or memory > 2**20
+
+def test_widgets_are_counted_by_window(hotel, monkeypatch):
+    monkeypatch.setattr(hotel, "tk", fake_tk)
+    frame = fake_tk.Frame()
+    fake_tk.Label(frame)
+    window = fake_tk.Toplevel(frame)
+    window.title("Edit Customer")
+    fake_tk.Button(fake_tk.Frame(window))
+    monkeypatch.setattr(hotel, "screens", {"customers": {"frame": frame, "refresh": None, "seen": {}}})
+    assert hotel.widget_counts() == {"Customers screen": 2, "Edit Customer": 3}
@@ -0,0 +1,79 @@
+# Saving files safely: snapshots written whole or not at all (write_atomic), and how often journals are fsynced (durability).
+import os
+
+import pytest
+
+def test_atomic_write_replaces_the_whole_file(hotel, folder):
+    file = str(folder / "list.pkl")
+    hotel.write_atomic(file, lambda f: f.write(b"old"))
+    hotel.write_atomic(file, lambda f: f.write(b"new"))
+    assert open(file, "rb").read() == b"new"
+    assert not os.path.exists(file + ".tmp")
+
+def test_failed_write_leaves_the_old_file(hotel, folder):
+    file = str(folder / "list.pkl")
+    hotel.write_atomic(file, lambda f: f.write(b"old"))
+    def crash(f):
+        f.write(b"half")
+        raise OSError("disk full")
+    with pytest.raises(OSError):
+        hotel.write_atomic(file, crash)
+    assert open(file, "rb").read() == b"old"
+
+def test_leftover_temporary_file_is_removed_on_load(hotel):
+    customer = hotel.Customer(hotel.new_id("customers"), "Ann", "Smith", "", "", "", "")
+    hotel.add_record("customers", customer)
+    hotel.flush_writes()
+    file = hotel.database_files["customers"]
+    with open(file + ".tmp", "wb") as f:
+        f.write(b"half a snapshot")
+    reopened = hotel.restart()
+    assert [record.fname for record in reopened.customers] == ["Ann"]
+    assert not os.path.exists(file + ".tmp")
+
+@pytest.fixture
+def fsyncs(hotel, monkeypatch):
+    fsyncs = []
+    fsync = os.fsync
+    def counted(fd):
+        fsyncs.append(fd)
+        fsync(fd)
+    monkeypatch.setattr(hotel.os, "fsync", counted)
+    return fsyncs
+
+def journal(hotel, record_id=1):
+    hotel.append_journal(hotel.database_files["customers"], [], [("put", record_id, b"")])
+
+def test_full_durability_fsyncs_every_write(hotel, fsyncs):
+    hotel.durability = "full"
+    journal(hotel)
+    journal(hotel, 2)
+    assert len(fsyncs) == 2
+    assert not hotel.unsynced
+
+def test_batch_durability_shares_one_fsync(hotel, fsyncs):
+    hotel.durability = "batch"
+    hotel.last_fsync = hotel.time.monotonic()
+    journal(hotel)
+    journal(hotel, 2)
+    hotel.sync_journals()
+    assert fsyncs == [] # Not a second since the last one yet.
+    assert hotel.store.sync_due() > 0
+    hotel.last_fsync -= hotel.fsync_every
+    assert hotel.store.sync_due() == 0
+    hotel.sync_journals()
+    assert len(fsyncs) == 1
+    assert hotel.store.sync_due() is None # Nothing left to fsync.
+
+def test_forced_sync_doesnt_wait(hotel, fsyncs):
+    hotel.durability = "batch"
+    hotel.last_fsync = hotel.time.monotonic()
+    journal(hotel)
+    hotel.sync_journals(force=True)
+    assert len(fsyncs) == 1
+
+def test_durability_off_never_fsyncs_journals(hotel, fsyncs):
+    hotel.durability = "off"
+    journal(hotel)
+    hotel.sync_journals(force=True)
+    assert fsyncs == []
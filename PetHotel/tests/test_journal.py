@@ -0,0 +1,87 @@
+# Saving through the journal, and reading it back after the program stops (or crashes) part way through.
+import os
+import pickle
+
+import pytest
+
+def add_customers(hotel, count):
+    for i in range(count):
+        hotel.add_record("customers", hotel.Customer(hotel.new_id("customers"), f"First{i}", f"Last{i}", "1 High Street", "AB1 2CD", f"c{i}@example.com", "07123456789"))
+    hotel.flush_writes()
+
+def test_changes_are_replayed_after_restart(hotel):
+    add_customers(hotel, 5)
+    hotel.update_record("customers", hotel.record_index["customers"][2], sname="Changed")
+    hotel.delete_record("customers", hotel.record_index["customers"][4])
+    hotel.flush_writes()
+    assert os.path.getsize(hotel.customer_file + ".journal") > 0
+
+    reopened = hotel.restart()
+    assert [(customer.id, customer.sname) for customer in reopened.customers] == [(1, "Last0"), (2, "Changed"), (3, "Last2"), (5, "Last4")]
+    assert reopened.new_id("customers") == 6 # The deleted customer's id isn't handed out again.
+
+def test_compaction_empties_the_journal(hotel):
+    hotel.journal_compact_after = 10
+    add_customers(hotel, 25)
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    assert [customer.id for customer in reopened.customers] == list(range(1, 26))
+    assert os.path.getsize(hotel.customer_file + ".journal") < 10 * 200
+
+def test_half_written_last_entry_is_cut_off(hotel):
+    add_customers(hotel, 3)
+    journal = hotel.customer_file + ".journal"
+    size = os.path.getsize(journal)
+    with open(journal, "ab") as f:
+        f.write(pickle.dumps((99, "put", 4, b"x" * 50))[:20]) # A crash part way through writing an entry.
+
+    reopened = hotel.restart()
+    assert [customer.id for customer in reopened.customers] == [1, 2, 3]
+    assert os.path.getsize(journal) == size
+    add_customers(reopened, 1) # New entries go after the good ones, so they're read back too.
+    assert [customer.id for customer in reopened.restart().customers] == [1, 2, 3, 4]
+
+def test_damage_in_the_middle_leaves_the_journal_alone(hotel):
+    add_customers(hotel, 3)
+    journal = hotel.customer_file + ".journal"
+    with open(journal, "rb") as f:
+        data = f.read()
+    second = len(data) // 3
+    damaged = data[:second] + b"\x00garbage\x00" + data[second + 9:]
+    with open(journal, "wb") as f:
+        f.write(damaged)
+
+    with pytest.raises(Exception) as error: # Each copy of the program has its own DatabaseDamaged, so it's checked by name.
+        hotel.restart()
+    assert error.typename == "DatabaseDamaged"
+    with open(journal, "rb") as f:
+        assert f.read() == damaged
+
+def test_damaged_snapshot_is_not_treated_as_empty(hotel):
+    with open(hotel.customer_file, "wb") as f:
+        f.write(b"not a database")
+    with pytest.raises(Exception) as error:
+        hotel.restart()
+    assert error.typename == "DatabaseDamaged"
+
+# A whole-list save (e.g. from upgrade_database) made while a compaction of the same file is still writing has to be written after it, not dropped.
+def test_whole_list_save_during_a_compaction_is_kept(hotel, monkeypatch):
+    add_customers(hotel, 3)
+    started, release = hotel.threading.Event(), hotel.threading.Event()
+    write_atomic = hotel.write_atomic
+    def slow_write(file, write, mode="wb"):
+        if file == hotel.customer_file and not release.is_set():
+            started.set()
+            release.wait(5)
+        write_atomic(file, write, mode)
+    monkeypatch.setattr(hotel, "write_atomic", slow_write)
+
+    hotel.save_customers()
+    assert started.wait(5) # The first compaction is now part way through.
+    hotel.customers[0].sname = "Changed" # Changed in place, the way upgrade_database changes bookings.
+    hotel.save_customers()
+    hotel.write_queue.join()
+    release.set()
+    hotel.flush_writes()
+
+    assert [customer.sname for customer in hotel.restart().customers] == ["Changed", "Last1", "Last2"]
@@ -0,0 +1,52 @@
+# The metrics file (see start_metrics), written from its own thread.
+import json
+import os
+import time
+
+def wait_for(check, seconds=5):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        if check():
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_metrics_come_from_the_window_threads_copy(hotel, folder):
+    hotel.add_record("customers", hotel.Customer(hotel.new_id("customers"), "Ann", "Smith", "1 High Street", "AB1 2CD", "ann@example.com", "07123456789"))
+    hotel.metrics_file = str(folder / "pethotel.prom")
+    hotel.write_metrics()
+    assert 'pethotel_records{list="customers"} 0' not in open(hotel.metrics_file).read() # Nothing copied yet, so no counts at all.
+
+    hotel.window_metrics = hotel.copy_window_metrics() # What publish_metrics does on the window thread.
+    hotel.write_metrics()
+    assert 'pethotel_records{list="customers"} 1' in open(hotel.metrics_file).read()
+    with open(folder / "pethotel.json") as f:
+        assert json.load(f)["records"]["customers"] == 1
+
+def test_metrics_thread_keeps_going_after_an_error(hotel, folder, monkeypatch):
+    sizes = hotel.database_sizes
+    failures = []
+    def fail_once():
+        if not failures:
+            failures.append(1)
+            raise RuntimeError("dictionary changed size during iteration")
+        return sizes()
+    monkeypatch.setattr(hotel, "database_sizes", fail_once)
+    monkeypatch.setattr(hotel.atexit, "register", lambda *args: None) # The folder is gone by the time the tests finish.
+    hotel.start_metrics(str(folder / "pethotel.prom"), every=0.05)
+    try:
+        assert wait_for(lambda: (folder / "pethotel.prom").exists())
+        assert failures == [1]
+    finally:
+        hotel.metrics_file = None # Stops the thread writing anything more.
+
+def test_archive_bytes_are_the_archive_folders_size(hotel):
+    assert hotel.database_sizes()["archive"] == 0 # Nothing archived yet.
+    record = hotel.Booking(hotel.new_id("bookings"), 1, 1, "10/01/2023", "13/01/2023", "09:00", "17:00", "R1")
+    hotel.add_record("bookings", record)
+    hotel.move_record("bookings", "archived_bookings", record)
+    hotel.flush_writes()
+    size = sum(os.path.getsize(os.path.join(hotel.archive_folder, file)) for file in os.listdir(hotel.archive_folder))
+    assert size > 0
+    metrics = hotel.collect_metrics(hotel.copy_window_metrics())
+    assert f"pethotel_archive_bytes {size}" in hotel.prometheus_text(metrics).splitlines()
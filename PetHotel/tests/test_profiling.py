@@ -0,0 +1,73 @@
+# Profiling mode (--profile): timed functions, the slow action log and the profiles saved with it.
+import logging
+import os
+
+import pytest
+
+@pytest.fixture
+def profiling(hotel, monkeypatch):
+    # start_profiling replaces tkinter's CallWrapper and adds a handler to a logger, both shared with every other copy of the program, so they're put back afterwards.
+    monkeypatch.setattr(hotel.tk, "CallWrapper", hotel.tk.CallWrapper)
+    log = logging.getLogger("pethotel.slow_actions")
+    handlers = list(log.handlers)
+    def start(capture=None, slow_after=0):
+        hotel.start_profiling(capture, slow_after)
+    yield start
+    for handler in log.handlers[len(handlers):]:
+        handler.close()
+    log.handlers[:] = handlers
+
+def actions(hotel):
+    @hotel.timed
+    def search():
+        return "found"
+    @hotel.timed
+    def refresh():
+        return "refreshed"
+    @hotel.timed
+    def search_menu():
+        search()
+        refresh()
+        refresh()
+        return "done"
+    return search_menu
+
+def test_timings_are_kept_without_profiling(hotel):
+    assert actions(hotel)() == "done"
+    assert hotel.timings["refresh"]["calls"] == 2
+    assert hotel.timings["search_menu"]["calls"] == 1
+    assert list(hotel.slow_actions) == []
+
+def test_slow_action_is_logged_with_its_parts(hotel, profiling):
+    profiling()
+    hotel.add_record("customers", hotel.Customer(hotel.new_id("customers"), "Ann", "Smith", "", "", "", ""))
+    hotel.slow_actions.clear()
+    assert actions(hotel)() == "done"
+    entry = hotel.slow_actions[-1]
+    assert entry["action"] == "search_menu"
+    assert sorted(part for part, seconds in entry["parts"]) == ["refresh", "search"] # The two refreshes are added together.
+    assert entry["counts"]["customers"] == 1
+    assert len(hotel.slow_actions) == 1 # The parts aren't actions of their own.
+    with open(os.path.join(hotel.profile_folder, "slow_actions.log")) as log:
+        assert "search_menu | customers 1" in log.read()
+
+def test_fast_actions_are_not_logged(hotel, profiling):
+    profiling(slow_after=60)
+    actions(hotel)()
+    assert list(hotel.slow_actions) == []
+
+def test_slow_action_saves_a_profile(hotel, profiling):
+    profiling("cprofile")
+    actions(hotel)()
+    files = hotel.slow_actions[-1]["files"]
+    assert len(files) == 1 and files[0].endswith(".prof")
+    assert os.path.getsize(files[0]) > 0
+
+def test_callback_names(hotel):
+    class Button:
+        def cget(self, option):
+            return "Search"
+    def searchMenu():
+        pass
+    assert hotel.callback_name(searchMenu, Button()) == "test_callback_names.searchMenu (Search)"
+    assert hotel.callback_name(searchMenu, object()) == "test_callback_names.searchMenu" # No text to add.
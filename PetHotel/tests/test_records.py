@@ -0,0 +1,52 @@
+# The record registry: ids, and the id -> record index (record_index) kept up to date by add_record and the rest.
+import pytest
+
+def customer(hotel, fname="Ann"):
+    record = hotel.Customer(hotel.new_id("customers"), fname, "Smith", "1 High Street", "AB1 2CD", "ann@example.com", "07123456789")
+    hotel.add_record("customers", record)
+    return record
+
+def test_index_follows_adds_edits_and_deletes(hotel):
+    ann, bob = customer(hotel, "Ann"), customer(hotel, "Bob")
+    assert hotel.record_index["customers"] == {ann.id: ann, bob.id: bob}
+    hotel.update_record("customers", ann, fname="Anne")
+    assert hotel.record_index["customers"][ann.id].fname == "Anne"
+    hotel.delete_record("customers", ann)
+    assert hotel.record_index["customers"] == {bob.id: bob}
+
+def test_ids_are_never_reused(hotel):
+    ann = customer(hotel)
+    hotel.delete_record("customers", ann)
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    assert reopened.new_id("customers") == ann.id + 1
+
+def test_bookings_and_archived_bookings_share_ids(hotel):
+    record = hotel.Booking(hotel.new_id("bookings"), 1, 1, "10/01/2023", "13/01/2023", "09:00", "17:00", "R1")
+    hotel.add_record("bookings", record)
+    hotel.move_record("bookings", "archived_bookings", record)
+    assert hotel.record_index["bookings"] == {}
+    assert hotel.record_index["archived_bookings"] == {record.id: record}
+    assert hotel.new_id("archived_bookings") == record.id + 1
+    assert hotel.new_id("bookings") == record.id + 2
+
+@pytest.mark.parametrize("snapshot_format", ["binary", "pickle"])
+def test_repeated_ids_from_old_files_are_renumbered(hotel, snapshot_format):
+    hotel.snapshot_format = snapshot_format
+    old = [hotel.Customer(record_id, fname, "Smith", "", "", "", "") for record_id, fname in ((1, "Ann"), (2, "Bob"), (2, "Cat"))] # Ids used to be len(list) + 1, which repeats after a delete.
+    with open(hotel.database_files["customers"], "wb") as f:
+        f.write(hotel.encode_snapshot(old, 0, 2, hotel.Customer))
+    reopened = hotel.restart()
+    assert [(record.id, record.fname) for record in reopened.customers] == [(1, "Ann"), (2, "Bob"), (3, "Cat")]
+    assert reopened.new_id("customers") == 4
+    reopened.update_record("customers", reopened.record_index["customers"][3], sname="Jones")
+    reopened.flush_writes()
+    again = reopened.restart() # The new ids were saved, so the edit went to the right record.
+    assert [(record.id, record.sname) for record in again.customers] == [(1, "Smith"), (2, "Smith"), (3, "Jones")]
+
+def test_pet_name_can_be_changed(hotel):
+    pet = hotel.Pet(hotel.new_id("pets"), "Rex", "3", "Dog", "", "", "")
+    hotel.add_record("pets", pet)
+    hotel.update_record("pets", pet, name="Max", age="4") # What the pet menu's edit window does.
+    hotel.flush_writes()
+    assert [(record.name, record.age) for record in hotel.restart().pets] == [("Max", "4")]
@@ -0,0 +1,29 @@
+# Records kept small: __slots__ instead of a dict each, saved as tuples, and repeated text (rooms, species, dates) shared through intern_text.
+import pickle
+
+def pet(hotel, name="Rex", species="Dog"):
+    return hotel.Pet(1, name, "3", species, "", "", "")
+
+def test_records_have_no_dict(hotel):
+    for record in (pet(hotel), hotel.Customer(1, "Ann", "Smith", "", "", "", ""), hotel.Booking(1, 1, 1, "01/03/2025", "05/03/2025", "09:00", "17:00", "R1")):
+        assert not hasattr(record, "__dict__")
+
+def test_records_are_saved_as_tuples(hotel):
+    record = hotel.Booking(7, 2, 3, "01/03/2025", "05/03/2025", "09:00", "17:00", "R1")
+    assert record.__getstate__() == (7, 2, 3, "01/03/2025", "05/03/2025", "09:00", "17:00", "R1")
+    copy = pickle.loads(pickle.dumps(record))
+    assert copy.__getstate__() == record.__getstate__()
+    assert copy.start_date == record.start_date # Worked out again when it's loaded.
+
+def test_records_saved_as_dicts_still_load(hotel):
+    record = hotel.Pet.__new__(hotel.Pet)
+    record.__setstate__({"id": 1, "name": "Rex", "age": "3", "species": "".join(["D", "og"]), "description": "", "diet": "", "add_info": ""}) # How records were pickled before __slots__.
+    assert record.__getstate__() == (1, "Rex", "3", "Dog", "", "", "")
+    assert record.species is pet(hotel).species
+
+def test_repeated_text_is_shared(hotel):
+    first = pet(hotel, species="".join(["D", "og"])) # Made at run time, so not shared already.
+    second = pet(hotel, species="".join(["Do", "g"]))
+    assert first.species is second.species
+    second.set("species", "".join(["C", "at"]))
+    assert second.species is pet(hotel, species="Cat").species
@@ -0,0 +1,47 @@
+# Checking rooms are free (RoomAvailability), against going through every booking.
+from datetime import date, timedelta
+
+from made_up import fill
+
+def booking(hotel, sdate, edate, room="R1"):
+    record = hotel.Booking(hotel.new_id("bookings"), 1, 1, sdate, edate, "09:00", "17:00", room)
+    hotel.add_record("bookings", record)
+    return record
+
+def test_stays_clash_only_when_nights_overlap(hotel):
+    first = booking(hotel, "01/03/2025", "05/03/2025")
+    conflicts = hotel.room_availability.conflicts
+    assert conflicts("R1", date(2025, 3, 5), date(2025, 3, 8)) == [] # Arriving the day the last guest leaves.
+    assert conflicts("R1", date(2025, 2, 25), date(2025, 3, 1)) == []
+    assert conflicts("R1", date(2025, 3, 4), date(2025, 3, 6)) == [first.id]
+    assert conflicts("R1", date(2025, 3, 4), date(2025, 3, 6), ignore_id=first.id) == [] # The booking being edited.
+    assert conflicts("R2", date(2025, 3, 4), date(2025, 3, 6)) == []
+
+def test_long_stay_is_found_from_well_after_it_starts(hotel):
+    long_stay = booking(hotel, "01/01/2025", "01/06/2025")
+    booking(hotel, "02/01/2025", "03/01/2025")
+    assert hotel.room_availability.conflicts("R1", date(2025, 5, 20), date(2025, 5, 21)) == [long_stay.id]
+
+def test_changed_and_deleted_bookings_free_their_room(hotel):
+    record = booking(hotel, "01/03/2025", "05/03/2025")
+    hotel.update_record("bookings", record, room="R2")
+    assert "R1" in hotel.room_availability.free_rooms(date(2025, 3, 2), date(2025, 3, 3))
+    assert "R2" not in hotel.room_availability.free_rooms(date(2025, 3, 2), date(2025, 3, 3))
+    hotel.delete_record("bookings", record)
+    assert hotel.room_availability.free_rooms(date(2025, 3, 2), date(2025, 3, 3)) == hotel.all_rooms
+
+def test_free_rooms_match_checking_every_booking(hotel):
+    rng = fill(hotel)
+    for _ in range(300):
+        start = date(2025, 1, 1) + timedelta(days=rng.randrange(-10, 230))
+        end = start + timedelta(days=rng.randrange(1, 20))
+        ignore = rng.choice(hotel.bookings).id
+        taken = {booking.room for booking in hotel.bookings if booking.id != ignore and booking.start_date is not None and booking.end_date is not None
+                 and booking.end_date > booking.start_date and booking.start_date < end and booking.end_date > start}
+        assert hotel.room_availability.free_rooms(start, end, ignore) == [room for room in hotel.all_rooms if room not in taken]
+
+def test_rooms_are_the_same_after_restart(hotel):
+    fill(hotel)
+    hotel.flush_writes()
+    reopened = hotel.restart()
+    assert {room: sorted(stays) for room, stays in reopened.room_availability.stays.items() if stays} == {room: sorted(stays) for room, stays in hotel.room_availability.stays.items() if stays}
@@ -0,0 +1,29 @@
+# The result lists' row widgets (RowPool), using the stand-in widgets in fake_tk, as there's no display to make real ones on.
+import pytest
+
+import fake_tk
+
+buttons = [("∆", "Edit.TButton", {"column": 2}), ("➖", "Delete.TButton", {"column": 3})]
+
+@pytest.fixture
+def pool(hotel, monkeypatch):
+    monkeypatch.setattr(hotel, "ttk", fake_tk)
+    return hotel.RowPool(fake_tk.Frame(), {"column": 0}, buttons, size=3)
+
+def shown(pool):
+    return [label.cget("text") for label, row_buttons in pool.rows if label.gridded]
+
+def test_rows_are_made_once_and_reused(pool):
+    made = fake_tk.Widget.made
+    assert shown(pool) == [] # Hidden until there's something to show.
+    pool.show([("Ann", ["edit ann", "delete ann"]), ("Bob", ["edit bob", "delete bob"])])
+    assert shown(pool) == ["Ann", "Bob"]
+    assert [button.cget("command") for button in pool.rows[1][1]] == ["edit bob", "delete bob"]
+    pool.show([("Cat", ["edit cat", "delete cat"])])
+    assert shown(pool) == ["Cat"]
+    assert not any(button.gridded for button in pool.rows[1][1]) # The buttons are hidden along with the label.
+    pool.show([(name, [None, None]) for name in ("A", "B", "C", "D")]) # More than fit, so only the first 3.
+    assert shown(pool) == ["A", "B", "C"]
+    pool.show([])
+    assert shown(pool) == []
+    assert fake_tk.Widget.made == made
@@ -0,0 +1,53 @@
+# The schedule drawn on one canvas (ScheduleCanvas), with the stand-in widgets in fake_tk.
+from types import SimpleNamespace
+
+import pytest
+
+import fake_tk
+
+@pytest.fixture
+def schedule(hotel, monkeypatch):
+    monkeypatch.setattr(hotel, "tk", fake_tk)
+    monkeypatch.setattr(hotel, "ttk", fake_tk)
+    return hotel.ScheduleCanvas(fake_tk.Frame())
+
+def bars(schedule):
+    return {booking_id: (schedule.canvas.items[rectangle]["coords"], schedule.canvas.items[text]["text"]) for booking_id, (rectangle, text, _) in schedule.bars.items()}
+
+def test_only_changed_bars_are_redrawn(schedule):
+    canvas = schedule.canvas
+    schedule.show(31, {1: (0, 1, 3, "Rex"), 2: (1, 10, 12, "Bella")})
+    assert len(canvas.kind("rectangle")) == 2
+    assert bars(schedule)[1] == (schedule.bar_coords(0, 1, 3), "Rex")
+    items = dict(schedule.bars)
+
+    schedule.show(31, {1: (0, 1, 3, "Rex"), 2: (1, 11, 14, "Bella"), 3: (2, 5, 5, "Max")})
+    assert schedule.bars[1] == items[1]
+    assert schedule.bars[2][:2] == items[2][:2] # Moved rather than made again.
+    assert bars(schedule)[2] == (schedule.bar_coords(1, 11, 14), "Bella")
+    assert len(canvas.kind("rectangle")) == 3
+
+    schedule.show(31, {3: (2, 5, 5, "Max")})
+    assert len(canvas.kind("rectangle")) == 1
+    assert set(schedule.bars) == {3}
+
+def test_days_a_month_doesnt_have_are_hidden(schedule):
+    schedule.show(28, {})
+    states = [schedule.canvas.items[number].get("state", "normal") for line, number in schedule.days]
+    assert states == ["normal"] * 28 + ["hidden"] * 3
+    schedule.show(31, {})
+    assert all(schedule.canvas.items[number]["state"] == "normal" for line, number in schedule.days)
+
+def test_zoom_stays_within_limits(schedule):
+    scaled = []
+    canvas = schedule.canvas
+    canvas.scale = lambda *args: scaled.append(args[-1])
+    canvas.canvasx = canvas.canvasy = lambda position: position
+    canvas.xview_moveto = canvas.yview_moveto = lambda fraction: None
+    ctrl_up = SimpleNamespace(num=4, delta=0, state=0x4, x=0, y=0)
+    for _ in range(10):
+        schedule.wheel(ctrl_up)
+    assert schedule.zoom == 3.0
+    assert len(scaled) == 5 # Stops scaling once it's as big as it goes.
+    assert canvas.cget("scrollregion") == (0, 0, schedule.width * 3, schedule.height * 3)
+    assert schedule.bar_coords(0, 1, 1)[0] == (schedule.label_width + 1) * 3
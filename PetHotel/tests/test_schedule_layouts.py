@@ -0,0 +1,55 @@
+# The schedule's bars for each month (month_layout), and the saved layouts (schedule_layouts) being thrown away when a booking on that month changes.
+from datetime import date
+
+def booking(hotel, sdate, edate, room="R1", pet_id=1):
+    record = hotel.Booking(hotel.new_id("bookings"), pet_id, 1, sdate, edate, "09:00", "17:00", room)
+    hotel.add_record("bookings", record)
+    return record
+
+def test_bars_are_cut_to_the_month(hotel):
+    hotel.add_record("pets", hotel.Pet(hotel.new_id("pets"), "Rex", "3", "Dog", "", "", ""))
+    rows = {"R1": 0, "R2": 1}
+    inside = booking(hotel, "05/03/2025", "08/03/2025", "R2")
+    over_start = booking(hotel, "25/02/2025", "02/03/2025")
+    over_end = booking(hotel, "30/03/2025", "04/04/2025", pet_id=99)
+    booking(hotel, "05/03/2025", "06/03/2025", "Nowhere") # No row for the room, so not shown.
+    booking(hotel, "05/04/2025", "06/04/2025")
+    assert hotel.month_layout(date(2025, 3, 1), date(2025, 3, 31), rows) == {
+        inside.id: (1, 5, 8, "Rex"),
+        over_start.id: (0, 1, 2, "Rex"),
+        over_end.id: (0, 30, 31, "(Deleted pet)"),
+    }
+
+def saved(hotel, *months):
+    hotel.schedule_layouts.clear()
+    for month in months:
+        hotel.schedule_layouts[month] = {}
+
+def test_changes_forget_only_the_months_they_touch(hotel):
+    months = [(2024, 12), (2025, 1), (2025, 2), (2025, 3)]
+    saved(hotel, *months)
+    record = booking(hotel, "30/12/2024", "02/02/2025") # Runs over three months, across a new year.
+    assert list(hotel.schedule_layouts) == [(2025, 3)]
+
+    saved(hotel, *months)
+    hotel.update_record("bookings", record, edate="02/01/2025")
+    assert list(hotel.schedule_layouts) == [(2025, 3)]
+    saved(hotel, *months)
+    hotel.update_record("bookings", record, sdate="01/03/2025", edate="03/03/2025")
+    assert list(hotel.schedule_layouts) == [(2025, 2)] # Both where it was and where it is now.
+
+    saved(hotel, *months)
+    hotel.move_record("bookings", "archived_bookings", record)
+    assert list(hotel.schedule_layouts) == [(2024, 12), (2025, 1), (2025, 2)]
+
+    saved(hotel, *months)
+    broken = booking(hotel, "not a date", "02/03/2025")
+    hotel.delete_record("bookings", broken)
+    assert list(hotel.schedule_layouts) == months # Never shown, so nothing to forget.
+
+def test_pet_changes_forget_every_month(hotel):
+    pet = hotel.Pet(hotel.new_id("pets"), "Rex", "3", "Dog", "", "", "")
+    hotel.add_record("pets", pet)
+    saved(hotel, (2025, 1), (2025, 2))
+    hotel.update_record("pets", pet, name="Max") # The bars show the pet's name.
+    assert hotel.schedule_layouts == {}
@@ -0,0 +1,66 @@
+# Changing screens in the one root window: each screen is built once and kept, and only refreshed when a list it shows has changed. Uses the stand-in widgets in fake_tk.
+from types import SimpleNamespace
+
+import pytest
+
+import fake_tk
+
+# Screens that only note when they're built and refreshed.
+@pytest.fixture
+def seen(hotel, monkeypatch):
+    seen = SimpleNamespace(built=[], refreshed=[])
+    def builder(name):
+        def build():
+            seen.built.append(name)
+            return fake_tk.Frame(), lambda: seen.refreshed.append(name)
+        return build
+    monkeypatch.setattr(hotel, "root", fake_tk.Widget())
+    monkeypatch.setattr(hotel, "screen_builders", {name: builder(name) for name in hotel.screen_builders})
+    return seen
+
+def customer(hotel):
+    record = hotel.Customer(hotel.new_id("customers"), "Ann", "Smith", "1 High Street", "AB1 2CD", "ann@example.com", "07123456789")
+    hotel.add_record("customers", record)
+    return record
+
+def test_screens_are_built_once(hotel, seen):
+    hotel.show_screen("customers")
+    hotel.show_screen("pets")
+    hotel.show_screen("customers")
+    assert seen.built == ["customers", "pets"]
+    assert hotel.screens["customers"]["frame"].gridded
+    assert not hotel.screens["pets"]["frame"].gridded
+    assert hotel.root.cget("title") == "Customers"
+    assert seen.refreshed == [] # Nothing has changed since they were built.
+
+def test_only_screens_showing_a_changed_list_are_refreshed(hotel, seen):
+    hotel.show_screen("pets")
+    hotel.show_screen("customers")
+    customer(hotel)
+    customer(hotel)
+    assert len(hotel.root.idle) == 1 # Two changes, but only one refresh waiting.
+    hotel.root.run_idle()
+    assert seen.refreshed == ["customers"]
+    hotel.show_screen("pets")
+    assert seen.refreshed == ["customers"]
+    hotel.show_screen("customers")
+    assert seen.refreshed == ["customers"] # Already up to date.
+
+def test_hidden_screen_catches_up_when_shown(hotel, seen):
+    hotel.show_screen("customers")
+    hotel.show_screen("main")
+    customer(hotel)
+    hotel.root.run_idle()
+    assert seen.refreshed == [] # The main menu doesn't show any lists.
+    hotel.show_screen("customers")
+    assert seen.refreshed == ["customers"]
+
+def test_forgotten_screens_are_built_again(hotel, seen):
+    hotel.show_screen("customers")
+    hotel.show_screen("settings")
+    frame = hotel.screens["customers"]["frame"]
+    hotel.forget_screens(keep="settings")
+    assert frame.destroyed
+    assert list(hotel.screens) == ["settings"]
+    hotel.show_screen("customers")
+    assert seen.built == ["customers", "settings", "customers"]
@@ -0,0 +1,82 @@
+# The search menus' results (SearchResults), with the searches behind them.
+def customer(hotel, fname, sname):
+    record = hotel.Customer(hotel.new_id("customers"), fname, sname, "1 High Street", "AB1 2CD", f"{fname}@example.com", "07123456789")
+    hotel.add_record("customers", record)
+    return record
+
+def customer_results(hotel):
+    return hotel.SearchResults(lambda: hotel.customers, lambda terms, within: hotel.find_customers(terms, within=within), hotel.narrows)
+
+def test_record_added_during_a_search_is_found(hotel):
+    customer(hotel, "Ann", "Smith")
+    customer(hotel, "Bob", "Jones")
+    results = customer_results(hotel)
+    assert results.search({"sname": "smi"})
+    assert [record.fname for record in results.shown()] == ["Ann"]
+
+    customer(hotel, "Cat", "Smithson") # Added while the search is still showing.
+    results.refresh()
+    assert [record.fname for record in results.shown()] == ["Ann", "Cat"]
+    # Narrowing carries on from the refreshed results, not the ones from before.
+    assert results.search({"sname": "smith"})
+    assert [record.fname for record in results.shown()] == ["Ann", "Cat"]
+
+def test_edited_record_drops_out_of_a_search(hotel):
+    ann = customer(hotel, "Ann", "Smith")
+    customer(hotel, "Bob", "Smith")
+    results = customer_results(hotel)
+    results.search({"sname": "smith"})
+    hotel.update_record("customers", ann, sname="Jones")
+    results.refresh()
+    assert [record.fname for record in results.shown()] == ["Bob"]
+    assert not results.search({"sname": "smith"}) # Same terms, so nothing to do.
+
+def test_no_terms_shows_everything(hotel):
+    customer(hotel, "Ann", "Smith")
+    results = customer_results(hotel)
+    results.search({"sname": "zzz"})
+    assert results.shown() == []
+    results.search({})
+    customer(hotel, "Bob", "Jones")
+    results.refresh()
+    assert results.shown() is hotel.customers
+
+def test_pet_search_picks_up_edits(hotel):
+    dog = hotel.Pet(hotel.new_id("pets"), "Rex", "3", "Dog", "", "", "")
+    hotel.add_record("pets", dog)
+    results = hotel.SearchResults(lambda: hotel.pets, lambda terms, within: hotel.find_records("pets", [("species", "contains", terms["species"])], within=within))
+    results.search({"species": "dog"})
+    assert results.shown() == [dog]
+    hotel.update_record("pets", dog, species="Cat")
+    results.refresh()
+    assert results.shown() == []
+
+def test_booking_search_narrows_on_room_customer_and_pet(hotel):
+    ann = customer(hotel, "Ann", "Smith")
+    bob = customer(hotel, "Bob", "Smithson")
+    for cust, start, room in ((ann, "01/03/2024", "R1"), (bob, "02/03/2024", "R12"), (bob, "10/05/2024", "R1"), (ann, "05/03/2024", "R2")):
+        hotel.add_record("bookings", hotel.Booking(hotel.new_id("bookings"), 1, cust.id, start, start, "09:00", "17:00", room))
+    given = []
+    def find(terms, within):
+        given.append(within)
+        first = hotel.parse_date(terms["from"]) if "from" in terms else None
+        last = hotel.parse_date(terms["to"]) if "to" in terms else None
+        return hotel.find_bookings(terms.get("room", ""), terms.get("customer", ""), "", first, last, within=within)
+    results = hotel.SearchResults(lambda: hotel.bookings, find, hotel.booking_search_narrows)
+
+    results.search({"customer": "smi", "from": "01/03/2024", "to": "31/03/2024"})
+    assert [booking.id for booking in results.shown()] == [1, 2, 4] # In date order.
+    results.search({"customer": "smithso", "from": "01/03/2024", "to": "31/03/2024"})
+    assert given[-1] is not None # Only the last results were checked.
+    assert [booking.id for booking in results.shown()] == [2]
+    results.search({"customer": "smithso", "room": "r1", "from": "01/03/2024", "to": "31/03/2024"})
+    assert [booking.id for booking in results.shown()] == [2]
+
+    # Changing the dates, or adding them, searches everything again.
+    results.search({"customer": "smithso", "room": "r1", "from": "01/03/2024", "to": "31/05/2024"})
+    assert given[-1] is None
+    assert [booking.id for booking in results.shown()] == [2, 3]
+    results.search({"room": "r1"})
+    results.search({"room": "r1", "from": "01/05/2024"})
+    assert given[-1] is None
+    assert [booking.id for booking in results.shown()] == [3]
@@ -0,0 +1,65 @@
+# Snapshots in either format (see write_snapshot and BinaryTable), and converting between them.
+import pytest
+
+def customers(hotel, count):
+    for i in range(count):
+        hotel.add_record("customers", hotel.Customer(hotel.new_id("customers"), f"First{i}", f"Last{i}", "1 High Street", None if i == 2 else "AB1 2CD", f"c{i}@example.com", "07123456789"))
+
+def fields(records):
+    return [tuple(getattr(record, field) for field in type(record).fields) for record in records]
+
+@pytest.mark.parametrize("snapshot_format", ["binary", "pickle"])
+def test_snapshot_round_trip(hotel, snapshot_format):
+    hotel.snapshot_format = snapshot_format
+    customers(hotel, 5)
+    hotel.save_customers() # The whole list, so it's written as a snapshot.
+    hotel.flush_writes()
+    assert hotel.is_binary(hotel.customer_file) == (snapshot_format == "binary")
+    records, seq, last_id = hotel.read_snapshot(hotel.customer_file)
+    assert fields(records) == fields(hotel.customers)
+
+def test_binary_table_reads_single_records(hotel):
+    customers(hotel, 5)
+    hotel.save_customers()
+    hotel.flush_writes()
+    read = []
+    table = hotel.BinaryTable(hotel.customer_file, on_read=read.append)
+    try:
+        assert len(table) == 5
+        assert table[3].fname == "First3"
+        assert table[2].postcode is None
+        assert [record.id for record in read] == [4, 3] # Only the records asked for were read.
+        assert table[3] is table[3]
+        assert fields(list(table)) == fields(hotel.customers)
+    finally:
+        table.close()
+
+def test_truncated_binary_snapshot_is_damaged(hotel):
+    customers(hotel, 5)
+    hotel.save_customers()
+    hotel.flush_writes()
+    with open(hotel.customer_file, "rb") as f:
+        data = f.read()
+    with open(hotel.customer_file, "wb") as f:
+        f.write(data[:len(data) // 2])
+    with pytest.raises(Exception) as error:
+        hotel.read_snapshot(hotel.customer_file)
+    assert error.typename == "DatabaseDamaged"
+
+def test_convert_waits_for_a_compaction_already_running(hotel, monkeypatch):
+    hotel.snapshot_format = "pickle"
+    customers(hotel, 5)
+    hotel.save_customers()
+    hotel.flush_writes()
+    compact = hotel.compact_database
+    def repair_first(file, records): # A compaction started while reading, as the repair of repeated ids does.
+        monkeypatch.setattr(hotel, "compact_database", compact)
+        hotel.compacting.add(file)
+        hotel.compactions.append(hotel.threading.Timer(0.2, hotel.compacting.discard, (file,)))
+        hotel.compactions[-1].start()
+    monkeypatch.setattr(hotel, "compact_database", repair_first)
+    hotel.journal_compact_after = 0 # Makes read_database start one for the customers.
+
+    hotel.convert_database("binary")
+    assert hotel.is_binary(hotel.customer_file)
+    assert fields(hotel.read_database(hotel.customer_file)) == fields(hotel.customers)
@@ -0,0 +1,55 @@
+# The scrolling list every list screen uses (VirtualList), with the stand-in widgets in fake_tk.
+from types import SimpleNamespace
+
+import pytest
+
+import fake_tk
+
+@pytest.fixture
+def records():
+    return list(range(100))
+
+@pytest.fixture
+def view(hotel, monkeypatch, records):
+    monkeypatch.setattr(hotel, "ttk", fake_tk)
+    view = hotel.VirtualList(fake_tk.Frame(), {"column": 0}, [("∆", "Edit.TButton", {"column": 2})], lambda: records, lambda record: (f"record {record}", [record]), size=10)
+    view.refresh()
+    return view
+
+def shown(view):
+    return [label.cget("text") for label, row_buttons in view.pool.rows if label.gridded]
+
+def test_only_the_visible_rows_are_shown(view):
+    assert shown(view) == [f"record {i}" for i in range(10)]
+    assert view.scrollbar.position == (0, 0.1)
+
+def test_scrolling(view):
+    made = fake_tk.Widget.made
+    view.scroll("scroll", 3)
+    assert view.top == 3
+    view.scroll("scroll", 1, "pages")
+    assert view.top == 13
+    view.scroll("moveto", "0.5")
+    assert shown(view)[0] == "record 50"
+    view.scroll("moveto", "1.0") # Can't go past the last full page.
+    assert shown(view) == [f"record {i}" for i in range(90, 100)]
+    view.wheel(SimpleNamespace(num=4, delta=0))
+    assert view.top == 87
+    assert fake_tk.Widget.made == made
+
+def test_list_shrinking_keeps_the_view_in_range(view, records):
+    view.scroll("moveto", "0.95")
+    del records[5:]
+    view.refresh()
+    assert view.top == 0
+    assert shown(view) == [f"record {i}" for i in range(5)]
+    assert view.scrollbar.position == (0, 1)
+    records.clear()
+    view.refresh()
+    assert shown(view) == []
+    assert view.scrollbar.position == (0, 1)
+
+def test_new_search_goes_back_to_the_top(view):
+    view.scroll("scroll", 20)
+    view.refresh(to_top=True)
+    assert shown(view)[0] == "record 0"